@@ -0,0 +1,104 @@
+import random
+import sys
+import time
+
+from sqlalchemy import func
+
+from src.classes import Point
+from src.container import create_container
+from src.enums import EstadosEnum
+from src.models import Estacionamento, Endereco, HorarioPadrao
+from src.repo import BuscarEstacioRepo
+from src.services import SpatialIndex
+
+TAMANHOS = (10_000, 100_000)
+NUM_BUSCAS = 50
+LIMIT_KNN = 20
+
+# Regiao aproximada da grande Sao Paulo, na mesma ordem usada pelos testes
+LAT_MIN, LAT_MAX = -24.0, -23.0
+LON_MIN, LON_MAX = -47.2, -46.2
+
+
+def _random_point() -> Point:
+    return Point(f'{random.uniform(LAT_MIN, LAT_MAX):.6f}', f'{random.uniform(LON_MIN, LON_MAX):.6f}')
+
+
+def _next_id(sess, cls) -> int:
+    return (sess.query(func.max(cls.id)).scalar() or 0) + 1
+
+
+def _populate(sess, n: int):
+    end_id, horap_id, estacio_id = _next_id(sess, Endereco), _next_id(sess, HorarioPadrao), \
+                                   _next_id(sess, Estacionamento)
+
+    enderecos, horarios, estacios = [], [], []
+    for i in range(n):
+        enderecos.append({'id': end_id + i, 'logradouro': 'Rua Bench', 'estado': EstadosEnum.SP, 'cidade': 'Sao Paulo',
+                          'bairro': 'Centro', 'numero': str(i), 'cep': '01001000', 'coordenadas': _random_point()})
+        horarios.append({'id': horap_id + i})
+        estacios.append({'id': estacio_id + i, 'nome': f'Bench {i}', 'esta_suspenso': False, 'esta_aberto': True,
+                         'cadastro_terminado': True, 'telefone': '+5511999999999', 'qtd_vaga_livre': 0,
+                         'total_vaga': 10, 'horap_fk': horap_id + i, 'endereco_fk': end_id + i})
+
+    sess.execute(Endereco.__table__.insert(), enderecos)
+    sess.execute(HorarioPadrao.__table__.insert(), horarios)
+    sess.execute(Estacionamento.__table__.insert(), estacios)
+    sess.flush()
+
+
+def _time_buscas(repo: BuscarEstacioRepo, sess, centros, limit=None) -> float:
+    start = time.perf_counter()
+    for centro in centros:
+        repo.buscar(sess, centro, limit=limit)
+        sess.expunge_all()
+
+    return (time.perf_counter() - start) / len(centros)
+
+
+def main():
+    if len(sys.argv) == 1:
+        print('USAGE: python -m benchmarks.bench_buscar_estacio <CONFIG_PATH>')
+        exit(0)
+
+    container = create_container(sys.argv[1])
+    session_maker = container.db_session_maker()
+    cfg = container.config.get('busca_estacio')
+    distancia = int(cfg['distancia'])
+    raio_terra = float(cfg['raio_terra'])
+    tam_celula = float(cfg['tam_celula_indice'])
+
+    random.seed(42)
+    centros = [_random_point() for _ in range(NUM_BUSCAS)]
+
+    print(f'{"n":>8} {"sql (ms)":>10} {"bbox (ms)":>10} {"indice (ms)":>12} {"sql knn (ms)":>13} {"indice knn (ms)":>16} {"build (ms)":>11} {"resultados":>11}')
+    for n in TAMANHOS:
+        with session_maker() as sess:
+            try:
+                _populate(sess, n)
+
+                sql_repo = BuscarEstacioRepo(distancia, modo=BuscarEstacioRepo.MODO_SQL, raio_terra=raio_terra)
+                bbox_repo = BuscarEstacioRepo(distancia, modo=BuscarEstacioRepo.MODO_BBOX, raio_terra=raio_terra)
+                spatial_index = SpatialIndex(tam_celula, raio_terra=raio_terra)
+                index_repo = BuscarEstacioRepo(distancia, modo=BuscarEstacioRepo.MODO_INDICE, raio_terra=raio_terra,
+                                               spatial_index=spatial_index)
+
+                start = time.perf_counter()
+                index_repo.rebuild_index(sess)
+                build = time.perf_counter() - start
+
+                t_sql = _time_buscas(sql_repo, sess, centros)
+                t_bbox = _time_buscas(bbox_repo, sess, centros)
+                t_index = _time_buscas(index_repo, sess, centros)
+                t_sql_knn = _time_buscas(sql_repo, sess, centros, LIMIT_KNN)
+                t_index_knn = _time_buscas(index_repo, sess, centros, LIMIT_KNN)
+
+                _, ret = index_repo.buscar(sess, centros[0])
+                print(f'{n:>8} {t_sql * 1000:>10.2f} {t_bbox * 1000:>10.2f} {t_index * 1000:>12.2f} '
+                      f'{t_sql_knn * 1000:>13.2f} {t_index_knn * 1000:>16.2f} {build * 1000:>11.2f} {len(ret):>11}')
+            finally:
+                sess.rollback()
+
+
+if __name__ == '__main__':
+    main()
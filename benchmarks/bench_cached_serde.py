@@ -0,0 +1,39 @@
+import timeit
+
+from pymemcache.serde import pickle_serde
+
+from src.classes import SimpleUserSession
+from src.enums import UserType
+from src.services import CompactSerde
+
+REPETICOES = 100_000
+
+VALORES = {
+    'SimpleUserSession': SimpleUserSession(UserType.ESTACIONAMENTO.value, 123456),
+    'token (str)': 'a3f9c2e18b7d4f6a0c5e9b2d7f1a8c3e',
+    'int': 987654,
+    'float': 3.14159,
+    'bool': True,
+}
+
+
+def _tempo_us(fn) -> float:
+    return timeit.timeit(fn, number=REPETICOES) / REPETICOES * 1_000_000
+
+
+def main():
+    serdes = {'pickle': pickle_serde, 'compact': CompactSerde()}
+
+    print(f'{"valor":>18} {"serde":>8} {"bytes":>6} {"encode (us)":>12} {"decode (us)":>12}')
+    for nome_valor, valor in VALORES.items():
+        for nome_serde, serde in serdes.items():
+            data, flags = serde.serialize('k', valor)
+
+            t_encode = _tempo_us(lambda: serde.serialize('k', valor))
+            t_decode = _tempo_us(lambda: serde.deserialize('k', data, flags))
+
+            print(f'{nome_valor:>18} {nome_serde:>8} {len(data):>6} {t_encode:>12.3f} {t_decode:>12.3f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+import multiprocessing
+import pathlib
+import resource
+import tempfile
+import time
+
+from PIL import Image
+
+from src.classes import MemoryFileStream
+from src.services import ImageProcessor
+
+# Tamanhos comuns de fotos de celular (12 MP, retrato e paisagem, e 48 MP)
+TAMANHOS = [(4032, 3024), (3024, 4032), (4000, 3000), (8000, 6000)]
+FOTOS_POR_TAMANHO = 2
+QUALIDADE_JPEG = 90
+
+WIDTH_FOTO = 1280
+HEIGHT_FOTO = 720
+FORMATO = 'png'
+
+
+def _gerar_foto(size, seed: int) -> Image.Image:
+    # Ruido sobre um gradiente, para o JPEG ter o tamanho e o custo de decodificacao de uma foto de verdade
+    canais = [Image.effect_noise(size, 20 + 5 * ((seed + i) % 3)) for i in range(3)]
+    ruido = Image.merge('RGB', canais)
+    gradiente = Image.merge('RGB', (Image.linear_gradient('L'), Image.radial_gradient('L'),
+                                    Image.linear_gradient('L').rotate(90))).resize(size)
+
+    return Image.blend(ruido, gradiente, 0.8)
+
+
+def _gerar_corpus(pasta: pathlib.Path):
+    arquivos = []
+    for size in TAMANHOS:
+        for i in range(FOTOS_POR_TAMANHO):
+            arquivo = pasta / f'foto_{size[0]}x{size[1]}_{i}.jpg'
+            _gerar_foto(size, i).save(arquivo, format='JPEG', quality=QUALIDADE_JPEG)
+            arquivos.append(arquivo)
+
+    return arquivos
+
+
+def _antigo(data: bytes):
+    # Caminho anterior: decodifica a imagem inteira e distorce para width x height
+    image = Image.open(MemoryFileStream(data))
+    resized = image.resize((WIDTH_FOTO, HEIGHT_FOTO))
+
+    out_stream = MemoryFileStream()
+    resized.save(out_stream, format=FORMATO)
+
+
+def _novo(data: bytes):
+    ImageProcessor(FORMATO).compress(MemoryFileStream(data), WIDTH_FOTO, HEIGHT_FOTO)
+
+
+def _medir(modo: str, arquivos):
+    # Roda em um processo proprio: ru_maxrss so cresce, entao cada modo precisa comecar do zero
+    fn = _antigo if modo == 'antigo' else _novo
+
+    base = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    tempos = []
+    for arquivo in arquivos:
+        data = arquivo.read_bytes()
+
+        start = time.perf_counter()
+        fn(data)
+        tempos.append(time.perf_counter() - start)
+
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return tempos, base, pico
+
+
+def main():
+    ctx = multiprocessing.get_context('spawn')
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # O corpus tambem e gerado em outro processo, senao os processos filhos ja comecariam com o pico do pai
+        with ctx.Pool(1) as pool:
+            arquivos = pool.apply(_gerar_corpus, (pathlib.Path(tmp),))
+        tamanho_medio = sum(arquivo.stat().st_size for arquivo in arquivos) / len(arquivos) / 1024
+
+        print(f'{len(arquivos)} fotos, {tamanho_medio:.0f} KB em media, saida {WIDTH_FOTO}x{HEIGHT_FOTO} {FORMATO}')
+        print(f'{"modo":>8} {"media (ms)":>11} {"max (ms)":>9} {"total (s)":>10} {"pico RSS (MB)":>14} '
+              f'{"+RSS (MB)":>10}')
+        for modo in ('antigo', 'novo'):
+            with ctx.Pool(1) as pool:
+                tempos, base, pico = pool.apply(_medir, (modo, arquivos))
+
+            # ru_maxrss vem em KB no Linux
+            print(f'{modo:>8} {sum(tempos) / len(tempos) * 1000:>11.1f} {max(tempos) * 1000:>9.1f} '
+                  f'{sum(tempos):>10.2f} {pico / 1024:>14.1f} {(pico - base) / 1024:>10.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from src.services import Crypto, CryptoOcupado
+
+NUM_LOGINS = 32
+CONCORRENCIA = (1, 4, 16)
+SALT_ROUNDS = 12
+
+
+def _requisicao_leve() -> float:
+    # Simula um resolver comum (pouco CPU) rodando no mesmo processo durante a rajada de logins
+    start = time.perf_counter()
+    sum(i * i for i in range(20_000))
+    return time.perf_counter() - start
+
+
+def _rajada(crypto: Crypto, hashed: bytes, concorrencia: int):
+    recusados = 0
+    lock = threading.Lock()
+
+    def login(_):
+        nonlocal recusados
+        try:
+            crypto.check_password(b'senha123', hashed)
+        except CryptoOcupado:
+            with lock:
+                recusados += 1
+
+    latencias = []
+    terminou = threading.Event()
+
+    def medir_leves():
+        while not terminou.is_set():
+            latencias.append(_requisicao_leve())
+
+    medidor = threading.Thread(target=medir_leves)
+    medidor.start()
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(concorrencia) as executor:
+        list(executor.map(login, range(NUM_LOGINS)))
+    elapsed = time.perf_counter() - start
+
+    terminou.set()
+    medidor.join()
+
+    return (NUM_LOGINS - recusados) / elapsed, recusados, statistics.median(latencias) * 1000
+
+
+def main():
+    num_workers = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    base = _requisicao_leve() * 1000
+
+    modos = {
+        'inline': Crypto(is_testing=False, salt_rounds=SALT_ROUNDS),
+        f'pool ({num_workers})': Crypto(is_testing=False, salt_rounds=SALT_ROUNDS, num_workers=num_workers,
+                                        max_fila=NUM_LOGINS),
+        f'pool ({num_workers}, fila 0)': Crypto(is_testing=False, salt_rounds=SALT_ROUNDS,
+                                                num_workers=num_workers, max_fila=0),
+    }
+    hashed = modos['inline'].hash_password(b'senha123')
+
+    print(f'requisicao leve sem carga: {base:.2f} ms')
+    print(f'{"modo":>20} {"threads":>8} {"logins/s":>9} {"recusados":>10} {"leve p50 (ms)":>14}')
+    for nome, crypto in modos.items():
+        # Aquece o pool (spawn dos processos) fora da medicao
+        crypto.check_password(b'senha123', hashed)
+
+        for concorrencia in CONCORRENCIA:
+            throughput, recusados, leve = _rajada(crypto, hashed, concorrencia)
+            print(f'{nome:>20} {concorrencia:>8} {throughput:>9.2f} {recusados:>10} {leve:>14.2f}')
+
+        crypto.close()
+
+
+if __name__ == '__main__':
+    main()
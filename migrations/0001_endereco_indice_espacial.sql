@@ -0,0 +1,7 @@
+-- Coluna gerada com uma copia NOT NULL das coordenadas, exigida pelo indice SPATIAL do MySQL.
+-- Enderecos sem coordenadas ficam em POINT(0 0) e sao descartados pelo filtro exato de distancia.
+ALTER TABLE endereco
+    ADD COLUMN coordenadas_busca POINT SRID 0
+        GENERATED ALWAYS AS (IFNULL(coordenadas, POINT(0, 0))) STORED NOT NULL;
+
+CREATE SPATIAL INDEX idx_endereco_coordenadas_busca ON endereco (coordenadas_busca);
@@ -0,0 +1,4 @@
+-- Larguras (separadas por virgula) das versoes menores gravadas junto com cada foto, ex.: "160,480".
+-- Uploads antigos ficam sem variantes e continuam servindo apenas o arquivo principal.
+ALTER TABLE upload
+    ADD COLUMN variantes VARCHAR(100) NULL;
@@ -1,6 +1,5 @@
 import logging
 
-import flask
 from ariadne import convert_kwargs_to_snake_case
 from dependency_injector.wiring import Provide, inject
 from sqlalchemy.orm import Session
@@ -30,7 +29,7 @@ class AdminEstacioApi(BaseApi):
 
     @convert_kwargs_to_snake_case
     def create_admin_resolver(self, _, info, email: str, senha: str):
-        sess: Session = flask.g.session
+        sess: Session = self.get_db_session(info)
 
         try:
             success, error_or_admin = self.repo.create_admin(sess, email, senha)
@@ -53,7 +52,7 @@ class AdminEstacioApi(BaseApi):
 
     @convert_kwargs_to_snake_case
     def add_to_estacio_resolver(self, _, info, email: str):
-        sess: Session = flask.g.session
+        sess: Session = self.get_db_session(info)
         user_sess = self.get_user_session(sess, self.cached, info)
 
         try:
@@ -1,6 +1,5 @@
 import logging
 
-import flask
 from ariadne import convert_kwargs_to_snake_case
 from dependency_injector.wiring import Provide, inject
 from sqlalchemy.orm import Session
@@ -29,7 +28,7 @@ class AdminSistemaApi(BaseApi):
 
     @convert_kwargs_to_snake_case
     def create_admin_resolver(self, _, info, nome: str, email: str, senha: str):
-        sess: Session = flask.g.session
+        sess: Session = self.get_db_session(info)
         user_sess = self.get_user_session(sess, self.cached, info)
 
         try:
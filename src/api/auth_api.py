@@ -1,24 +1,35 @@
 import logging
 
-import flask
 from ariadne import convert_kwargs_to_snake_case
 from dependency_injector.wiring import Provide
 from sqlalchemy.orm import Session
 
 from src.api.base import BaseApi
+from src.container import Container
 from src.enums import UserType
 from src.repo import AuthRepo, RepoContainer
+from src.services import Cached, RateLimiter, ClientIp
 
 
 class AuthApi(BaseApi):
     ERRO_DESCONHECIDO = 'erro_desconhecido'
+    ERRO_MUITAS_TENTATIVAS = 'muitas_tentativas'
 
-    def __init__(self, auth_repo: AuthRepo = Provide[RepoContainer.auth_repo]):
+    def __init__(self, auth_repo: AuthRepo = Provide[RepoContainer.auth_repo],
+                 cached: Cached = Provide[Container.cached],
+                 limiter_email: RateLimiter = Provide[Container.login_limiter_email],
+                 limiter_ip: RateLimiter = Provide[Container.login_limiter_ip],
+                 client_ip: ClientIp = Provide[Container.client_ip]):
         self.auth_repo = auth_repo
+        self.cached = cached
+        self.limiter_email = limiter_email
+        self.limiter_ip = limiter_ip
+        self.client_ip = client_ip
 
         queries = {}
         mutations = {
             'login': self.login_resolver,
+            'logoutAll': self.logout_all_resolver,
             'enviarEmailSenha': self.enviar_email_senha_resolver,
             'recuperarSenha': self.recuperar_senha_resolver
         }
@@ -26,8 +37,17 @@ class AuthApi(BaseApi):
         super().__init__(queries, mutations)
 
     @convert_kwargs_to_snake_case
-    def login_resolver(self, *_, email: str, senha: str, tipo: UserType):
-        sess: Session = flask.g.session
+    def login_resolver(self, _, info, email: str, senha: str, tipo: UserType):
+        # Barra a tentativa antes do repo chegar no bcrypt
+        ip = self.client_ip.resolve(info.context.headers, info.context.remote_addr)
+        if not self.limiter_ip.allow(ip) or \
+                not self.limiter_email.allow(email.strip().lower()):
+            return {
+                'success': False,
+                'error': self.ERRO_MUITAS_TENTATIVAS
+            }
+
+        sess: Session = self.get_db_session(info)
 
         try:
             success, error_or_token = self.auth_repo.login(sess, email, senha, tipo)
@@ -36,6 +56,9 @@ class AuthApi(BaseApi):
             success, error_or_token = False, self.ERRO_DESCONHECIDO
 
         if success:
+            # O login pode ter invalidado o token antigo deste usuario
+            info.context.user_sessions.clear()
+
             payload = {
                 'success': True,
                 'token': error_or_token
@@ -48,9 +71,27 @@ class AuthApi(BaseApi):
 
         return payload
 
+    def logout_all_resolver(self, _, info):
+        sess: Session = self.get_db_session(info)
+        user_sess = self.get_user_session(sess, self.cached, info)
+
+        try:
+            success, error = self.auth_repo.logout_all(user_sess)
+        except Exception as ex:
+            logging.getLogger(__name__).error('Error on logout_all_resolver', exc_info=ex)
+            success, error = False, self.ERRO_DESCONHECIDO
+
+        if success:
+            info.context.user_sessions.clear()
+
+        return {
+            'success': success,
+            'error': error
+        }
+
     @convert_kwargs_to_snake_case
-    def enviar_email_senha_resolver(self, *_, email: str, tipo: UserType):
-        sess = flask.g.session
+    def enviar_email_senha_resolver(self, _, info, email: str, tipo: UserType):
+        sess = self.get_db_session(info)
 
         try:
             success, error = self.auth_repo.enviar_email_senha(sess, email, tipo)
@@ -64,8 +105,8 @@ class AuthApi(BaseApi):
         }
 
     @convert_kwargs_to_snake_case
-    def recuperar_senha_resolver(self, *_, code: str, nova_senha: str):
-        sess = flask.g.session
+    def recuperar_senha_resolver(self, _, info, code: str, nova_senha: str):
+        sess = self.get_db_session(info)
 
         try:
             success, error = self.auth_repo.recuperar_senha(sess, nova_senha, code)
@@ -1,28 +1,44 @@
 from typing import Dict, Callable, Optional
 
-import flask
+from dependency_injector.wiring import Provide, inject
 from sqlalchemy.orm import Session
 
-from src.classes import UserSession, SimpleUserSession
-from src.services import Cached
+from src.classes import UserSession, SimpleUserSession, RequestContext
+from src.container import Container
+from src.services import Cached, SessionExpiration
 
 
 class BaseApi:
     SESS_TOKEN_GROUP = 'sess_token'
 
-    def __init__(self, queries: Dict[str, Callable], mutations: Dict[str, Callable]):
+    @inject
+    def __init__(self, queries: Dict[str, Callable], mutations: Dict[str, Callable],
+                 session_expiration: SessionExpiration = Provide[Container.session_expiration]):
         self.queries = queries
         self.mutations = mutations
+        self.session_expiration = session_expiration
+
+    @staticmethod
+    def get_db_session(info) -> Session:
+        context: RequestContext = info.context
+        return context.db_session
 
     def get_user_session(self, sess: Session, cached: Cached, info) -> Optional[UserSession]:
-        request: flask.Request = info.context
+        context: RequestContext = info.context
+
+        token = context.auth_token
+        if token is not None:
+            if token in context.user_sessions:
+                return context.user_sessions[token]
 
-        auth_header = request.headers.get('Authorization')
-        if auth_header is not None and auth_header.startswith('Bearer '):
-            token = auth_header[7:]
+            user_sess = None
             data: SimpleUserSession = cached.get(self.SESS_TOKEN_GROUP, token)
 
             if data is not None:
+                self.session_expiration.refresh(cached, token, data)
+
                 user_sess = UserSession.from_simple_user_sess(data)
                 user_sess.set_db_session(sess)
-                return user_sess
+
+            context.user_sessions[token] = user_sess
+            return user_sess
@@ -1,13 +1,16 @@
 import logging
+from typing import Optional
 
-import flask
 from ariadne import convert_kwargs_to_snake_case
 from dependency_injector.wiring import Provide
 from sqlalchemy.orm import Session
 
 from src.api.base import BaseApi
 from src.classes import Point
+from src.enums import BuscaOrderBy
+from src.models import Estacionamento
 from src.repo import BuscarEstacioRepo, RepoContainer
+from src.utils import load_options_from_info
 
 
 class BuscarEstacioApi(BaseApi):
@@ -20,11 +23,14 @@ class BuscarEstacioApi(BaseApi):
         super().__init__(queries, mutations)
 
     @convert_kwargs_to_snake_case
-    def buscar_estacio_resolver(self, *_, coordenadas: Point):
-        sess: Session = flask.g.session
+    def buscar_estacio_resolver(self, _, info, coordenadas: Point, limit: Optional[int] = None,
+                                order_by: Optional[BuscaOrderBy] = None):
+        sess: Session = self.get_db_session(info)
 
         try:
-            success, error_os_estacios = self.repo.buscar(sess, coordenadas)
+            load_options = load_options_from_info(info, Estacionamento, 'estacionamentos')
+            success, error_os_estacios = self.repo.buscar(sess, coordenadas, limit=limit, order_by=order_by,
+                                                          load_options=load_options)
         except Exception as ex:
             logging.getLogger(__name__).error('Error on buscar_estacio_resolver', exc_info=ex)
             success, error_os_estacios = False, 'erro_desconhecido'
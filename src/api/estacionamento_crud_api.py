@@ -1,17 +1,17 @@
 import logging
 from typing import Optional, Iterable
 
-import flask
 from ariadne import convert_kwargs_to_snake_case
 from dependency_injector.wiring import Provide
 from sqlalchemy.orm import Session
 
 from src.api.base import BaseApi
-from src.classes import ValorHoraInput, FileStream, FlaskFileStream
+from src.classes import ValorHoraInput, FileStream, make_file_stream
 from src.container import Container
-from src.models import HorarioPadrao, Endereco
+from src.models import HorarioPadrao, Endereco, Estacionamento
 from src.repo import EstacionamentoCrudRepo, RepoContainer
 from src.services import Cached
+from src.utils import load_options_from_info
 
 
 class EstacionamentoCrudApi(BaseApi):
@@ -24,6 +24,7 @@ class EstacionamentoCrudApi(BaseApi):
 
         queries = {
             'listEstacionamento': self.list_estacio_resolver,
+            'listEstacionamentoConnection': self.list_estacio_connection_resolver,
             'getEstacionamento': self.get_estacio_resolver
         }
         mutations = {
@@ -42,7 +43,7 @@ class EstacionamentoCrudApi(BaseApi):
         estacio_id: Optional[str] = None,
         descricao: Optional[str] = None
     ):
-        sess: Session = flask.g.session
+        sess: Session = self.get_db_session(info)
         user_sess = self.get_user_session(sess, self.cached, info)
 
         horario_padrao_real = HorarioPadrao.from_dict(horario_padrao)
@@ -77,7 +78,7 @@ class EstacionamentoCrudApi(BaseApi):
         foto: Optional[FileStream] = None,
         estacio_id: Optional[str] = None
     ):
-        sess: Session = flask.g.session
+        sess: Session = self.get_db_session(info)
         user_sess = self.get_user_session(sess, self.cached, info)
 
         end = fstream = None
@@ -93,7 +94,7 @@ class EstacionamentoCrudApi(BaseApi):
 
         try:
             if foto:
-                fstream = FlaskFileStream(foto)
+                fstream = make_file_stream(foto)
 
             success, error_or_estacio = self.repo.edit(user_sess, sess, nome=nome, telefone=telefone, endereco=end, total_vaga=total_vaga,
                                                        descricao=descricao, foto=fstream, estacio_id=estacio_id)
@@ -108,10 +109,11 @@ class EstacionamentoCrudApi(BaseApi):
 
     @convert_kwargs_to_snake_case
     def list_estacio_resolver(self, _, info, amount: int = 0, index: int = 0):
-        sess = flask.g.session
+        sess = self.get_db_session(info)
 
         try:
-            success, estacios_or_error = self.repo.list(sess, amount, index)
+            load_options = load_options_from_info(info, Estacionamento, 'estacionamentos')
+            success, estacios_or_error = self.repo.list(sess, amount, index, load_options=load_options)
         except Exception as ex:
             logging.getLogger(__name__).error('Error on list_estacio_resolver', exc_info=ex)
             success, estacios_or_error = False, self.ERRO_DESCONHECIDO
@@ -127,13 +129,30 @@ class EstacionamentoCrudApi(BaseApi):
                 'error': estacios_or_error
             }
 
+    @convert_kwargs_to_snake_case
+    def list_estacio_connection_resolver(self, _, info, first: Optional[int] = None, after: Optional[str] = None):
+        sess = self.get_db_session(info)
+
+        try:
+            load_options = load_options_from_info(info, Estacionamento, 'edges', 'node')
+            success, pagina_or_error = self.repo.list_page(sess, first=first, after=after, load_options=load_options)
+        except Exception as ex:
+            logging.getLogger(__name__).error('Error on list_estacio_connection_resolver', exc_info=ex)
+            success, pagina_or_error = False, self.ERRO_DESCONHECIDO
+
+        if success:
+            return {'success': True, **pagina_or_error.to_connection()}
+        else:
+            return {'success': False, 'error': pagina_or_error}
+
     @convert_kwargs_to_snake_case
     def get_estacio_resolver(self, _, info, estacio_id: Optional[str] = None):
-        sess: Session = flask.g.session
+        sess: Session = self.get_db_session(info)
         user_sess = self.get_user_session(sess, self.cached, info)
 
         try:
-            success, estacio_or_error = self.repo.get(user_sess, sess, estacio_id)
+            load_options = load_options_from_info(info, Estacionamento, 'estacionamento')
+            success, estacio_or_error = self.repo.get(user_sess, sess, estacio_id, load_options=load_options)
         except Exception as ex:
             logging.getLogger(__name__).error('Error on get_estacio_resolver', exc_info=ex)
             success, estacio_or_error = False, self.ERRO_DESCONHECIDO
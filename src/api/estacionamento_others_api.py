@@ -3,7 +3,6 @@ import datetime
 from typing import Optional
 from decimal import Decimal
 
-import flask
 from ariadne import convert_kwargs_to_snake_case
 from dependency_injector.wiring import Provide
 from sqlalchemy.orm import Session
@@ -35,7 +34,7 @@ class EstacionamentoOthersApi(BaseApi):
 
     @convert_kwargs_to_snake_case
     def atualizar_qtd_vaga_livre_resolver(self, _, info, num_vaga: int):
-        sess: Session = flask.g.session
+        sess: Session = self.get_db_session(info)
         user_sess = self.get_user_session(sess, self.cached, info)
 
         try:
@@ -57,7 +56,7 @@ class EstacionamentoOthersApi(BaseApi):
     @convert_kwargs_to_snake_case
     def edit_horario_padrao_resolver(self, _, info, dia: str, hora_abre: datetime.time, hora_fecha: datetime.time,
                                      estacio_id: Optional[str] = None):
-        sess: Session = flask.g.session
+        sess: Session = self.get_db_session(info)
         user_sess = self.get_user_session(sess, self.cached, info)
 
         try:
@@ -79,7 +78,7 @@ class EstacionamentoOthersApi(BaseApi):
 
     @convert_kwargs_to_snake_case
     def edit_valor_hora_resolver(self, _, info, veiculo_id: str, valor: Decimal, estacio_id: Optional[str] = None):
-        sess: Session = flask.g.session
+        sess: Session = self.get_db_session(info)
         user_sess = self.get_user_session(sess, self.cached, info)
 
         try:
@@ -101,7 +100,7 @@ class EstacionamentoOthersApi(BaseApi):
 
     @convert_kwargs_to_snake_case
     def delete_horario_padrao_resolver(self, _, info, dia: str, estacio_id: Optional[str] = None):
-        sess: Session = flask.g.session
+        sess: Session = self.get_db_session(info)
         user_sess = self.get_user_session(sess, self.cached, info)
 
         try:
@@ -117,7 +116,7 @@ class EstacionamentoOthersApi(BaseApi):
 
     @convert_kwargs_to_snake_case
     def delete_valor_hora_resolver(self, _, info, veiculo_id: str, estacio_id: Optional[str] = None):
-        sess: Session = flask.g.session
+        sess: Session = self.get_db_session(info)
         user_sess = self.get_user_session(sess, self.cached, info)
 
         try:
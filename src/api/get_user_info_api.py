@@ -1,4 +1,3 @@
-import flask
 from ariadne import convert_kwargs_to_snake_case
 from dependency_injector.wiring import Provide
 
@@ -21,7 +20,7 @@ class GetUserInfoApi(BaseApi):
 
     @convert_kwargs_to_snake_case
     def get_user_resolver(self, _, info):
-        sess = flask.g.session
+        sess = self.get_db_session(info)
         user_sess = self.get_user_session(sess, self.cached, info)
 
         if user_sess is None:
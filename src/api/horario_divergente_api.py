@@ -1,5 +1,4 @@
 import logging
-import flask
 import datetime
 from ariadne import convert_kwargs_to_snake_case
 from dependency_injector.wiring import Provide
@@ -29,7 +28,7 @@ class HorarioDivergenteApi(BaseApi):
 
     @convert_kwargs_to_snake_case
     def set_resolver(self, _, info, data: datetime.date, hora_abre: datetime.time, hora_fecha: datetime.time):
-        sess: Session = flask.g.session
+        sess: Session = self.get_db_session(info)
         user_sess = self.get_user_session(sess, self.cached, info)
 
         try:
@@ -51,7 +50,7 @@ class HorarioDivergenteApi(BaseApi):
 
     @convert_kwargs_to_snake_case
     def delete_resolver(self, _, info, data: datetime.date):
-        sess: Session = flask.g.session
+        sess: Session = self.get_db_session(info)
         user_sess = self.get_user_session(sess, self.cached, info)
 
         try:
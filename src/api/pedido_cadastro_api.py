@@ -1,19 +1,19 @@
 import logging
 from typing import Optional
 
-import flask
 from ariadne import convert_kwargs_to_snake_case
 from dependency_injector.wiring import Provide
 from sqlalchemy.orm import Session
 from werkzeug.datastructures import FileStorage
 
 from src.api.base import BaseApi
-from src.classes import FlaskFileStream
+from src.classes import make_file_stream
 from src.container import Container
 from src.enums import EstadosEnum
-from src.models import Endereco
+from src.models import Endereco, PedidoCadastro
 from src.repo import PedidoCadastroCrudRepo, RepoContainer
 from src.services import Cached
+from src.utils import load_options_from_info
 
 
 class PedidoCadastroApi(BaseApi):
@@ -26,6 +26,7 @@ class PedidoCadastroApi(BaseApi):
 
         queries = {
             'listPedidoCadastro': self.list_resolver,
+            'listPedidoCadastroConnection': self.list_connection_resolver,
             'getPedidoCadastro': self.get_resolver
         }
         mutations = {
@@ -37,7 +38,7 @@ class PedidoCadastroApi(BaseApi):
 
     @convert_kwargs_to_snake_case
     def create_resolver(self, _, info, nome: str, telefone: str, endereco: dict, foto: Optional[FileStorage] = None):
-        sess: Session = flask.g.session
+        sess: Session = self.get_db_session(info)
         user_sess = self.get_user_session(sess, self.cached, info)
 
         endereco = {k: v.strip() if isinstance(v, str) else v for k, v in endereco.items()}
@@ -49,7 +50,7 @@ class PedidoCadastroApi(BaseApi):
             return {'success': False, 'error': val_res}
 
         try:
-            fstream = FlaskFileStream(foto) if foto is not None else None
+            fstream = make_file_stream(foto)
             success, error_or_pedido = self.pedido_cad_crud_repo.create(user_sess, sess, nome, telefone, end, fstream)
         except Exception as ex:
             logging.getLogger(__name__).error('Error on create_resolver', exc_info=ex)
@@ -63,7 +64,7 @@ class PedidoCadastroApi(BaseApi):
     @convert_kwargs_to_snake_case
     def edit_resolver(self, _, info, nome: Optional[str] = None, telefone: Optional[str] = None,
                       endereco: Optional[dict] = None, foto: Optional[FileStorage] = None):
-        sess: Session = flask.g.session
+        sess: Session = self.get_db_session(info)
         user_sess = self.get_user_session(sess, self.cached, info)
 
         end = fstream = None
@@ -79,7 +80,7 @@ class PedidoCadastroApi(BaseApi):
 
         try:
             if foto:
-                fstream = FlaskFileStream(foto)
+                fstream = make_file_stream(foto)
 
             success, error_or_pedido = self.pedido_cad_crud_repo.edit(user_sess, sess, nome, telefone, end, fstream)
         except Exception as ex:
@@ -93,11 +94,13 @@ class PedidoCadastroApi(BaseApi):
 
     @convert_kwargs_to_snake_case
     def list_resolver(self, _, info, amount: int = 0, index: int = 0):
-        sess: Session = flask.g.session
+        sess: Session = self.get_db_session(info)
         user_sess = self.get_user_session(sess, self.cached, info)
 
         try:
-            success, error_or_pedidos = self.pedido_cad_crud_repo.list(user_sess, sess, amount=amount, index=index)
+            load_options = load_options_from_info(info, PedidoCadastro, 'pedidosCadastro')
+            success, error_or_pedidos = self.pedido_cad_crud_repo.list(user_sess, sess, amount=amount, index=index,
+                                                                        load_options=load_options)
         except Exception as ex:
             logging.getLogger(__name__).error('Error on list_resolver', exc_info=ex)
             success, error_or_pedidos = False, self.ERRO_DESCONHECIDO
@@ -107,13 +110,33 @@ class PedidoCadastroApi(BaseApi):
         else:
             return {'success': False, 'error': error_or_pedidos}
 
+    @convert_kwargs_to_snake_case
+    def list_connection_resolver(self, _, info, first: Optional[int] = None, after: Optional[str] = None):
+        sess: Session = self.get_db_session(info)
+        user_sess = self.get_user_session(sess, self.cached, info)
+
+        try:
+            load_options = load_options_from_info(info, PedidoCadastro, 'edges', 'node')
+            success, error_or_pagina = self.pedido_cad_crud_repo.list_page(user_sess, sess, first=first, after=after,
+                                                                            load_options=load_options)
+        except Exception as ex:
+            logging.getLogger(__name__).error('Error on list_connection_resolver', exc_info=ex)
+            success, error_or_pagina = False, self.ERRO_DESCONHECIDO
+
+        if success:
+            return {'success': True, **error_or_pagina.to_connection()}
+        else:
+            return {'success': False, 'error': error_or_pagina}
+
     @convert_kwargs_to_snake_case
     def get_resolver(self, _, info, pedido_id: Optional[str] = None):
-        sess: Session = flask.g.session
+        sess: Session = self.get_db_session(info)
         user_sess = self.get_user_session(sess, self.cached, info)
 
         try:
-            success, error_or_pedido = self.pedido_cad_crud_repo.get(user_sess, sess, pedido_id)
+            load_options = load_options_from_info(info, PedidoCadastro, 'pedidoCadastro')
+            success, error_or_pedido = self.pedido_cad_crud_repo.get(user_sess, sess, pedido_id,
+                                                                      load_options=load_options)
         except Exception as ex:
             logging.getLogger(__name__).error('Error on get_resolver', exc_info=ex)
             success, error_or_pedido = False, self.ERRO_DESCONHECIDO
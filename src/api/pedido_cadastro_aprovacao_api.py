@@ -1,6 +1,5 @@
 import logging
 
-import flask
 from ariadne import convert_kwargs_to_snake_case
 from dependency_injector.wiring import Provide
 from sqlalchemy.orm import Session
@@ -28,7 +27,7 @@ class PedidoCadastroAprovacaoApi(BaseApi):
 
     @convert_kwargs_to_snake_case
     def accept_resolver(self, _, info, pedido_id: str, coordenadas: Point):
-        sess: Session = flask.g.session
+        sess: Session = self.get_db_session(info)
         user_sess = self.get_user_session(sess, self.cached, info)
 
         try:
@@ -50,7 +49,7 @@ class PedidoCadastroAprovacaoApi(BaseApi):
 
     @convert_kwargs_to_snake_case
     def reject_resolver(self, _, info, pedido_id: str, motivo: str):
-        sess: Session = flask.g.session
+        sess: Session = self.get_db_session(info)
         user_sess = self.get_user_session(sess, self.cached, info)
 
         try:
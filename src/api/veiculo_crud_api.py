@@ -1,5 +1,4 @@
 import logging
-import flask
 from ariadne import convert_kwargs_to_snake_case
 from dependency_injector.wiring import Provide
 
@@ -21,8 +20,8 @@ class VeiculoCrudApi(BaseApi):
         super().__init__(queries, mutations)
 
     @convert_kwargs_to_snake_case
-    def get_resolver(self, _, _2, veiculo_id: str):
-        sess = flask.g.session
+    def get_resolver(self, _, info, veiculo_id: str):
+        sess = self.get_db_session(info)
 
         try:
             success, veiculo_or_error = self.repo.get(sess, veiculo_id)
@@ -42,8 +41,8 @@ class VeiculoCrudApi(BaseApi):
             }
 
     @convert_kwargs_to_snake_case
-    def list_resolver(self, _, _2):
-        sess = flask.g.session
+    def list_resolver(self, _, info):
+        sess = self.get_db_session(info)
 
         try:
             success, veiculos_or_error = self.repo.list(sess)
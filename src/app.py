@@ -8,18 +8,26 @@ from src.api import APIS
 from src.container import Container
 from src.graphql_server import setup_graphql_server
 from src.repo import RepoContainer
-from src.services import DbSessionMaker
+from src.services import DbSessionMaker, LazySession
 
 
 def create_app(container: Container, repo_container: RepoContainer):
     app = Flask(__name__)
+    # O werkzeug responde 413 antes de ler o multipart quando o Content-Length passa do limite
+    app.config['MAX_CONTENT_LENGTH'] = container.config.graphql.max_body_bytes.as_int()() or None
     app.container = container
     app.repo_container = repo_container
 
     graphql_schema_path = pathlib.Path(__file__).parent / 'schema.graphql'
-    setup_graphql_server(app, str(graphql_schema_path), APIS, {})
+    setup_graphql_server(app, str(graphql_schema_path), APIS, {}, container.document_cache(),
+                         container.persisted_queries(), container.query_cost(), container.read_your_writes(),
+                         container.config.graphql.max_age_get.as_int()())
 
     setup_db_connection(app, container.db_session_maker())
+    container.image_jobs().start_recovery()
+
+    if container.config.metricas.habilitado.as_int()():
+        setup_metrics(app, container)
 
     CORS(app, origins='*')
 
@@ -29,9 +37,18 @@ def create_app(container: Container, repo_container: RepoContainer):
 def setup_db_connection(app: Flask, session_maker: DbSessionMaker):
     @app.before_request
     def create_session():
-        flask.g.session = session_maker()
+        flask.g.session = LazySession(session_maker)
 
     @app.teardown_appcontext
     def shutdown_session(response_or_exc):
-        flask.g.session.rollback()
-        flask.g.session.close()
+        session = flask.g.pop('session', None)
+        if session is not None:
+            session.close_if_used()
+
+
+def setup_metrics(app: Flask, container: Container):
+    # Pool de conexoes e cache de documentos, para monitoramento. A rota nao tem autenticacao, deve ficar restrita
+    # a rede interna (proxy)
+    @app.route('/metrics', methods=['GET'])
+    def metrics():
+        return flask.jsonify(container.metrics().snapshot())
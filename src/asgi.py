@@ -0,0 +1,181 @@
+import pathlib
+from typing import Optional
+
+from ariadne.asgi import GraphQL
+from ariadne.exceptions import HttpError, HttpBadRequestError
+from graphql import GraphQLSchema
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.datastructures import Headers
+from starlette.requests import Request
+from starlette.responses import Response, PlainTextResponse, JSONResponse
+from starlette.routing import Route
+from starlette.types import ASGIApp, Scope, Receive, Send, Message
+
+from src.api import APIS
+from src.classes import RequestContext
+from src.container import Container
+from src.graphql_executor import execute_graphql, data_from_query_params, cache_control
+from src.graphql_server import make_schema
+from src.repo import RepoContainer
+from src.services import DbSessionMaker, DocumentCache, PersistedQueries, QueryCostAnalyzer, LazySession, \
+    ReadYourWrites
+
+
+class AsyncGraphQL(GraphQL):
+    def __init__(self, schema: GraphQLSchema, session_maker: DbSessionMaker,
+                 document_cache: Optional[DocumentCache] = None,
+                 persisted_queries: Optional[PersistedQueries] = None,
+                 query_cost: Optional[QueryCostAnalyzer] = None,
+                 read_your_writes: Optional[ReadYourWrites] = None, max_age_get: int = 0, **kwargs):
+        super().__init__(schema, context_value=self._make_context, **kwargs)
+        self.session_maker = session_maker
+        self.document_cache = document_cache
+        self.persisted_queries = persisted_queries
+        self.query_cost = query_cost
+        self.read_your_writes = read_your_writes
+        self.max_age_get = max_age_get
+
+    async def render_playground(self, request: Request) -> Response:
+        # GET com query (ou hash de APQ) executa a consulta, sem parametros continua mostrando o playground
+        if 'query' in request.query_params or 'extensions' in request.query_params:
+            return await self.graphql_http_server(request)
+
+        return await super().render_playground(request)
+
+    async def extract_data_from_request(self, request: Request):
+        if request.method == 'GET':
+            try:
+                return data_from_query_params(request.query_params)
+            except ValueError as error:
+                raise HttpBadRequestError('Invalid query parameters') from error
+
+        return await super().extract_data_from_request(request)
+
+    async def graphql_http_server(self, request: Request) -> Response:
+        try:
+            data = await self.extract_data_from_request(request)
+        except HttpError as error:
+            return PlainTextResponse(error.message or error.status, status_code=400)
+
+        # Mesmo ciclo de vida do modo Flask: uma sessao por requisicao, criada no primeiro uso e descartada no final
+        db_session = request.state.db_session = LazySession(self.session_maker)
+        try:
+            context_value = await self.get_context_for_request(request)
+            success, response = await execute_graphql(self.schema, data, context_value=context_value,
+                                                      debug=self.debug, document_cache=self.document_cache,
+                                                      persisted_queries=self.persisted_queries,
+                                                      query_cost=self.query_cost,
+                                                      read_your_writes=self.read_your_writes,
+                                                      query_only=request.method == 'GET')
+        finally:
+            if db_session.used:
+                await run_in_threadpool(db_session.close_if_used)
+
+        status_code = 200 if success else 400
+        json_response = JSONResponse(response, status_code=status_code)
+
+        if request.method == 'GET':
+            header = cache_control(success, response, request.headers, self.max_age_get)
+            if header is not None:
+                json_response.headers['Cache-Control'] = header
+                json_response.headers['Vary'] = 'Authorization'
+
+        return json_response
+
+    @staticmethod
+    def _make_context(request: Request) -> RequestContext:
+        remote_addr = request.client.host if request.client is not None else None
+        return RequestContext(request.headers, request.state.db_session, remote_addr)
+
+
+class CorpoMuitoGrande(Exception):
+    pass
+
+
+class LimiteCorpoMiddleware:
+    # Recusa com 413 corpos maiores que max_bytes: pelo Content-Length, ou contando os bytes enquanto chegam (chunked),
+    # antes do multipart ser todo lido para a memoria/disco
+    def __init__(self, app: ASGIApp, max_bytes: int = 0):
+        self.app = app
+        self.max_bytes = max_bytes
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope['type'] != 'http' or self.max_bytes <= 0:
+            await self.app(scope, receive, send)
+            return
+
+        content_length = Headers(scope=scope).get('content-length', '')
+        if content_length.isdigit() and int(content_length) > self.max_bytes:
+            await self._muito_grande(scope, receive, send)
+            return
+
+        recebidos = 0
+        respondeu = False
+
+        async def receive_limitado() -> Message:
+            nonlocal recebidos
+            message = await receive()
+            if message['type'] == 'http.request':
+                recebidos += len(message.get('body', b''))
+                if recebidos > self.max_bytes:
+                    raise CorpoMuitoGrande()
+
+            return message
+
+        async def send_marcando(message: Message):
+            nonlocal respondeu
+            respondeu = True
+            await send(message)
+
+        try:
+            await self.app(scope, receive_limitado, send_marcando)
+        except CorpoMuitoGrande:
+            if respondeu:
+                raise
+
+            await self._muito_grande(scope, receive, send)
+
+    async def _muito_grande(self, scope: Scope, receive: Receive, send: Send):
+        response = PlainTextResponse(f'Request body is larger than {self.max_bytes} bytes', status_code=413)
+        await response(scope, receive, send)
+
+
+def _metrics_endpoint(container: Container):
+    # Mesma rota do modo Flask (ver app.setup_metrics)
+    async def metrics(_: Request) -> Response:
+        return JSONResponse(container.metrics().snapshot())
+
+    return metrics
+
+
+def create_asgi_app(container: Container, repo_container: RepoContainer, debug: bool = False) -> Starlette:
+    graphql_schema_path = pathlib.Path(__file__).parent / 'schema.graphql'
+    schema = make_schema(str(graphql_schema_path), APIS, {}, async_resolvers=True)
+
+    graphql_app = AsyncGraphQL(schema, container.db_session_maker(), container.document_cache(),
+                               container.persisted_queries(), container.query_cost(),
+                               container.read_your_writes(), container.config.graphql.max_age_get.as_int()(),
+                               debug=debug)
+
+    routes = [Route('/graphql', graphql_app, methods=['GET', 'POST'])]
+    if container.config.metricas.habilitado.as_int()():
+        routes.append(Route('/metrics', _metrics_endpoint(container), methods=['GET']))
+
+    app = Starlette(
+        debug=debug,
+        routes=routes,
+        middleware=[
+            Middleware(CORSMiddleware, allow_origins=['*'], allow_methods=['*'], allow_headers=['*']),
+            Middleware(LimiteCorpoMiddleware, max_bytes=container.config.graphql.max_body_bytes.as_int()())
+        ]
+    )
+    app.state.container = container
+    app.state.repo_container = repo_container
+    app.state.document_cache = graphql_app.document_cache
+
+    container.image_jobs().start_recovery()
+
+    return app
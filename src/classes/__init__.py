@@ -1,5 +1,10 @@
 from src.classes.i_user import IUser
 from src.classes.user_session import UserSession, SimpleUserSession
-from src.classes.file_stream import FileStream, FlaskFileStream, MemoryFileStream
+from src.classes.file_stream import FileStream, FlaskFileStream, UploadFileStream, MemoryFileStream, \
+    ArquivoMuitoGrande, make_file_stream
 from src.classes.point import Point
 from src.classes.valor_hora_input import ValorHoraInput
+from src.classes.pagina import Pagina
+from src.classes.estacio_busca import EstacioBusca
+from src.classes.batch_loader import BatchLoader
+from src.classes.request_context import RequestContext
@@ -0,0 +1,79 @@
+from collections import defaultdict
+from typing import Any, List
+
+from sqlalchemy import inspect
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy.orm.interfaces import MANYTOONE, ONETOMANY
+from sqlalchemy.orm.state import InstanceState
+
+
+class BatchLoader:
+    MAX_IN = 500
+
+    def __init__(self, sess: Session):
+        self.sess = sess
+        self.num_batches = 0
+
+    def needs_load(self, obj, attr: str) -> bool:
+        # Objetos transientes (ou de outra sessao) e atributos ja carregados nao precisam de consulta
+        state: InstanceState = inspect(obj)
+        # Compara pelo hash_key porque self.sess pode ser um proxy (LazySession) da sessao real
+        return state.key is not None and state.session_id is not None and state.session_id == self.sess.hash_key \
+            and attr in state.unloaded
+
+    def load(self, obj, attr: str) -> Any:
+        if not self.needs_load(obj, attr):
+            return getattr(obj, attr)
+
+        state: InstanceState = inspect(obj)
+
+        prop = state.mapper.relationships.get(attr)
+        if prop is None or prop.secondary is not None or len(prop.local_remote_pairs) != 1 \
+                or prop.direction not in (MANYTOONE, ONETOMANY):
+            return getattr(obj, attr)
+
+        local_col, remote_col = prop.local_remote_pairs[0]
+        local_key = state.mapper.get_property_by_column(local_col).key
+        remote_key = prop.mapper.get_property_by_column(remote_col).key
+
+        if local_key in state.unloaded:
+            return getattr(obj, attr)
+
+        pendentes = [state]
+        for other in self.sess.identity_map.all_states():
+            if other is not state and other.mapper is state.mapper and attr in other.unloaded \
+                    and local_key not in other.unloaded and other.obj() is not None:
+                pendentes.append(other)
+
+        self._load_batch(prop, attr, local_key, remote_key, pendentes)
+        return getattr(obj, attr)
+
+    def _load_batch(self, prop, attr: str, local_key: str, remote_key: str, pendentes: List[InstanceState]):
+        self.num_batches += 1
+
+        chaves = list({s.dict[local_key] for s in pendentes} - {None})
+        remote_attr = getattr(prop.mapper.class_, remote_key)
+        order_by = prop.order_by or prop.mapper.primary_key
+
+        alvos = []
+        for i in range(0, len(chaves), self.MAX_IN):
+            alvos.extend(self.sess.query(prop.mapper).filter(
+                remote_attr.in_(chaves[i:i + self.MAX_IN])
+            ).order_by(*order_by).all())
+
+        if prop.direction == MANYTOONE:
+            por_chave = {getattr(a, remote_key): a for a in alvos}
+            for s in pendentes:
+                set_committed_value(s.obj(), attr, por_chave.get(s.dict[local_key]))
+        else:
+            por_chave = defaultdict(list)
+            for a in alvos:
+                por_chave[getattr(a, remote_key)].append(a)
+
+            for s in pendentes:
+                valores = por_chave.get(s.dict[local_key], [])
+                if prop.uselist:
+                    set_committed_value(s.obj(), attr, valores)
+                else:
+                    set_committed_value(s.obj(), attr, valores[0] if valores else None)
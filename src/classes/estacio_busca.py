@@ -0,0 +1,15 @@
+from typing import Any
+
+
+class EstacioBusca:
+    # Resultado da busca: o estacionamento e a distancia (em km) ate as coordenadas buscadas. A distancia fica aqui e
+    # nao no model, que e o mesmo objeto (identity map) para os outros resolvers da sessao
+    __slots__ = ('estacionamento', 'distancia')
+
+    def __init__(self, estacionamento: Any, distancia: float):
+        self.estacionamento = estacionamento
+        self.distancia = distancia
+
+    def __getattr__(self, name):
+        # Os outros campos do tipo Estacionamento sao resolvidos direto no model
+        return getattr(self.estacionamento, name)
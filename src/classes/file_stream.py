@@ -1,10 +1,16 @@
 from abc import ABC, abstractmethod
 from io import BytesIO
-from typing import Union
+from typing import Union, Optional, Dict
 
+from starlette.datastructures import UploadFile
 from werkzeug.datastructures import FileStorage
 
 
+class ArquivoMuitoGrande(Exception):
+    # Foto acima dos limites de bytes ou pixels do ImageProcessor
+    pass
+
+
 class FileStream(ABC):
     @abstractmethod
     def read(self, n: int = -1) -> Union[bytes, str]:
@@ -40,10 +46,31 @@ class FlaskFileStream(FileStream):
         return self.file_stream.tell()
 
 
+class UploadFileStream(FileStream):
+    def __init__(self, file: UploadFile):
+        # O arquivo e lido de forma sincrona, nos resolvers que ja rodam fora do event loop
+        self.file_stream = file.file
+
+    def read(self, n: int = -1) -> bytes:
+        return self.file_stream.read(n)
+
+    def write(self, buffer: bytes):
+        raise NotImplementedError
+
+    def seek(self, offset, whence=0):
+        self.file_stream.seek(offset, whence)
+
+    def tell(self) -> int:
+        return self.file_stream.tell()
+
+
 class MemoryFileStream(FileStream):
     def __init__(self, data: bytes = b''):
         self._stream = BytesIO(data)
 
+        # Versoes menores da mesma imagem, por largura, gravadas junto pelo Uploader
+        self.variants: Dict[int, MemoryFileStream] = {}
+
     def read(self, n: int = -1) -> bytes:
         return self._stream.read(n)
 
@@ -55,3 +82,12 @@ class MemoryFileStream(FileStream):
 
     def tell(self) -> int:
         return self._stream.tell()
+
+
+def make_file_stream(file: Union[FileStorage, UploadFile, None]) -> Optional[FileStream]:
+    if file is None:
+        return None
+    if isinstance(file, UploadFile):
+        return UploadFileStream(file)
+
+    return FlaskFileStream(file)
@@ -0,0 +1,17 @@
+from typing import List, Any
+
+
+class Pagina:
+    def __init__(self, itens: List[Any], cursores: List[str], tem_proxima: bool):
+        self.itens = itens
+        self.cursores = cursores
+        self.tem_proxima = tem_proxima
+
+    def to_connection(self) -> dict:
+        return {
+            'edges': [{'cursor': c, 'node': i} for c, i in zip(self.cursores, self.itens)],
+            'page_info': {
+                'has_next_page': self.tem_proxima,
+                'end_cursor': self.cursores[-1] if self.cursores else None
+            }
+        }
@@ -0,0 +1,34 @@
+import threading
+from typing import Mapping, Optional, Dict
+
+from sqlalchemy.orm import Session
+
+from src.classes.batch_loader import BatchLoader
+from src.classes.user_session import UserSession
+
+
+class RequestContext:
+    def __init__(self, headers: Mapping[str, str], db_session: Session, remote_addr: Optional[str] = None):
+        self.headers = headers
+        self.db_session = db_session
+        self.remote_addr = remote_addr
+        self.batch_loader = BatchLoader(db_session)
+
+        # Sessoes de usuario ja resolvidas nesta requisicao, por token
+        self.user_sessions: Dict[str, Optional[UserSession]] = {}
+
+        # A sessao do banco nao e thread-safe: no modo ASGI os resolvers da mesma requisicao rodam em threads
+        # diferentes e precisam usar a sessao um de cada vez
+        self.lock = threading.RLock()
+
+    @property
+    def auth_token(self) -> Optional[str]:
+        auth_header = self.headers.get('Authorization')
+        if auth_header is not None and auth_header.startswith('Bearer '):
+            return auth_header[7:]
+
+        return None
+
+    def run_locked(self, fn, *args, **kwargs):
+        with self.lock:
+            return fn(*args, **kwargs)
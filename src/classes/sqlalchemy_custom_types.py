@@ -1,4 +1,5 @@
 from decimal import Decimal
+from typing import Optional
 
 from sqlalchemy import func
 from sqlalchemy.sql.type_api import UserDefinedType
@@ -7,7 +8,15 @@ from src.classes.point import Point
 
 
 class PointType(UserDefinedType):
+    cache_ok = True
+
+    def __init__(self, srid: Optional[int] = None):
+        self.srid = srid
+
     def get_col_spec(self):
+        if self.srid is not None:
+            return f'POINT SRID {self.srid}'
+
         return 'POINT'
 
     def bind_expression(self, bindvalue):
@@ -1,14 +1,20 @@
 from typing import Optional
 
+from sqlalchemy.orm import joinedload
+
 from src.enums import UserType
 from src.models import AdminSistema, AdminEstacio
 from src.classes.i_user import IUser
 
 
 class SimpleUserSession:
-    def __init__(self, tipo: int, user_id: int):
+    # Valor padrao na classe para sessoes antigas (gravadas com pickle antes do campo existir)
+    criado_em: Optional[int] = None
+
+    def __init__(self, tipo: int, user_id: int, criado_em: Optional[int] = None):
         self.tipo: int = tipo
         self.user_id: int = user_id
+        self.criado_em = criado_em
 
 
 class UserSession:
@@ -19,17 +25,31 @@ class UserSession:
         self._user: Optional[IUser] = None
         self._sess = None
 
+        # Quantas vezes o usuario foi buscado no banco (uma por requisicao, ja que a sessao e reaproveitada)
+        self.user_loads = 0
+
     @property
     def user(self) -> Optional[IUser]:
+        return self.get_user()
+
+    def get_user(self, eager: bool = False) -> Optional[IUser]:
+        # eager traz estacionamento e pedido_cadastro do AdminEstacio na mesma query. Se o usuario ja foi carregado
+        # sem eles, as relacoes continuam sendo carregadas sob demanda
         if self._user is None:
             if self._sess is None:
                 raise RuntimeError('The database session was not set, so it is not possible to load the user. '
                                    'Remember to call set_db_session.')
 
             if self.tipo == UserType.SISTEMA:
-                return self._sess.query(AdminSistema).get(self.user_id)
+                query = self._sess.query(AdminSistema)
             else:
-                return self._sess.query(AdminEstacio).get(self.user_id)
+                query = self._sess.query(AdminEstacio)
+                if eager:
+                    query = query.options(joinedload(AdminEstacio.estacionamento),
+                                          joinedload(AdminEstacio.pedido_cadastro))
+
+            self.user_loads += 1
+            self._user = query.get(self.user_id)
 
         return self._user
 
@@ -41,10 +61,13 @@ class UserSession:
     def from_simple_user_sess(simple_user_sess: SimpleUserSession):
         return UserSession(UserType(simple_user_sess.tipo), simple_user_sess.user_id)
 
-    def to_simple_user_sess(self) -> SimpleUserSession:
-        return SimpleUserSession(self.tipo.value, self.user_id)
+    def to_simple_user_sess(self, criado_em: Optional[int] = None) -> SimpleUserSession:
+        return SimpleUserSession(self.tipo.value, self.user_id, criado_em)
 
     def set_db_session(self, sess):
+        if sess is not self._sess:
+            self._user = None
+
         self._sess = sess
 
     def __eq__(self, other):
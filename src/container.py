@@ -1,8 +1,11 @@
 from typing import Optional, List
 
 from dependency_injector import providers, containers
+from pymemcache import serde
 
-from src.services import DbEngine, DbSessionMaker, Crypto, Cached, LocalUploader, ImageProcessor, EmailSender, email_sender
+from src.services import DbEngine, DbSessionMaker, Crypto, Cached, LocalUploader, ImageProcessor, EmailSender, \
+    SpatialIndex, DocumentCache, PersistedQueries, QueryCostAnalyzer, CompactSerde, \
+    SessionExpiration, RateLimiter, ReadYourWrites, ImageJobs, ClientIp, Metrics
 
 
 def _choose_uploader(uploader_type: str, config: dict):
@@ -15,29 +18,105 @@ def _choose_uploader(uploader_type: str, config: dict):
     raise AttributeError(f'Unknown uploader type: {uploader_type}')
 
 
+def _choose_serde(serde_type: str):
+    if serde_type.upper() == 'COMPACT':
+        return CompactSerde()
+    if serde_type.upper() == 'PICKLE':
+        return serde.pickle_serde
+
+    raise AttributeError(f'Unknown cached serde: {serde_type}')
+
+
+def _split_list(value: str) -> List[str]:
+    return [x.strip() for x in value.split(',') if x.strip()]
+
+
+def _make_replicas(conn_strings: List[str], **kwargs) -> List[DbEngine]:
+    return [DbEngine(conn_string, **kwargs) for conn_string in conn_strings]
+
+
 class Container(containers.DeclarativeContainer):
     config = providers.Configuration(strict=True)
 
     db_engine = providers.Singleton(
         DbEngine,
-        conn_string=config.db.conn_string
+        conn_string=config.db.conn_string,
+        pool_mode=config.db.pool_mode,
+        pool_size=config.db.pool_size.as_int(),
+        max_overflow=config.db.max_overflow.as_int(),
+        pool_timeout=config.db.pool_timeout.as_float(),
+        pool_recycle=config.db.pool_recycle.as_int(),
+        pool_pre_ping=config.db.pool_pre_ping.as_int()
+    )
+
+    db_replicas = providers.Singleton(
+        _make_replicas,
+        conn_strings=providers.Callable(_split_list, config.db.replicas),
+        pool_mode=config.db.pool_mode,
+        pool_size=config.db.pool_size.as_int(),
+        max_overflow=config.db.max_overflow.as_int(),
+        pool_timeout=config.db.pool_timeout.as_float(),
+        pool_recycle=config.db.pool_recycle.as_int(),
+        pool_pre_ping=config.db.pool_pre_ping.as_int()
     )
 
     db_session_maker = providers.Singleton(
         DbSessionMaker,
-        engine=db_engine
+        engine=db_engine,
+        replicas=db_replicas
     )
 
-    crypto = providers.Factory(
+    crypto = providers.Singleton(
         Crypto,
         is_testing=config.crypto.is_testing.as_int(),
-        salt_rounds=config.crypto.salt_rounds.as_int()
+        salt_rounds=config.crypto.salt_rounds.as_int(),
+        num_workers=config.crypto.num_workers.as_int(),
+        max_fila=config.crypto.max_fila.as_int()
     )
 
     cached = providers.Singleton(
         Cached,
         host=config.memcached.host,
-        port=config.memcached.port.as_int()
+        port=config.memcached.port.as_int(),
+        l1_tamanho=config.memcached.l1_tamanho.as_int(),
+        l1_ttl=config.memcached.l1_ttl.as_float(),
+        l1_grupos=providers.Callable(_split_list, config.memcached.l1_grupos),
+        serde=providers.Callable(_choose_serde, config.memcached.serde)
+    )
+
+    session_expiration = providers.Singleton(
+        SessionExpiration,
+        ttl_absoluto=config.sessao.ttl_absoluto.as_int(),
+        ttl_deslizante=config.sessao.ttl_deslizante.as_int(),
+        intervalo_renovacao=config.sessao.intervalo_renovacao.as_int()
+    )
+
+    login_limiter_email = providers.Singleton(
+        RateLimiter,
+        cached=cached,
+        nome='email',
+        capacidade=config.login.rajada_email.as_int(),
+        por_minuto=config.login.por_minuto_email.as_float()
+    )
+
+    login_limiter_ip = providers.Singleton(
+        RateLimiter,
+        cached=cached,
+        nome='ip',
+        capacidade=config.login.rajada_ip.as_int(),
+        por_minuto=config.login.por_minuto_ip.as_float()
+    )
+
+    client_ip = providers.Singleton(
+        ClientIp,
+        header=config.login.header_ip,
+        num_proxies=config.login.proxies_confiaveis.as_int()
+    )
+
+    read_your_writes = providers.Singleton(
+        ReadYourWrites,
+        cached=cached,
+        janela=config.db.janela_primario.as_int()
     )
 
     uploader = providers.Singleton(
@@ -48,7 +127,22 @@ class Container(containers.DeclarativeContainer):
 
     image_processor = providers.Singleton(
         ImageProcessor,
-        default_img_format=config.image_processor.def_img_format
+        default_img_format=config.image_processor.def_img_format,
+        larguras_variantes=providers.Callable(_split_list, config.image_processor.larguras_variantes),
+        formatos=providers.Callable(_split_list, config.image_processor.formatos),
+        max_pixels=config.image_processor.max_pixels.as_int(),
+        max_bytes=config.image_processor.max_bytes.as_int()
+    )
+
+    image_jobs = providers.Singleton(
+        ImageJobs,
+        image_processor=image_processor,
+        uploader=uploader,
+        db_session_maker=db_session_maker,
+        num_workers=config.image_processor.num_workers.as_int(),
+        max_fila=config.image_processor.max_fila.as_int(),
+        width_foto=config.pedido_cadastro.width_foto.as_int(),
+        height_foto=config.pedido_cadastro.height_foto.as_int()
     )
 
     email_sender = providers.Singleton(
@@ -62,14 +156,47 @@ class Container(containers.DeclarativeContainer):
         timeout=config.email.timeout.as_int()
     )
 
+    spatial_index = providers.Singleton(
+        SpatialIndex,
+        tam_celula=config.busca_estacio.tam_celula_indice.as_float(),
+        ttl=config.busca_estacio.ttl_indice.as_int(),
+        raio_terra=config.busca_estacio.raio_terra.as_float()
+    )
+
+    document_cache = providers.Singleton(
+        DocumentCache,
+        max_size=config.graphql.tam_cache_documentos.as_int()
+    )
+
+    persisted_queries = providers.Singleton(
+        PersistedQueries,
+        cached=cached,
+        tam_local=config.graphql.tam_local_apq.as_int()
+    )
+
+    query_cost = providers.Singleton(
+        QueryCostAnalyzer,
+        custo_maximo=config.graphql.custo_maximo.as_int(),
+        tamanho_lista_padrao=config.graphql.tamanho_lista_padrao.as_int(),
+        fanout_padrao=config.graphql.fanout_padrao.as_int()
+    )
+
+    metrics = providers.Singleton(
+        Metrics,
+        db_engine=db_engine,
+        db_replicas=db_replicas,
+        document_cache=document_cache
+    )
+
 
 def create_container(config_filepath: str, extra_modules: Optional[List] = None):
     from src import services, api, repo
+    from src.api import base
 
     container = Container()
     container.config.from_ini(config_filepath)
 
-    modules = [services, api, repo]
+    modules = [services, api, base, repo]
     if extra_modules is not None:
         modules.extend(extra_modules)
 
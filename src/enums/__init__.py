@@ -1,8 +1,10 @@
 from src.enums.upload_status import UploadStatus
 from src.enums.estados_enum import EstadosEnum
 from src.enums.user_type import UserType
+from src.enums.busca_order_by import BuscaOrderBy
 
 GRAPHQL_SCHEMA_ENUMS = (
     EstadosEnum,
-    UserType
+    UserType,
+    BuscaOrderBy
 )
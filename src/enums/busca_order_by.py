@@ -0,0 +1,5 @@
+from enum import Enum
+
+
+class BuscaOrderBy(Enum):
+    DISTANCE = 1
@@ -0,0 +1,205 @@
+import hashlib
+import json
+from inspect import isawaitable
+from typing import Optional, Any, Tuple, List, Mapping
+
+from ariadne.format_error import format_error
+from ariadne.graphql import validate_data, parse_query, validate_query, handle_graphql_errors, handle_query_result
+from ariadne.types import GraphQLResult
+from graphql import GraphQLSchema, GraphQLError, DocumentNode, OperationType, execute, get_operation_ast
+from starlette.concurrency import run_in_threadpool
+
+from src.classes import RequestContext
+from src.services import DocumentCache, PersistedQueries, QueryCostAnalyzer, ReadYourWrites, LazySession
+
+ERRO_PERSISTED_QUERY_NOT_FOUND = 'PERSISTED_QUERY_NOT_FOUND'
+ERRO_PERSISTED_QUERY_NOT_SUPPORTED = 'PERSISTED_QUERY_NOT_SUPPORTED'
+ERRO_PERSISTED_QUERY_HASH_MISMATCH = 'PERSISTED_QUERY_HASH_MISMATCH'
+ERRO_OPERACAO_NAO_PERMITIDA = 'OPERATION_NOT_ALLOWED'
+
+
+def data_from_query_params(params: Mapping[str, str]) -> Optional[dict]:
+    # GET /graphql?query=...&variables=...&extensions=... (variables e extensions em JSON)
+    if 'query' not in params and 'extensions' not in params:
+        return None
+
+    data = {'query': params.get('query'), 'operationName': params.get('operationName')}
+    for key in ('variables', 'extensions'):
+        if params.get(key):
+            data[key] = json.loads(params[key])
+
+    return data
+
+
+def resolve_persisted_query(data: Any, persisted_queries: Optional[PersistedQueries]) -> Tuple[Any, Optional[str]]:
+    # Protocolo APQ do Apollo: o cliente manda apenas o hash e, se ele ainda nao for conhecido, reenvia com a query.
+    # Devolve tambem o hash a ser registrado, o que so acontece depois da query ser validada
+    if not isinstance(data, dict) or not isinstance(data.get('extensions'), dict):
+        return data, None
+
+    persisted_query = data['extensions'].get('persistedQuery')
+    if not isinstance(persisted_query, dict):
+        return data, None
+
+    if persisted_queries is None or persisted_query.get('version') != 1:
+        raise GraphQLError('PersistedQueryNotSupported', extensions={'code': ERRO_PERSISTED_QUERY_NOT_SUPPORTED})
+
+    sha256_hash = persisted_query.get('sha256Hash')
+    if not isinstance(sha256_hash, str):
+        raise GraphQLError('PersistedQueryNotFound', extensions={'code': ERRO_PERSISTED_QUERY_NOT_FOUND})
+
+    query = data.get('query')
+    if query is None:
+        query = persisted_queries.get(sha256_hash)
+        if query is None:
+            raise GraphQLError('PersistedQueryNotFound', extensions={'code': ERRO_PERSISTED_QUERY_NOT_FOUND})
+
+        return {**data, 'query': query}, None
+
+    if not isinstance(query, str) or hashlib.sha256(query.encode('utf-8')).hexdigest() != sha256_hash:
+        raise GraphQLError('provided sha does not match query', extensions={'code': ERRO_PERSISTED_QUERY_HASH_MISMATCH})
+
+    return data, sha256_hash
+
+
+def cache_control(success: bool, response: Any, headers: Mapping[str, str], max_age: int) -> Optional[str]:
+    # Cache-Control das respostas GET sem erros. Com token a resposta e do usuario, so o navegador dele pode guardar
+    if max_age <= 0 or not success or not isinstance(response, dict) or response.get('errors'):
+        return None
+
+    escopo = 'private' if headers.get('Authorization') else 'public'
+    return f'{escopo}, max-age={max_age}'
+
+
+def parse_and_validate(schema: GraphQLSchema, query: str,
+                       document_cache: Optional[DocumentCache] = None) -> Tuple[DocumentNode, List[GraphQLError]]:
+    # O resultado da validacao depende apenas do texto da query e do schema, entao pode ser reaproveitado
+    if document_cache is None:
+        document = parse_query(query)
+        return document, validate_query(schema, document)
+
+    key = document_cache.make_key(query)
+    cached = document_cache.get(key)
+    if cached is not None:
+        return cached
+
+    document = parse_query(query)
+    validation_errors = validate_query(schema, document)
+    document_cache.set(key, document, validation_errors)
+
+    return document, validation_errors
+
+
+def route_db_session(context: RequestContext, operation: OperationType, read_your_writes: ReadYourWrites):
+    # Queries leem das replicas e mutations escrevem no primario. Depois de uma mutation, as queries do mesmo
+    # token continuam no primario por um tempo, para enxergarem o que acabaram de escrever
+    db_session = context.db_session
+    if not isinstance(db_session, LazySession) or not db_session.has_replicas:
+        return
+
+    token = context.auth_token
+    if operation == OperationType.QUERY:
+        if token is None or not read_your_writes.recent_write(token):
+            db_session.use_replica()
+    elif token is not None:
+        read_your_writes.mark_write(token)
+
+
+def _prepare(schema: GraphQLSchema, data: Any, context_value: Any, document_cache: Optional[DocumentCache],
+             persisted_queries: Optional[PersistedQueries], query_cost: Optional[QueryCostAnalyzer],
+             read_your_writes: Optional[ReadYourWrites], query_only: bool,
+             custo: dict) -> Tuple[Any, Optional[DocumentNode], Optional[List[GraphQLError]]]:
+    # Tudo o que vem antes da execucao (APQ e read-your-writes no memcached, parse/validacao, custo e roteamento).
+    # No modo ASGI roda em uma thread
+    data, novo_hash = resolve_persisted_query(data, persisted_queries)
+    validate_data(data)
+
+    document, validation_errors = parse_and_validate(schema, data['query'], document_cache)
+    if validation_errors:
+        return data, None, validation_errors
+
+    operation = get_operation_ast(document, data.get('operationName'))
+    if query_only:
+        # Requisicoes GET podem ser cacheadas e repetidas pelo caminho, entao nao podem alterar nada
+        if operation is not None and operation.operation != OperationType.QUERY:
+            raise GraphQLError('Only query operations are allowed over GET',
+                               extensions={'code': ERRO_OPERACAO_NAO_PERMITIDA})
+
+    if query_cost is not None:
+        # O custo depende das variaveis (ex.: amount: $n), entao fica fora do cache de documentos
+        custo['requested'], cost_errors = query_cost.validate(schema, document, data.get('variables'),
+                                                              data.get('operationName'))
+        custo['maximum'] = query_cost.custo_maximo
+        if cost_errors:
+            return data, None, cost_errors
+
+    # So registra no APQ queries que passaram pela validacao, senao qualquer cliente enche o cache de lixo
+    if novo_hash is not None:
+        persisted_queries.set(novo_hash, data['query'])
+
+    if read_your_writes is not None and operation is not None and isinstance(context_value, RequestContext):
+        route_db_session(context_value, operation.operation, read_your_writes)
+
+    return data, document, None
+
+
+def _execute(schema: GraphQLSchema, data: Any, document: DocumentNode, context_value: Any):
+    return execute(schema, document, context_value=context_value, variable_values=data.get('variables'),
+                   operation_name=data.get('operationName'))
+
+
+def _with_cost(graphql_result: GraphQLResult, custo: dict) -> GraphQLResult:
+    success, response = graphql_result
+    if custo and isinstance(response, dict):
+        response.setdefault('extensions', {})['cost'] = custo
+
+    return success, response
+
+
+def execute_graphql_sync(schema: GraphQLSchema, data: Any, *, context_value: Any = None, debug: bool = False,
+                         document_cache: Optional[DocumentCache] = None,
+                         persisted_queries: Optional[PersistedQueries] = None,
+                         query_cost: Optional[QueryCostAnalyzer] = None,
+                         read_your_writes: Optional[ReadYourWrites] = None,
+                         query_only: bool = False) -> GraphQLResult:
+    custo = {}
+    try:
+        data, document, errors = _prepare(schema, data, context_value, document_cache, persisted_queries,
+                                          query_cost, read_your_writes, query_only, custo)
+        if errors:
+            return _with_cost(handle_graphql_errors(errors, logger=None, error_formatter=format_error, debug=debug),
+                              custo)
+
+        result = _execute(schema, data, document, context_value)
+        if isawaitable(result):
+            raise RuntimeError('GraphQL execution failed to complete synchronously.')
+    except GraphQLError as error:
+        return handle_graphql_errors([error], logger=None, error_formatter=format_error, debug=debug)
+
+    return _with_cost(handle_query_result(result, logger=None, error_formatter=format_error, debug=debug), custo)
+
+
+async def execute_graphql(schema: GraphQLSchema, data: Any, *, context_value: Any = None, debug: bool = False,
+                          document_cache: Optional[DocumentCache] = None,
+                          persisted_queries: Optional[PersistedQueries] = None,
+                          query_cost: Optional[QueryCostAnalyzer] = None,
+                          read_your_writes: Optional[ReadYourWrites] = None,
+                          query_only: bool = False) -> GraphQLResult:
+    custo = {}
+    try:
+        # Memcached (APQ e read-your-writes) e validacao bloqueiam, entao ficam fora do event loop; so a execucao
+        # e aguardada aqui
+        data, document, errors = await run_in_threadpool(_prepare, schema, data, context_value, document_cache,
+                                                         persisted_queries, query_cost, read_your_writes, query_only,
+                                                         custo)
+        if errors:
+            return _with_cost(handle_graphql_errors(errors, logger=None, error_formatter=format_error, debug=debug),
+                              custo)
+
+        result = _execute(schema, data, document, context_value)
+        if isawaitable(result):
+            result = await result
+    except GraphQLError as error:
+        return handle_graphql_errors([error], logger=None, error_formatter=format_error, debug=debug)
+
+    return _with_cost(handle_query_result(result, logger=None, error_formatter=format_error, debug=debug), custo)
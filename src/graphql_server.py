@@ -1,17 +1,27 @@
+import functools
 import json
 import datetime
+from inspect import isawaitable
 from decimal import Decimal
-from typing import Iterable
+from typing import Iterable, Optional
 
 import flask
-from ariadne import graphql_sync, combine_multipart_data, make_executable_schema, load_schema_from_path, EnumType, \
-    snake_case_fallback_resolvers, upload_scalar, ObjectType, ScalarType
+from ariadne import combine_multipart_data, make_executable_schema, load_schema_from_path, EnumType, \
+    snake_case_fallback_resolvers, upload_scalar, ObjectType, ScalarType, SnakeCaseFallbackResolversSetter, \
+    convert_camel_case_to_snake, resolve_to
 from ariadne.constants import PLAYGROUND_HTML
 from flask import Flask
+from graphql import GraphQLSchema, GraphQLField
+from sqlalchemy import inspect
+from sqlalchemy.orm.state import InstanceState
+from starlette.concurrency import run_in_threadpool
 
 from src.api.base import BaseApi
-from src.classes import Point
+from src.classes import Point, RequestContext, EstacioBusca
 from src.enums import GRAPHQL_SCHEMA_ENUMS
+from src.models import Upload
+from src.graphql_executor import execute_graphql_sync, data_from_query_params, cache_control
+from src.services import DocumentCache, PersistedQueries, QueryCostAnalyzer, ReadYourWrites
 from src.utils import time_from_total_seconds
 
 
@@ -64,28 +74,173 @@ def _get_scalars():
     return upload_scalar, point_scalar, time_scalar, date_scalar, decimal_scalar
 
 
-def setup_graphql_server(app: Flask, schema_path: str, api_list: Iterable[type], directive_dict):
+def _async_resolver(resolver):
+    # Roda o resolver sincrono (banco, memcached, SMTP, upload) em uma thread, sem bloquear o event loop
+    @functools.wraps(resolver)
+    async def wrapper(obj, info, **kwargs):
+        context: RequestContext = info.context
+        return await run_in_threadpool(context.run_locked, resolver, obj, info, **kwargs)
+
+    return wrapper
+
+
+def _model(obj):
+    # Resultados do buscarEstacio chegam embrulhados com a distancia, o lote e carregado no model
+    return obj.estacionamento if isinstance(obj, EstacioBusca) else obj
+
+
+def _batch_resolver(attr: str, async_resolvers: bool):
+    def resolver(obj, info):
+        context: RequestContext = info.context
+        return context.batch_loader.load(_model(obj), attr)
+
+    if not async_resolvers:
+        return resolver
+
+    async_resolver = _async_resolver(resolver)
+
+    def maybe_async_resolver(obj, info):
+        # So vai para a thread quando o lote ainda precisa ser consultado. A sessao continua sendo usada aqui, entao
+        # o lock tambem vale; se outro resolver estiver com ele, vai para a thread em vez de travar o event loop
+        context: RequestContext = info.context
+        if not context.lock.acquire(blocking=False):
+            return async_resolver(obj, info)
+
+        try:
+            if context.batch_loader.needs_load(_model(obj), attr):
+                return async_resolver(obj, info)
+
+            return resolver(obj, info)
+        finally:
+            context.lock.release()
+
+    return maybe_async_resolver
+
+
+def _fallback_resolver(attr: str):
+    # Campos sem resolver proprio leem direto do objeto. Atributos de models ainda nao carregados (ex.: expirados pelo
+    # commit de uma mutation) viram consulta, entao seguem o caminho dos relacionamentos: thread e lock da sessao
+    default_resolver = resolve_to(attr)
+    batch_resolver = _batch_resolver(attr, async_resolvers=True)
+
+    def resolver(obj, info, **kwargs):
+        state = inspect(_model(obj), raiseerr=False)
+        if not kwargs and isinstance(state, InstanceState) and attr not in state.dict and attr in state.unloaded:
+            return batch_resolver(obj, info)
+
+        return default_resolver(obj, info, **kwargs)
+
+    return resolver
+
+
+class _AsyncFallbackResolvers(SnakeCaseFallbackResolversSetter):
+    def add_resolver_to_field(self, field_name: str, field_object: GraphQLField) -> None:
+        if field_object.resolve is None:
+            field_object.resolve = _fallback_resolver(convert_camel_case_to_snake(field_name))
+
+
+def _foto_resolver(async_resolvers: bool):
+    # foto(size:) devolve o caminho da menor versao com pelo menos `size` de largura (ou da foto inteira)
+    base_resolver = _batch_resolver('foto', async_resolvers)
+
+    def caminho(foto: Optional[Upload], size: Optional[int]) -> Optional[str]:
+        return foto.caminho(size) if foto is not None else None
+
+    def resolver(obj, info, size: Optional[int] = None):
+        foto = base_resolver(obj, info)
+        if isawaitable(foto):
+            async def wait():
+                return caminho(await foto, size)
+
+            return wait()
+
+        return caminho(foto, size)
+
+    return resolver
+
+
+def _get_object_types(async_resolvers: bool):
+    # Relacionamentos carregados em lote para todos os objetos da resposta, evitando uma consulta por linha
+    estacionamento = ObjectType('Estacionamento')
+    for field, attr in (('endereco', 'endereco'), ('horarioPadrao', 'horario_padrao'),
+                        ('valoresHora', 'valores_hora'), ('horasDivergentes', 'horas_divergentes')):
+        estacionamento.set_field(field, _batch_resolver(attr, async_resolvers))
+    estacionamento.set_field('foto', _foto_resolver(async_resolvers))
+
+    valor_hora = ObjectType('ValorHora')
+    valor_hora.set_field('veiculo', _batch_resolver('veiculo', async_resolvers))
+
+    pedido_cadastro = ObjectType('PedidoCadastro')
+    for field, attr in (('endereco', 'endereco'), ('adminEstacio', 'admin_estacio')):
+        pedido_cadastro.set_field(field, _batch_resolver(attr, async_resolvers))
+    pedido_cadastro.set_field('foto', _foto_resolver(async_resolvers))
+
+    admin_estacio = ObjectType('AdminEstacio')
+    admin_estacio.set_field('estacionamento', _batch_resolver('estacionamento', async_resolvers))
+
+    return estacionamento, valor_hora, pedido_cadastro, admin_estacio
+
+
+def make_schema(schema_path: str, api_list: Iterable[type], directive_dict,
+                async_resolvers: bool = False) -> GraphQLSchema:
     query = ObjectType('Query')
     mutation = ObjectType('Mutation')
 
     for api_class in api_list:
         api: BaseApi = api_class()
         for name, resolver in api.queries.items():
-            query.set_field(name, resolver)
+            query.set_field(name, _async_resolver(resolver) if async_resolvers else resolver)
         for name, resolver in api.mutations.items():
-            mutation.set_field(name, resolver)
+            mutation.set_field(name, _async_resolver(resolver) if async_resolvers else resolver)
 
     enum_types = [EnumType(x.__name__, x) for x in GRAPHQL_SCHEMA_ENUMS]
 
     type_defs = load_schema_from_path(schema_path)
     scalars = _get_scalars()
+    object_types = _get_object_types(async_resolvers)
+    fallback_resolvers = _AsyncFallbackResolvers() if async_resolvers else snake_case_fallback_resolvers
+
+    return make_executable_schema(type_defs, query, mutation, *object_types, fallback_resolvers, *scalars,
+                                  *enum_types, directives=directive_dict)
 
-    schema = make_executable_schema(type_defs, query, mutation, snake_case_fallback_resolvers, *scalars, *enum_types,
-                                    directives=directive_dict)
+
+def setup_graphql_server(app: Flask, schema_path: str, api_list: Iterable[type], directive_dict,
+                         document_cache: Optional[DocumentCache] = None,
+                         persisted_queries: Optional[PersistedQueries] = None,
+                         query_cost: Optional[QueryCostAnalyzer] = None,
+                         read_your_writes: Optional[ReadYourWrites] = None, max_age_get: int = 0):
+    schema = make_schema(schema_path, api_list, directive_dict)
+    app.document_cache = document_cache
+
+    def execute(data, query_only: bool):
+        context = RequestContext(flask.request.headers, flask.g.session, flask.request.remote_addr)
+        success, result = execute_graphql_sync(schema, data, context_value=context, debug=app.debug,
+                                               document_cache=document_cache, persisted_queries=persisted_queries,
+                                               query_cost=query_cost, read_your_writes=read_your_writes,
+                                               query_only=query_only)
+
+        status_code = 200 if success else 400
+        response = flask.make_response(flask.jsonify(result), status_code)
+
+        if query_only:
+            header = cache_control(success, result, flask.request.headers, max_age_get)
+            if header is not None:
+                response.headers['Cache-Control'] = header
+                response.vary.add('Authorization')
+
+        return response
 
     @app.route('/graphql', methods=['GET'])
     def graphql_playground():
-        return PLAYGROUND_HTML, 200
+        try:
+            data = data_from_query_params(flask.request.args)
+        except ValueError:
+            return '', 400
+
+        if data is None:
+            return PLAYGROUND_HTML, 200
+
+        return execute(data, query_only=True)
 
     @app.route('/graphql', methods=['POST'])
     def graphql_server():
@@ -100,7 +255,4 @@ def setup_graphql_server(app: Flask, schema_path: str, api_list: Iterable[type],
         else:
             return '', 400
 
-        success, result = graphql_sync(schema, data, context_value=flask.request, debug=app.debug)
-
-        status_code = 200 if success else 400
-        return flask.jsonify(result), status_code
+        return execute(data, query_only=False)
@@ -1,6 +1,7 @@
 from typing import Optional
 
-from sqlalchemy import Column, SmallInteger, String, Enum
+from sqlalchemy import Column, SmallInteger, String, Enum, Computed, Index
+from sqlalchemy.orm import deferred
 
 from src.classes.point import Point
 from src.enums import EstadosEnum
@@ -24,6 +25,14 @@ class Endereco(Base):
     cep = Column(String(8), nullable=False)
     coordenadas = Column(PointType(), nullable=True)
 
+    # Indices SPATIAL do MySQL exigem uma coluna NOT NULL com SRID, entao a busca usa uma copia gerada das coordenadas
+    coordenadas_busca = deferred(Column(PointType(srid=0), Computed('IFNULL(coordenadas, POINT(0, 0))', persisted=True),
+                                        nullable=False))
+
+    __table_args__ = (
+        Index('idx_endereco_coordenadas_busca', 'coordenadas_busca', mysql_prefix='SPATIAL'),
+    )
+
     def __eq__(self, other):
         if self is other:
             return True
@@ -1,3 +1,5 @@
+from typing import List, Optional
+
 from sqlalchemy import Column, SmallInteger, String, Enum
 
 from src.enums import UploadStatus
@@ -11,6 +13,32 @@ class Upload(Base):
     nome_arquivo = Column(String(100), nullable=False)
     sub_dir = Column(String(100), nullable=False)
     status = Column(Enum(UploadStatus), nullable=False)
+    # Larguras das versoes menores gravadas junto com o arquivo, separadas por virgula
+    variantes = Column(String(100), nullable=True)
+
+    @property
+    def larguras_variantes(self) -> List[int]:
+        return [int(x) for x in self.variantes.split(',')] if self.variantes else []
+
+    def nome_variante(self, largura: Optional[int] = None) -> str:
+        if largura is None:
+            return self.nome_arquivo
+
+        nome, ponto, extensao = self.nome_arquivo.rpartition('.')
+        return f'{nome}_{largura}{ponto}{extensao}' if ponto else f'{self.nome_arquivo}_{largura}'
+
+    def caminho(self, size: Optional[int] = None) -> Optional[str]:
+        # Enquanto a foto espera o processamento so existe o arquivo enviado (sem conferir), e cancelada nao existe
+        if self.status != UploadStatus.CONCLUIDO:
+            return None
+
+        # Menor versao com pelo menos `size` de largura, ou o arquivo principal
+        largura = None
+        if size is not None:
+            maiores = [x for x in self.larguras_variantes if x >= size]
+            largura = min(maiores) if maiores else None
+
+        return f'{self.sub_dir}/{self.nome_variante(largura)}'
 
     def __hash__(self):
         return hash((self.id, self.nome_arquivo, self.sub_dir, self.status))
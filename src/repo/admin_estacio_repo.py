@@ -8,12 +8,13 @@ from src.container import Container
 from src.enums import UserType
 from src.models import AdminEstacio
 from src.classes import UserSession
-from src.services import Crypto
+from src.services import Crypto, CryptoOcupado
 
 
 class AdminEstacioRepo:
     EMAIL_JA_CADASTRADO = 'email_ja_cadastrado'
     SEM_PERMISSAO = 'sem_permissao'
+    ERRO_SERVIDOR_OCUPADO = 'servidor_ocupado'
     EMAIL_NOT_FOUND = 'email_not_found'
     ALREADY_ASSIGNED = 'admin_already_assigned'
 
@@ -34,6 +35,8 @@ class AdminEstacioRepo:
             sess.rollback()
 
             return False, self.EMAIL_JA_CADASTRADO
+        except CryptoOcupado:
+            return False, self.ERRO_SERVIDOR_OCUPADO
         except Exception:
             sess.rollback()
             raise
@@ -8,12 +8,13 @@ from src.container import Container
 from src.enums import UserType
 from src.models import AdminSistema
 from src.classes import UserSession
-from src.services import Crypto
+from src.services import Crypto, CryptoOcupado
 
 
 class AdminSistemaRepo:
     EMAIL_JA_CADASTRADO = 'email_ja_cadastrado'
     SEM_PERMISSAO = 'sem_permissao'
+    ERRO_SERVIDOR_OCUPADO = 'servidor_ocupado'
 
     @inject
     def __init__(self, crypto: Crypto = Provide[Container.crypto]):
@@ -35,6 +36,8 @@ class AdminSistemaRepo:
             sess.rollback()
 
             return False, self.EMAIL_JA_CADASTRADO
+        except CryptoOcupado:
+            return False, self.ERRO_SERVIDOR_OCUPADO
         except Exception:
             sess.rollback()
             raise
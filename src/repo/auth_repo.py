@@ -1,5 +1,6 @@
 from datetime import datetime
 import logging
+import time
 from typing import Optional, Tuple
 
 from dependency_injector.wiring import Provide, inject
@@ -9,7 +10,7 @@ from src.container import Container
 from src.enums import UserType
 from src.models import AdminSistema, AdminEstacio, SenhaRequest
 from src.classes import UserSession
-from src.services import Crypto, Cached
+from src.services import Crypto, Cached, SessionExpiration, CryptoOcupado, DbSessionMaker
 from src.services.email_sender import EmailSender
 
 
@@ -18,6 +19,8 @@ class AuthRepo:
     EMAIL_NAO_ENCONTRADO = 'email_nao_encontrado'
     ERRO_ENVIO_EMAIL = 'erro_envio_email'
     ERRO_CODIGO_INVALIDO = 'codigo_invalido'
+    SEM_PERMISSAO = 'sem_permissao'
+    ERRO_SERVIDOR_OCUPADO = 'servidor_ocupado'
 
     SESS_TOKEN_GROUP = 'sess_token'
     REVERSE_SESS_TOKEN_GROUP = 'rev_sess_token'
@@ -26,10 +29,14 @@ class AuthRepo:
 
     @inject
     def __init__(self, crypto: Crypto = Provide[Container.crypto], cached: Cached = Provide[Container.cached],
-                 email_sender: EmailSender = Provide[Container.email_sender]):
+                 email_sender: EmailSender = Provide[Container.email_sender],
+                 session_expiration: SessionExpiration = Provide[Container.session_expiration],
+                 db_session_maker: DbSessionMaker = Provide[Container.db_session_maker]):
         self.crypto = crypto
         self.cached = cached
         self.email_sender = email_sender
+        self.session_expiration = session_expiration
+        self.db_session_maker = db_session_maker
 
     def login(self, sess: Session, email: str, senha: str, tipo: UserType) -> Tuple[bool, str]:
         if tipo == UserType.SISTEMA:
@@ -42,18 +49,35 @@ class AuthRepo:
             ).filter(AdminEstacio.email == email).first()
 
         if admin is not None:
-            if self.crypto.check_password(senha.encode('utf8'), admin.senha):
-                reverse_key = self._gen_reverse_session_key(tipo, admin.id)
-                old_token = self.cached.get(self.REVERSE_SESS_TOKEN_GROUP, reverse_key)
+            try:
+                senha_correta = self.crypto.check_password(senha.encode('utf8'), admin.senha)
+            except CryptoOcupado:
+                return False, self.ERRO_SERVIDOR_OCUPADO
+
+            if senha_correta:
+                # Hash gerado com outro salt_rounds: atualiza para o custo atual sem atrasar o login
+                if self.crypto.needs_rehash(admin.senha):
+                    self.crypto.rehash_in_background(
+                        senha.encode('utf8'), admin.senha,
+                        lambda novo_hash: self._salvar_rehash_background(tipo, admin.id, admin.senha, novo_hash)
+                    )
 
-                if old_token is not None:
-                    self.cached.remove(self.SESS_TOKEN_GROUP, old_token)
+                reverse_key = self._gen_reverse_session_key(tipo, admin.id)
+                old_token, token = self._gen_token(reverse_key)
 
                 user_session = UserSession(tipo, admin.id)
-                token = self._gen_token(old_token)
+                criado_em = int(time.time())
 
-                self.cached.set(self.SESS_TOKEN_GROUP, token, user_session.to_simple_user_sess())
-                self.cached.set(self.REVERSE_SESS_TOKEN_GROUP, reverse_key, token)
+                self.cached.set_many({
+                    (self.SESS_TOKEN_GROUP, token): user_session.to_simple_user_sess(criado_em)
+                }, expire=self.session_expiration.expire(criado_em), noreply=False)
+                self.cached.set_many({
+                    (self.REVERSE_SESS_TOKEN_GROUP, reverse_key): token
+                }, expire=self.session_expiration.expire_reverse(), noreply=True)
+
+                # O token antigo nao e mais encontrado pelo reverso, entao nao precisa esperar a resposta
+                if old_token is not None:
+                    self.cached.delete_many([(self.SESS_TOKEN_GROUP, old_token)], noreply=True)
 
                 return True, token
             else:
@@ -61,6 +85,22 @@ class AuthRepo:
         else:
             return False, self.EMAIL_NAO_ENCONTRADO
 
+    def logout_all(self, user_sess: Optional[UserSession]) -> Tuple[bool, Optional[str]]:
+        if user_sess is None:
+            return False, self.SEM_PERMISSAO
+
+        # Cada usuario tem no maximo um token (o login troca o anterior), encontrado pela chave reversa
+        reverse_key = self._gen_reverse_session_key(user_sess.tipo, user_sess.user_id)
+        token = self.cached.get(self.REVERSE_SESS_TOKEN_GROUP, reverse_key)
+
+        keys = [(self.REVERSE_SESS_TOKEN_GROUP, reverse_key)]
+        if token is not None:
+            keys.append((self.SESS_TOKEN_GROUP, token))
+
+        self.cached.delete_many(keys)
+
+        return True, None
+
     def enviar_email_senha(self, sess: Session, email: str, tipo: UserType) -> Tuple[bool, Optional[str]]:
         code = self.crypto.random_hex_string(4)
         if tipo == UserType.ESTACIONAMENTO:
@@ -106,20 +146,46 @@ class AuthRepo:
         else:
             user = sess.query(AdminSistema).get(req.admin_sistema_fk)
 
-        user.senha = self.crypto.hash_password(nova_senha.encode('utf8'))
+        try:
+            user.senha = self.crypto.hash_password(nova_senha.encode('utf8'))
+        except CryptoOcupado:
+            return False, self.ERRO_SERVIDOR_OCUPADO
+
         sess.query(SenhaRequest).filter(SenhaRequest.code == code).delete()
 
         sess.commit()
 
         return True, None
 
+    def _salvar_rehash_background(self, tipo: UserType, admin_id: int, hash_antigo: bytes, novo_hash: bytes):
+        # Roda fora da requisicao, entao usa uma sessao propria
+        sess = self.db_session_maker()
+        try:
+            self._salvar_rehash(sess, tipo, admin_id, hash_antigo, novo_hash)
+        finally:
+            sess.close()
+
+    @staticmethod
+    def _salvar_rehash(sess: Session, tipo: UserType, admin_id: int, hash_antigo: bytes, novo_hash: bytes) -> bool:
+        model = AdminSistema if tipo == UserType.SISTEMA else AdminEstacio
+
+        # So troca se a senha nao mudou (ex.: recuperar_senha) enquanto o rehash rodava
+        count = sess.query(model).filter(model.id == admin_id, model.senha == hash_antigo) \
+            .update({model.senha: novo_hash}, synchronize_session=False)
+        sess.commit()
+
+        return count > 0
+
     @staticmethod
     def _gen_reverse_session_key(tipo: UserType, user_id: int) -> str:
         return str(tipo.value) + ':' + str(user_id)
 
-    def _gen_token(self, old_token: str) -> str:
-        token = None
-        while token is None or self.cached.contains(self.SESS_TOKEN_GROUP, token) or token == old_token:
+    def _gen_token(self, reverse_key: str) -> Tuple[Optional[str], str]:
+        # Busca o token antigo e confere se o novo ja existe na mesma ida ao memcached
+        while True:
             token = self.crypto.random_hex_string(16)
+            found = self.cached.get_many([(self.REVERSE_SESS_TOKEN_GROUP, reverse_key), (self.SESS_TOKEN_GROUP, token)])
 
-        return token
+            old_token = found.get((self.REVERSE_SESS_TOKEN_GROUP, reverse_key))
+            if (self.SESS_TOKEN_GROUP, token) not in found and token != old_token:
+                return old_token, token
@@ -1,20 +1,142 @@
-from typing import Tuple, Union, Iterable
+from typing import Tuple, Union, Iterable, List, Optional
 
+from dependency_injector.wiring import inject, Provide
 from sqlalchemy import func
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, Query
 
-from src.classes import Point
+from src.classes import Point, EstacioBusca
+from src.container import Container
+from src.enums import BuscaOrderBy
 from src.models import Estacionamento, Endereco
+from src.services import SpatialIndex
+from src.utils import delta_graus, RAIO_TERRA_PADRAO
 
 
 class BuscarEstacioRepo:
-    def __init__(self, distancia: int):
+    MODO_SQL = 'SQL'
+    MODO_BBOX = 'BBOX'
+    MODO_INDICE = 'INDICE'
+
+    INDICE_COORDENADAS = 'idx_endereco_coordenadas_busca'
+
+    ERRO_LIMIT_INVALIDO = 'limit_invalido'
+
+    @inject
+    def __init__(self, distancia: int, modo: str = MODO_SQL, raio_terra: float = RAIO_TERRA_PADRAO,
+                 limite_maximo: int = 0, spatial_index: SpatialIndex = Provide[Container.spatial_index]):
+        modo = modo.upper()
+        if modo not in (self.MODO_SQL, self.MODO_BBOX, self.MODO_INDICE):
+            raise AttributeError(f'Unknown search mode: {modo}')
+
         self.distance = distancia
+        self.modo = modo
+        self.raio_terra = raio_terra
+        self.limite_maximo = limite_maximo
+        self.spatial_index = spatial_index
 
-    def buscar(self, sess: Session, coordenadas: Point) -> Tuple[bool, Union[Iterable[Estacionamento], str]]:
-        st = f'POINT({coordenadas.x} {coordenadas.y})'
-        estacios = sess.query(Estacionamento).join(Endereco).filter(
-            func.ST_Distance_Sphere(Endereco.coordenadas, func.st_geomfromtext(st)) <= (self.distance * 1000)
-        ).all()
+    def buscar(self, sess: Session, coordenadas: Point, limit: Optional[int] = None,
+               order_by: Optional[BuscaOrderBy] = None,
+               load_options: Iterable = ()) -> Tuple[bool, Union[List[EstacioBusca], str]]:
+        if limit is not None and limit <= 0:
+            return False, self.ERRO_LIMIT_INVALIDO
+
+        if self.limite_maximo > 0 and (limit is None or limit > self.limite_maximo):
+            limit = self.limite_maximo
+
+        # Com limite a busca e sempre pelos k mais proximos, senao o resultado seria arbitrario
+        ordenar = order_by == BuscaOrderBy.DISTANCE or limit is not None
+
+        if self.modo == self.MODO_INDICE:
+            estacios = self._buscar_indice(sess, coordenadas, limit, ordenar, load_options)
+        else:
+            if self.modo == self.MODO_BBOX:
+                query = self.query_bbox(sess, coordenadas)
+            else:
+                query = self._query_sql(sess, coordenadas)
+
+            query = query.options(*load_options)
+
+            if ordenar:
+                query = query.order_by(self._distancia(coordenadas), Estacionamento.id)
+            if limit is not None:
+                query = query.limit(limit)
+
+            estacios = self._com_distancia(query.all())
 
         return True, estacios
+
+    def query_bbox(self, sess: Session, coordenadas: Point, forcar_indice: bool = True) -> Query:
+        # Os Point sao gravados como (lat, lon): x e a latitude
+        x, y = float(coordenadas.x), float(coordenadas.y)
+        d_x, d_y = delta_graus(x, self.distance, self.raio_terra)
+
+        x_min, x_max, y_min, y_max = x - d_x, x + d_x, y - d_y, y + d_y
+        bbox = f'POLYGON(({x_min} {y_min}, {x_max} {y_min}, {x_max} {y_max}, {x_min} {y_max}, {x_min} {y_min}))'
+
+        # O MBRContains usa o indice SPATIAL e o ST_Distance_Sphere so e calculado para quem esta dentro da caixa.
+        # O FORCE INDEX evita que o otimizador troque o indice por um full scan em tabelas pequenas
+        query = self._query_base(sess, coordenadas)
+        if forcar_indice:
+            query = query.with_hint(Endereco, f'FORCE INDEX ({self.INDICE_COORDENADAS})', 'mysql')
+
+        return query.filter(
+            func.MBRContains(func.ST_GeomFromText(bbox), Endereco.coordenadas_busca),
+            self._filtro_distancia(coordenadas)
+        )
+
+    def _query_sql(self, sess: Session, coordenadas: Point) -> Query:
+        return self._query_base(sess, coordenadas).filter(self._filtro_distancia(coordenadas))
+
+    def _query_base(self, sess: Session, coordenadas: Point) -> Query:
+        distancia_km = (self._distancia(coordenadas) / 1000).label('distancia')
+        return sess.query(Estacionamento, distancia_km).join(Endereco)
+
+    def _distancia(self, coordenadas: Point):
+        # Os Point sao gravados como (lat, lon), mas sem SRID o ST_Distance_Sphere le o x como longitude
+        coluna = func.Point(func.ST_Y(Endereco.coordenadas), func.ST_X(Endereco.coordenadas))
+        st = f'POINT({coordenadas.y} {coordenadas.x})'
+        return func.ST_Distance_Sphere(coluna, func.st_geomfromtext(st), self.raio_terra * 1000)
+
+    def _filtro_distancia(self, coordenadas: Point):
+        return self._distancia(coordenadas) <= (self.distance * 1000)
+
+    @staticmethod
+    def _com_distancia(rows: Iterable[Tuple[Estacionamento, float]]) -> List[EstacioBusca]:
+        return [EstacioBusca(estacio, float(distancia)) for estacio, distancia in rows]
+
+    def _buscar_indice(self, sess: Session, coordenadas: Point, limit: Optional[int], ordenar: bool,
+                       load_options: Iterable = ()) -> List[EstacioBusca]:
+        if self.spatial_index.needs_rebuild():
+            self.rebuild_index(sess)
+
+        if limit is not None:
+            pares = self.spatial_index.nearest(coordenadas, limit, self.distance)
+        else:
+            pares = self.spatial_index.query_radius(coordenadas, self.distance)
+            if ordenar:
+                pares.sort(key=lambda p: (p[1], p[0]))
+
+        if not pares:
+            return []
+
+        distancias = dict(pares)
+        estacios = sess.query(Estacionamento).options(*load_options).filter(
+            Estacionamento.id.in_(distancias.keys())
+        ).all()
+        por_id = {e.id: e for e in estacios}
+
+        # Mantem a ordem devolvida pelo indice e ignora ids que nao existem mais no banco
+        ret = []
+        for estacio_id, distancia in pares:
+            estacio = por_id.get(estacio_id)
+            if estacio is not None:
+                ret.append(EstacioBusca(estacio, distancia))
+
+        return ret
+
+    def rebuild_index(self, sess: Session):
+        rows = sess.query(Estacionamento.id, Endereco.coordenadas).join(Endereco).filter(
+            Endereco.coordenadas != None
+        ).all()
+
+        self.spatial_index.build(rows)
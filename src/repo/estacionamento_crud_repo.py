@@ -1,20 +1,19 @@
 from typing import Optional, Iterable, Tuple, Union
-import logging
 
-from uuid import uuid4
 from dependency_injector.wiring import Provide, inject
 from sqlalchemy.orm import Session
 
-from src.classes import UserSession, ValorHoraInput, FileStream
+from src.classes import UserSession, ValorHoraInput, FileStream, Pagina
 from src.enums import UserType
 from src.exceptions import ValidationError
 from src.models import HorarioPadrao, Estacionamento, Endereco, Upload
-from src.services import Uploader, ImageProcessor
+from src.services import Uploader, ImageProcessor, SpatialIndex, ImageJobs
 from src.container import Container
-from src.utils import validate_telefone
+from src.repo.foto_upload import FotoUploadMixin
+from src.utils import validate_telefone, encode_cursor, decode_cursor, keyset_paginate, tamanho_pagina
 
 
-class EstacionamentoCrudRepo:
+class EstacionamentoCrudRepo(FotoUploadMixin):
     ERRO_TOTAL_VAGA_INV = 'total_vaga_nao_positivo'
     ERRO_HORA_P_INV = 'hora_padrao_fecha_depois_de_abrir'
     ERRO_DESC_GRANDE = 'descricao_muito_grande'
@@ -28,24 +27,30 @@ class EstacionamentoCrudRepo:
     TEL_MUITO_GRANDE = 'telefone_muito_grande'
     TEL_FORMATO_INV = 'telefone_formato_invalido'
     TEL_SEM_COD_INTER = 'telefone_sem_cod_internacional'
-    FOTO_FORMATO_INVALIDO = 'foto_formato_invalido'
-    FOTO_PROCESSING_ERRO = 'foto_processing_error'
-    ERRO_UPLOAD = 'upload_error'
+    ERRO_FIRST_INVALIDO = 'first_invalido'
+    ERRO_CURSOR_INVALIDO = 'cursor_invalido'
 
     GROUP_UPLOAD_FOTO = 'foto_estacio'
+    CURSOR_TIPO = 'Estacionamento'
 
     @inject
     def __init__(
         self,
         width_foto: int,
         height_foto: int,
-        uploader: Uploader = Provide[Container.uploader], 
-        image_proc: ImageProcessor = Provide[Container.image_processor]
+        tamanho_max_pagina: int = 0,
+        uploader: Uploader = Provide[Container.uploader],
+        image_proc: ImageProcessor = Provide[Container.image_processor],
+        spatial_index: SpatialIndex = Provide[Container.spatial_index],
+        image_jobs: ImageJobs = Provide[Container.image_jobs]
     ) -> None:
         self.width_foto = width_foto
         self.height_foto = height_foto
+        self.tamanho_max_pagina = tamanho_max_pagina
         self.uploader = uploader
         self.image_processor = image_proc
+        self.spatial_index = spatial_index
+        self.image_jobs = image_jobs
 
     def create(
         self, user_sess: UserSession, sess: Session,
@@ -58,7 +63,7 @@ class EstacionamentoCrudRepo:
         if user_sess is None:
             return False, self.ERRO_SEM_PERMISSAO
 
-        adm = user_sess.user            
+        adm = user_sess.get_user(eager=True)
         if user_sess.tipo == UserType.SISTEMA:
             estacio: Estacionamento = sess.query(Estacionamento).get(estacio_id)
         else:
@@ -114,7 +119,7 @@ class EstacionamentoCrudRepo:
         if user_sess is None:
             return False, self.ERRO_SEM_PERMISSAO
         
-        adm = user_sess.user
+        adm = user_sess.get_user(eager=True)
 
         if user_sess.tipo != UserType.ESTACIONAMENTO:
             estacio = sess.query(Estacionamento).get(estacio_id)
@@ -153,20 +158,9 @@ class EstacionamentoCrudRepo:
             estacio.descricao = None if descricao == '' else descricao
 
         if foto is not None:
-            try:
-                fstream = self.image_processor.compress(foto, self.width_foto, self.height_foto)
-            except AttributeError:
-                return False, self.FOTO_FORMATO_INVALIDO
-            except Exception as ex:
-                logging.getLogger(__name__).error('edit(): Image processing error.', exc_info=ex)
-                return False, self.FOTO_PROCESSING_ERRO
-
-            try:
-                fname = str(uuid4()) + '.' + self.image_processor.get_default_image_format()
-                upload = self.uploader.upload(fstream, self.GROUP_UPLOAD_FOTO, fname)
-            except Exception as ex:
-                logging.getLogger(__name__).error('edit(): Upload error.', exc_info=ex)
-                return False, self.ERRO_UPLOAD
+            success_upload, upload = self._process_and_upload(foto, self.GROUP_UPLOAD_FOTO, 'edit()')
+            if not success_upload:
+                return False, upload
 
             ori_id = int(estacio.foto_fk)
             self.uploader.delete(estacio.foto)
@@ -176,14 +170,22 @@ class EstacionamentoCrudRepo:
 
         sess.commit()
 
+        if foto is not None:
+            self._submit_if_pending(estacio.foto)
+
+        if endereco is not None:
+            self.spatial_index.update(estacio.id, estacio.endereco.coordenadas)
+
         return True, estacio
 
-    def list(self, sess: Session, amount: int = 0, index: int = 0) -> Tuple[bool, Union[str, Iterable[Estacionamento]]]:
+    def list(self, sess: Session, amount: int = 0, index: int = 0,
+             load_options: Iterable = ()) -> Tuple[bool, Union[str, Iterable[Estacionamento]]]:
         if index < 0:
             return True, tuple()
 
-        query = sess.query(Estacionamento).offset(index)
+        query = sess.query(Estacionamento).options(*load_options).offset(index)
 
+        amount = tamanho_pagina(amount, self.tamanho_max_pagina)
         if amount > 0:
             query = query.limit(amount)
 
@@ -191,14 +193,32 @@ class EstacionamentoCrudRepo:
 
         return True, estacios
 
-    def get(self, user_sess: UserSession, sess: Session, estacio_id: Optional[str] = None) -> Tuple[bool, Union[str, Estacionamento]]:
+    def list_page(self, sess: Session, first: Optional[int] = None, after: Optional[str] = None,
+                  load_options: Iterable = ()) -> Tuple[bool, Union[str, Pagina]]:
+        if first is not None and first <= 0:
+            return False, self.ERRO_FIRST_INVALIDO
+
+        after_id = None
+        if after is not None:
+            after_id = decode_cursor(self.CURSOR_TIPO, after)
+            if after_id is None:
+                return False, self.ERRO_CURSOR_INVALIDO
+
+        estacios, tem_proxima = keyset_paginate(sess.query(Estacionamento).options(*load_options), Estacionamento.id,
+                                                tamanho_pagina(first or 0, self.tamanho_max_pagina), after_id)
+        cursores = [encode_cursor(self.CURSOR_TIPO, e.id) for e in estacios]
+
+        return True, Pagina(estacios, cursores, tem_proxima)
+
+    def get(self, user_sess: UserSession, sess: Session, estacio_id: Optional[str] = None,
+            load_options: Iterable = ()) -> Tuple[bool, Union[str, Estacionamento]]:
         if estacio_id is None:
             if user_sess is not None and user_sess.tipo == UserType.ESTACIONAMENTO:
-                estacio = user_sess.user.estacionamento
+                estacio = user_sess.get_user(eager=True).estacionamento
             else:
                 estacio = None
         else:
-            estacio = sess.query(Estacionamento).get(estacio_id)
+            estacio = sess.query(Estacionamento).options(*load_options).get(estacio_id)
         
         if estacio is None:
             return False, self.ERRO_ESTACIO_NAO_ENCONTRADO
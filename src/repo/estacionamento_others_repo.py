@@ -38,7 +38,7 @@ class EstacionamentoOthersRepo:
         if user_sess.tipo != UserType.ESTACIONAMENTO:
             return False, self.ERRO_SEM_ESTACIO
 
-        estacio = user_sess.user.estacionamento
+        estacio = user_sess.get_user(eager=True).estacionamento
         if estacio is None:
             return False, self.ERRO_SEM_ESTACIO
 
@@ -62,7 +62,7 @@ class EstacionamentoOthersRepo:
             return False, self.ERRO_FECHA_ANTES_DE_ABRIR
 
         if user_sess.tipo == UserType.ESTACIONAMENTO:
-            estacio = user_sess.user.estacionamento
+            estacio = user_sess.get_user(eager=True).estacionamento
         else:
             estacio = sess.query(Estacionamento).get(estacio_id)
 
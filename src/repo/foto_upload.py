@@ -0,0 +1,70 @@
+import logging
+from typing import Tuple, Union, Optional
+from uuid import uuid4
+
+from src.classes import FileStream, ArquivoMuitoGrande
+from src.enums import UploadStatus
+from src.models import Upload
+from src.services import Uploader, ImageProcessor, ImageJobs
+
+
+class FotoUploadMixin:
+    # Upload das fotos dos repos de PedidoCadastro e Estacionamento, com os mesmos erros nos dois
+    FOTO_FORMATO_INVALIDO = 'foto_formato_invalido'
+    FOTO_MUITO_GRANDE = 'foto_muito_grande'
+    FOTO_PROCESSING_ERRO = 'foto_processing_error'
+    ERRO_UPLOAD = 'upload_error'
+
+    uploader: Uploader
+    image_processor: ImageProcessor
+    image_jobs: ImageJobs
+    width_foto: int
+    height_foto: int
+
+    def _process_and_upload(self, foto: FileStream, sub_group: str, log: str) -> Tuple[bool, Union[str, Upload]]:
+        if self.image_jobs.enabled:
+            return self._upload_pending(foto, sub_group, log)
+
+        try:
+            ret = self.image_processor.compress(foto, self.width_foto, self.height_foto)
+        except ArquivoMuitoGrande:
+            return False, self.FOTO_MUITO_GRANDE
+        except AttributeError:
+            return False, self.FOTO_FORMATO_INVALIDO
+        except Exception as ex:
+            logging.getLogger(__name__).error(f'{log}: Image processing error.', exc_info=ex)
+            return False, self.FOTO_PROCESSING_ERRO
+
+        try:
+            fname = str(uuid4()) + '.' + self.image_processor.get_default_image_format()
+            upload = self.uploader.upload(ret, sub_group, fname)
+        except Exception as ex:
+            logging.getLogger(__name__).error(f'{log}: Upload error.', exc_info=ex)
+            return False, self.ERRO_UPLOAD
+
+        return True, upload
+
+    def _upload_pending(self, foto: FileStream, sub_group: str, log: str) -> Tuple[bool, Union[str, Upload]]:
+        # So confere o cabecalho e guarda a foto original, o processamento fica para os workers
+        try:
+            self.image_processor.check(foto)
+        except ArquivoMuitoGrande:
+            return False, self.FOTO_MUITO_GRANDE
+        except AttributeError:
+            return False, self.FOTO_FORMATO_INVALIDO
+        except Exception as ex:
+            logging.getLogger(__name__).error(f'{log}: Image processing error.', exc_info=ex)
+            return False, self.FOTO_PROCESSING_ERRO
+
+        try:
+            upload = self.image_jobs.store_pending(foto, sub_group)
+        except Exception as ex:
+            logging.getLogger(__name__).error(f'{log}: Upload error.', exc_info=ex)
+            return False, self.ERRO_UPLOAD
+
+        return True, upload
+
+    def _submit_if_pending(self, upload: Optional[Upload]):
+        # Depois do commit, para o worker encontrar o upload
+        if upload is not None and upload.status == UploadStatus.EM_ANDAMENTO:
+            self.image_jobs.submit(upload.id, self.width_foto, self.height_foto)
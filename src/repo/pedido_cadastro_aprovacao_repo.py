@@ -1,16 +1,23 @@
 from typing import Tuple, Union, Optional
 
+from dependency_injector.wiring import inject, Provide
 from sqlalchemy.orm import Session
 
 from src.classes import UserSession, Point
+from src.container import Container
 from src.enums import UserType
 from src.models import Estacionamento, PedidoCadastro, HorarioPadrao, AdminEstacio
+from src.services import SpatialIndex
 
 
 class PedidoCadastroAprovacaoRepo:
     ERRO_SEM_PERMISSAO = 'sem_permissao'
     ERRO_PEDIDO_NAO_ENCONTRADO = 'pedido_nao_encontrado'
 
+    @inject
+    def __init__(self, spatial_index: SpatialIndex = Provide[Container.spatial_index]):
+        self.spatial_index = spatial_index
+
     def accept(self, user_sess: UserSession, sess: Session, pedido_id: str, coordenadas: Point) \
             -> Tuple[bool, Union[Estacionamento, str]]:
         if user_sess is None or user_sess.tipo != UserType.SISTEMA:
@@ -34,6 +41,8 @@ class PedidoCadastroAprovacaoRepo:
         sess.delete(pedido)
         sess.commit()
 
+        self.spatial_index.update(estacio.id, coordenadas)
+
         return True, estacio
 
     def reject(self, user_sess: UserSession, sess: Session, pedido_id: str, motivo: str) -> Tuple[bool, Optional[str]]:
@@ -1,19 +1,19 @@
 import logging
 from typing import Tuple, Union, Iterable, Optional
-from uuid import uuid4
 
 from dependency_injector.wiring import Provide, inject
 from sqlalchemy.orm import Session
 
-from src.classes import UserSession, FileStream
+from src.classes import UserSession, FileStream, Pagina
 from src.container import Container
 from src.enums import UserType
 from src.models import Endereco, PedidoCadastro, AdminEstacio, Upload
-from src.services import Uploader, ImageProcessor
-from src.utils import validate_telefone
+from src.services import Uploader, ImageProcessor, ImageJobs
+from src.repo.foto_upload import FotoUploadMixin
+from src.utils import validate_telefone, encode_cursor, decode_cursor, keyset_paginate, tamanho_pagina
 
 
-class PedidoCadastroCrudRepo:
+class PedidoCadastroCrudRepo(FotoUploadMixin):
     UPLOAD_GROUP = 'foto_estacio'
     ERRO_SEM_PERMISSAO = 'sem_permissao'
     ERRO_PEDIDO_NAO_ENCONTRADO = 'pedido_nao_encontrado'
@@ -21,13 +21,14 @@ class PedidoCadastroCrudRepo:
     TEL_FORMATO_INV = 'telefone_formato_invalido'
     TEL_SEM_COD_INTER = 'telefone_sem_cod_internacional'
     TEL_MUITO_GRANDE = 'telefone_muito_grande'
-    FOTO_FORMATO_INVALIDO = 'foto_formato_invalido'
-    ERRO_UPLOAD = 'upload_error'
     LIMITE_PEDIDO_ERRO = 'limite_pedido_atingido'
-    FOTO_PROCESSING_ERRO = 'foto_processing_error'
     ERRO_SEM_PEDIDO = 'sem_pedido'
     ERRO_LIMITE_TENTATIVAS = 'max_num_rejeicoes_atingido'
     ERRO_NAO_ANALISADO_AINDA = 'nao_analisado_ainda'
+    ERRO_FIRST_INVALIDO = 'first_invalido'
+    ERRO_CURSOR_INVALIDO = 'cursor_invalido'
+
+    CURSOR_TIPO = 'PedidoCadastro'
 
     @inject
     def __init__(
@@ -35,15 +36,19 @@ class PedidoCadastroCrudRepo:
             width_foto: int,
             height_foto: int,
             limite_tentativas: int,
+            tamanho_max_pagina: int = 0,
             uploader: Uploader = Provide[Container.uploader],
-            image_processor: ImageProcessor = Provide[Container.image_processor]
+            image_processor: ImageProcessor = Provide[Container.image_processor],
+            image_jobs: ImageJobs = Provide[Container.image_jobs]
     ):
         self.uploader = uploader
         self.image_processor = image_processor
+        self.image_jobs = image_jobs
 
         self.width_foto = width_foto
         self.height_foto = height_foto
         self.limite_tentativas = limite_tentativas
+        self.tamanho_max_pagina = tamanho_max_pagina
 
     def create(self, user_sess: UserSession, sess: Session, nome: str, telefone: str,
                endereco: Endereco, foto: Optional[FileStream] = None) -> Tuple[bool, Union[str, PedidoCadastro]]:
@@ -66,7 +71,7 @@ class PedidoCadastroCrudRepo:
             return False, _val_tel
 
         if foto is not None:
-            success_upload, upload_or_error = self._process_and_upload(foto, 'create()')
+            success_upload, upload_or_error = self._process_and_upload(foto, self.UPLOAD_GROUP, 'create()')
             if not success_upload:
                 return False, upload_or_error
         else:
@@ -77,6 +82,8 @@ class PedidoCadastroCrudRepo:
         sess.add(pedido)
         sess.commit()
 
+        self._submit_if_pending(pedido.foto)
+
         return True, pedido
 
     def edit(
@@ -88,7 +95,7 @@ class PedidoCadastroCrudRepo:
         if user_sess is None or user_sess.tipo != UserType.ESTACIONAMENTO:
             return False, self.ERRO_SEM_PERMISSAO
 
-        adm = user_sess.user
+        adm = user_sess.get_user(eager=True)
         pedido: PedidoCadastro = adm.pedido_cadastro
 
         if pedido is None:
@@ -118,7 +125,7 @@ class PedidoCadastroCrudRepo:
         pedido.msg_rejeicao = None
 
         if foto:
-            success_upload, upload_or_error = self._process_and_upload(foto, 'edit()')
+            success_upload, upload_or_error = self._process_and_upload(foto, self.UPLOAD_GROUP, 'edit()')
             if not success_upload:
                 return False, upload_or_error
 
@@ -134,20 +141,24 @@ class PedidoCadastroCrudRepo:
 
         sess.commit()
 
+        if foto:
+            self._submit_if_pending(pedido.foto)
+
         return True, pedido
 
-    def list(self, user_sess: UserSession, sess: Session, amount: int = 0, index: int = 0) \
-            -> Tuple[bool, Union[str, Iterable[PedidoCadastro]]]:
+    def list(self, user_sess: UserSession, sess: Session, amount: int = 0, index: int = 0,
+             load_options: Iterable = ()) -> Tuple[bool, Union[str, Iterable[PedidoCadastro]]]:
         if user_sess is None or user_sess.tipo != UserType.SISTEMA:
             return False, self.ERRO_SEM_PERMISSAO
 
         if index < 0:
             return True, tuple()
 
-        query = sess.query(PedidoCadastro).filter(
+        query = sess.query(PedidoCadastro).options(*load_options).filter(
             PedidoCadastro.msg_rejeicao == None
         ).offset(index)
 
+        amount = tamanho_pagina(amount, self.tamanho_max_pagina)
         if amount > 0:
             query = query.limit(amount)
 
@@ -155,19 +166,40 @@ class PedidoCadastroCrudRepo:
 
         return True, pedidos
 
-    def get(self, user_sess: UserSession, sess: Session, pedido_id: Optional[str] = None) \
-            -> Tuple[bool, Union[str, PedidoCadastro]]:
+    def list_page(self, user_sess: UserSession, sess: Session, first: Optional[int] = None,
+                  after: Optional[str] = None, load_options: Iterable = ()) -> Tuple[bool, Union[str, Pagina]]:
+        if user_sess is None or user_sess.tipo != UserType.SISTEMA:
+            return False, self.ERRO_SEM_PERMISSAO
+
+        if first is not None and first <= 0:
+            return False, self.ERRO_FIRST_INVALIDO
+
+        after_id = None
+        if after is not None:
+            after_id = decode_cursor(self.CURSOR_TIPO, after)
+            if after_id is None:
+                return False, self.ERRO_CURSOR_INVALIDO
+
+        query = sess.query(PedidoCadastro).options(*load_options).filter(PedidoCadastro.msg_rejeicao == None)
+        pedidos, tem_proxima = keyset_paginate(query, PedidoCadastro.id,
+                                               tamanho_pagina(first or 0, self.tamanho_max_pagina), after_id)
+        cursores = [encode_cursor(self.CURSOR_TIPO, p.id) for p in pedidos]
+
+        return True, Pagina(pedidos, cursores, tem_proxima)
+
+    def get(self, user_sess: UserSession, sess: Session, pedido_id: Optional[str] = None,
+            load_options: Iterable = ()) -> Tuple[bool, Union[str, PedidoCadastro]]:
         if user_sess is None:
             return False, self.ERRO_SEM_PERMISSAO
 
         if user_sess.tipo == UserType.ESTACIONAMENTO:
-            pedido = user_sess.user.pedido_cadastro
+            pedido = user_sess.get_user(eager=True).pedido_cadastro
             if pedido is None:
                 return False, self.ERRO_SEM_PEDIDO
             else:
                 return True, pedido
 
-        pedido = sess.query(PedidoCadastro).get(pedido_id)
+        pedido = sess.query(PedidoCadastro).options(*load_options).get(pedido_id)
         if pedido is None:
             return False, self.ERRO_PEDIDO_NAO_ENCONTRADO
 
@@ -184,21 +216,3 @@ class PedidoCadastroCrudRepo:
             return self.TEL_FORMATO_INV
         if not tel.startswith('+') or len(tel) < 3:
             return self.TEL_SEM_COD_INTER
-
-    def _process_and_upload(self, foto: FileStream, log: str) -> Tuple[bool, Union[str, Upload]]:
-        try:
-            ret = self.image_processor.compress(foto, self.width_foto, self.height_foto)
-        except AttributeError:
-            return False, self.FOTO_FORMATO_INVALIDO
-        except Exception as ex:
-            logging.getLogger(__name__).error(f'{log}: Image processing error.', exc_info=ex)
-            return False, self.FOTO_PROCESSING_ERRO
-
-        try:
-            fname = str(uuid4()) + '.' + self.image_processor.get_default_image_format()
-            upload = self.uploader.upload(ret, self.UPLOAD_GROUP, fname)
-        except Exception as ex:
-            logging.getLogger(__name__).error(f'{log}: Upload error.', exc_info=ex)
-            return False, self.ERRO_UPLOAD
-
-        return True, upload
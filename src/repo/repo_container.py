@@ -23,18 +23,23 @@ class RepoContainer(containers.DeclarativeContainer):
         PedidoCadastroCrudRepo, 
         width_foto=config.pedido_cadastro.width_foto.as_int(),
         height_foto=config.pedido_cadastro.height_foto.as_int(),
-        limite_tentativas=config.pedido_cadastro.limite_tentativas.as_int()
+        limite_tentativas=config.pedido_cadastro.limite_tentativas.as_int(),
+        tamanho_max_pagina=config.paginacao.tamanho_max_pagina.as_int()
     )
     pedido_cadastro_aprovacao_repo = providers.Factory(PedidoCadastroAprovacaoRepo)
     estacionamento_crud_repo = providers.Factory(
         EstacionamentoCrudRepo,
         width_foto=config.pedido_cadastro.width_foto.as_int(),
         height_foto=config.pedido_cadastro.height_foto.as_int(),
+        tamanho_max_pagina=config.paginacao.tamanho_max_pagina.as_int()
     )
     estacionamento_others_repo = providers.Factory(EstacionamentoOthersRepo)
     buscar_estacio_repo = providers.Factory(
         BuscarEstacioRepo,
-        distancia=config.busca_estacio.distancia.as_int()
+        distancia=config.busca_estacio.distancia.as_int(),
+        modo=config.busca_estacio.modo,
+        raio_terra=config.busca_estacio.raio_terra.as_float(),
+        limite_maximo=config.busca_estacio.limite_maximo.as_int()
     )
     veiculo_crud_repo = providers.Factory(VeiculoCrudRepo)
     horario_divergente_repo = providers.Factory(HorarioDivergenteRepo)
@@ -1,6 +1,18 @@
-from src.services.db import DbEngine, DbSessionMaker
-from src.services.crypto import Crypto
+from src.services.db import DbEngine, DbSessionMaker, LazySession, PoolMetrics
+from src.services.crypto import Crypto, CryptoOcupado
+from src.services.local_cache import LocalCache
+from src.services.cached_serde import CompactSerde
 from src.services.cached import Cached
 from src.services.uploader import Uploader, LocalUploader
 from src.services.image_processor import ImageProcessor
+from src.services.image_jobs import ImageJobs
 from src.services.email_sender import EmailSender
+from src.services.spatial_index import SpatialIndex
+from src.services.document_cache import DocumentCache
+from src.services.persisted_queries import PersistedQueries
+from src.services.query_cost import QueryCostAnalyzer
+from src.services.session_expiration import SessionExpiration
+from src.services.rate_limiter import RateLimiter
+from src.services.client_ip import ClientIp
+from src.services.metrics import Metrics
+from src.services.read_your_writes import ReadYourWrites
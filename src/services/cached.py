@@ -1,21 +1,131 @@
-from pymemcache import serde, PooledClient
+import time
+from typing import Iterable, Optional, Dict, Tuple, Any
+
+from pymemcache import PooledClient
+
+from src.services.cached_serde import compact_serde
+from src.services.local_cache import LocalCache
 
 
 class Cached:
-    def __init__(self, host: str, port: int):
-        self.client = PooledClient((host, port), serde=serde.pickle_serde)
+    # Acima disso (30 dias) o memcached le o exptime como um timestamp unix e nao como segundos
+    MAX_EXPIRE_RELATIVO = 30 * 24 * 3600
+
+    def __init__(self, host: str, port: int, l1_tamanho: int = 0, l1_ttl: float = 0, l1_grupos: Iterable[str] = (),
+                 serde=compact_serde):
+        self.client = PooledClient((host, port), serde=serde)
+
+        # Copia em memoria (por processo) dos grupos mais lidos, como os tokens de sessao. Remocoes feitas neste
+        # processo valem na hora, as dos outros processos so depois do ttl
+        self.l1: Optional[LocalCache] = LocalCache(l1_tamanho, l1_ttl) if l1_tamanho > 0 and l1_ttl > 0 else None
+        self.l1_grupos = frozenset(l1_grupos)
+
+    @classmethod
+    def exptime(cls, segundos: int, agora: Optional[int] = None) -> int:
+        if segundos <= cls.MAX_EXPIRE_RELATIVO:
+            return segundos
+
+        agora = agora if agora is not None else int(time.time())
+        return agora + segundos
 
     def get(self, group: str, key: str):
-        return self.client.get(self._gen_key_name(group, key))
+        return self._get(group, key)
 
     def contains(self, group: str, key: str):
-        return self.client.get(self._gen_key_name(group, key)) is not None
+        return self._get(group, key) is not None
+
+    def _get(self, group: str, key: str):
+        key_name = self._gen_key_name(group, key)
+
+        if self._usa_l1(group):
+            found, value = self.l1.get(key_name)
+            if found:
+                return value
+
+        value = self.client.get(key_name)
+        if value is not None and self._usa_l1(group):
+            self.l1.set(key_name, value)
+
+        return value
+
+    def set(self, group: str, key: str, value, expire: int = 0):
+        key_name = self._gen_key_name(group, key)
+
+        self.client.set(key_name, value, expire=expire)
+        if self._usa_l1(group):
+            self.l1.set(key_name, value)
+
+    def get_many(self, keys: Iterable[Tuple[str, str]]) -> Dict[Tuple[str, str], Any]:
+        # Recebe pares (grupo, chave) e busca tudo que nao estiver na copia local em uma unica ida ao memcached
+        ret = {}
+        pendentes = {}
+        for group, key in keys:
+            key_name = self._gen_key_name(group, key)
+            if self._usa_l1(group):
+                found, value = self.l1.get(key_name)
+                if found:
+                    ret[(group, key)] = value
+                    continue
+
+            pendentes[key_name] = (group, key)
 
-    def set(self, group: str, key: str, value):
-        self.client.set(self._gen_key_name(group, key), value)
+        if pendentes:
+            for key_name, value in self.client.get_many(list(pendentes)).items():
+                group, key = pendentes[key_name]
+                ret[(group, key)] = value
+
+                if self._usa_l1(group):
+                    self.l1.set(key_name, value)
+
+        return ret
+
+    def set_many(self, values: Dict[Tuple[str, str], Any], expire: int = 0, noreply: bool = False):
+        data = {}
+        for (group, key), value in values.items():
+            key_name = self._gen_key_name(group, key)
+            data[key_name] = value
+
+            if self._usa_l1(group):
+                self.l1.set(key_name, value)
+
+        self.client.set_many(data, expire=expire, noreply=noreply)
+
+    def delete_many(self, keys: Iterable[Tuple[str, str]], noreply: bool = False):
+        key_names = []
+        for group, key in keys:
+            key_name = self._gen_key_name(group, key)
+            key_names.append(key_name)
+
+            if self._usa_l1(group):
+                self.l1.remove(key_name)
+
+        self.client.delete_many(key_names, noreply=noreply)
+
+    def gets(self, group: str, key: str) -> Tuple[Any, Any]:
+        # Valor e token de cas, para atualizacoes atomicas (sem passar pela copia local)
+        return self.client.gets(self._gen_key_name(group, key))
+
+    def cas(self, group: str, key: str, value, cas, expire: int = 0) -> bool:
+        # True se gravou, False se a chave foi alterada por outro cliente desde o gets (ou nao existe mais)
+        return bool(self.client.cas(self._gen_key_name(group, key), value, cas, expire=expire, noreply=False))
+
+    def add(self, group: str, key: str, value, expire: int = 0) -> bool:
+        # Grava apenas se a chave ainda nao existir
+        return bool(self.client.add(self._gen_key_name(group, key), value, expire=expire, noreply=False))
+
+    def touch(self, group: str, key: str, expire: int, noreply: bool = False):
+        # Renova o tempo de expiracao sem reenviar o valor
+        self.client.touch(self._gen_key_name(group, key), expire=expire, noreply=noreply)
 
     def remove(self, group: str, key: str):
-        self.client.delete(self._gen_key_name(group, key))
+        key_name = self._gen_key_name(group, key)
+
+        if self._usa_l1(group):
+            self.l1.remove(key_name)
+        self.client.delete(key_name)
+
+    def _usa_l1(self, group: str) -> bool:
+        return self.l1 is not None and group in self.l1_grupos
 
     @staticmethod
     def _gen_key_name(group: str, key: str) -> str:
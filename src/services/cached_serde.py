@@ -0,0 +1,82 @@
+import logging
+import struct
+from typing import Any, Tuple
+
+from pymemcache.serde import FLAG_BYTES, FLAG_TEXT, FLAG_INTEGER, python_memcache_serializer, \
+    python_memcache_deserializer
+
+from src.classes import SimpleUserSession
+
+
+class CompactSerde:
+    # Flag propria para os valores codificados com struct. Os demais flags seguem o formato do pymemcache, entao
+    # entradas antigas (gravadas com pickle_serde) continuam sendo lidas normalmente
+    FLAG_COMPACT = 1 << 8
+    VERSAO = 1
+
+    TAG_USER_SESSION = 1
+    TAG_FLOAT = 2
+    TAG_BOOL = 3
+    TAG_NONE = 4
+    TAG_USER_SESSION_CRIADO = 5
+
+    _HEADER = struct.Struct('>BB')
+    _USER_SESSION = struct.Struct('>BBBq')
+    _USER_SESSION_CRIADO = struct.Struct('>BBBqq')
+    _FLOAT = struct.Struct('>BBd')
+    _BOOL = struct.Struct('>BB?')
+
+    def serialize(self, key: str, value: Any) -> Tuple[bytes, int]:
+        value_type = type(value)
+
+        if value_type is bytes:
+            return value, FLAG_BYTES
+        if value_type is str:
+            return value.encode('utf8'), FLAG_TEXT
+        if value_type is int:
+            return b'%d' % value, FLAG_INTEGER
+        if value_type is SimpleUserSession and value.criado_em is not None:
+            return self._USER_SESSION_CRIADO.pack(self.VERSAO, self.TAG_USER_SESSION_CRIADO, value.tipo,
+                                                  value.user_id, value.criado_em), self.FLAG_COMPACT
+        if value_type is SimpleUserSession:
+            return self._USER_SESSION.pack(self.VERSAO, self.TAG_USER_SESSION, value.tipo, value.user_id), \
+                self.FLAG_COMPACT
+        if value_type is float:
+            return self._FLOAT.pack(self.VERSAO, self.TAG_FLOAT, value), self.FLAG_COMPACT
+        if value_type is bool:
+            return self._BOOL.pack(self.VERSAO, self.TAG_BOOL, value), self.FLAG_COMPACT
+        if value is None:
+            return self._HEADER.pack(self.VERSAO, self.TAG_NONE), self.FLAG_COMPACT
+
+        # Qualquer outro tipo continua indo como pickle
+        return python_memcache_serializer(key, value)
+
+    def deserialize(self, key: str, value: bytes, flags: int) -> Any:
+        if not flags & self.FLAG_COMPACT:
+            return python_memcache_deserializer(key, value, flags)
+
+        try:
+            versao, tag = self._HEADER.unpack_from(value)
+            if versao != self.VERSAO:
+                # Valor gravado por uma versao desconhecida do codec, tratado como ausente
+                return None
+
+            if tag == self.TAG_USER_SESSION:
+                _, _, tipo, user_id = self._USER_SESSION.unpack(value)
+                return SimpleUserSession(tipo, user_id)
+            if tag == self.TAG_USER_SESSION_CRIADO:
+                _, _, tipo, user_id, criado_em = self._USER_SESSION_CRIADO.unpack(value)
+                return SimpleUserSession(tipo, user_id, criado_em)
+            if tag == self.TAG_FLOAT:
+                return self._FLOAT.unpack(value)[2]
+            if tag == self.TAG_BOOL:
+                return self._BOOL.unpack(value)[2]
+            if tag == self.TAG_NONE:
+                return None
+        except struct.error:
+            logging.getLogger(__name__).warning(f'Invalid cached value for key {key}')
+
+        return None
+
+
+compact_serde = CompactSerde()
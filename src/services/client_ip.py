@@ -0,0 +1,21 @@
+from typing import Mapping, Optional
+
+
+class ClientIp:
+    def __init__(self, header: str, num_proxies: int):
+        # Atras de `num_proxies` proxies confiaveis, o IP do cliente e o que o mais externo deles colocou no header
+        # (ex.: X-Forwarded-For). Com 0 vale o endereco da conexao, o header pode ter sido forjado pelo cliente
+        self.header = header
+        self.num_proxies = num_proxies
+
+    def resolve(self, headers: Mapping[str, str], remote_addr: Optional[str]) -> str:
+        if self.num_proxies <= 0 or not self.header:
+            return remote_addr or ''
+
+        valores = [x.strip() for x in (headers.get(self.header) or '').split(',') if x.strip()]
+
+        # Cada proxy acrescenta um endereco no final; com menos valores que proxies o header nao veio deles
+        if len(valores) < self.num_proxies:
+            return remote_addr or ''
+
+        return valores[-self.num_proxies]
@@ -1,25 +1,127 @@
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from secrets import token_hex
+from typing import Optional, Callable, Set, Union
 
 from bcrypt import gensalt, hashpw, checkpw
 
 
+class CryptoOcupado(Exception):
+    pass
+
+
+def _hash_password(password: bytes, salt_rounds: int) -> bytes:
+    return hashpw(password, gensalt(rounds=salt_rounds))
+
+
+def _check_password(password: bytes, hashed: bytes) -> bool:
+    return checkpw(password, hashed)
+
+
 class Crypto:
-    def __init__(self, is_testing, salt_rounds):
+    def __init__(self, is_testing, salt_rounds, num_workers: int = 0, max_fila: int = 0):
         self.is_testing = is_testing
         self.salt_rounds = salt_rounds
 
+        # Com num_workers > 0 o bcrypt roda em outros processos, sem ocupar a thread (e o GIL) da requisicao. No
+        # maximo num_workers + max_fila chamadas ficam pendentes, as demais sao recusadas na hora com CryptoOcupado
+        self.num_workers = num_workers
+        self._vagas = threading.BoundedSemaphore(num_workers + max_fila) if num_workers > 0 else None
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+
+        # Rehash de senhas com custo antigo, feito depois do login sem atrasar a resposta
+        self._rehash_executor: Optional[ThreadPoolExecutor] = None
+        self._rehash_pendentes: Set[bytes] = set()
+        self._rehash_lock = threading.Lock()
+
     def hash_password(self, password: bytes) -> bytes:
         if self.is_testing:
             return self._dev_hash(password)
         else:
-            salt = gensalt(rounds=self.salt_rounds)
-            return hashpw(password, salt)
+            return self._run(_hash_password, password, self.salt_rounds)
 
     def check_password(self, password: bytes, hashed: bytes) -> bool:
         if self.is_testing:
             return self._dev_hash(password) == hashed
         else:
-            return checkpw(password, hashed)
+            return self._run(_check_password, password, hashed)
+
+    def needs_rehash(self, hashed: Union[bytes, str]) -> bool:
+        if self.is_testing:
+            return False
+
+        custo = self.hash_cost(hashed)
+        return custo is not None and custo != self.salt_rounds
+
+    def rehash_in_background(self, password: bytes, hashed: bytes, callback: Callable[[bytes], None]):
+        # Gera o hash com o custo atual e entrega para callback, em outra thread. Se o processo estiver ocupado
+        # (CryptoOcupado) desiste, o proximo login tenta de novo
+        with self._rehash_lock:
+            if hashed in self._rehash_pendentes:
+                return
+
+            self._rehash_pendentes.add(hashed)
+            if self._rehash_executor is None:
+                self._rehash_executor = ThreadPoolExecutor(1, thread_name_prefix='rehash')
+
+            self._rehash_executor.submit(self._rehash, password, hashed, callback)
+
+    def _rehash(self, password: bytes, hashed: bytes, callback: Callable[[bytes], None]):
+        try:
+            callback(self.hash_password(password))
+        except CryptoOcupado:
+            pass
+        except Exception as ex:
+            logging.getLogger(__name__).error('Error on rehash', exc_info=ex)
+        finally:
+            with self._rehash_lock:
+                self._rehash_pendentes.discard(hashed)
+
+    def _run(self, fn, *args):
+        if self._vagas is None:
+            return fn(*args)
+
+        if not self._vagas.acquire(blocking=False):
+            raise CryptoOcupado()
+
+        try:
+            return self._get_executor().submit(fn, *args).result()
+        finally:
+            self._vagas.release()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._executor_lock:
+            if self._executor is None:
+                # spawn evita herdar (via fork) as conexoes e threads do processo do servidor
+                self._executor = ProcessPoolExecutor(self.num_workers, mp_context=multiprocessing.get_context('spawn'))
+
+            return self._executor
+
+    def close(self):
+        with self._rehash_lock:
+            if self._rehash_executor is not None:
+                self._rehash_executor.shutdown()
+                self._rehash_executor = None
+
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
+
+    @staticmethod
+    def hash_cost(hashed: Union[bytes, str]) -> Optional[int]:
+        # Formato do bcrypt: $2b$12$<salt + hash>
+        if isinstance(hashed, str):
+            hashed = hashed.encode('utf8')
+
+        partes = bytes(hashed).split(b'$')
+        if len(partes) < 4 or not partes[2].isdigit():
+            return None
+
+        return int(partes[2])
 
     @staticmethod
     def random_hex_string(size: int) -> str:
@@ -1,15 +1,163 @@
-from sqlalchemy import create_engine
+import random
+import threading
+import time
+from typing import Optional, Dict, Sequence
+
+from sqlalchemy import create_engine, event, exc
 from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.pool import QueuePool, NullPool
+
+
+class PoolMetrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+
+        self.checkouts = 0
+        self.checkins = 0
+        self.conexoes_abertas = 0
+        self.timeouts = 0
+        self.espera_total = 0.0
+        self.espera_max = 0.0
+
+    def registrar_espera(self, segundos: float, timeout: bool = False):
+        with self._lock:
+            self.espera_total += segundos
+            self.espera_max = max(self.espera_max, segundos)
+            if timeout:
+                self.timeouts += 1
+
+    def incrementar(self, campo: str):
+        with self._lock:
+            setattr(self, campo, getattr(self, campo) + 1)
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._lock:
+            return {
+                'checkouts': self.checkouts,
+                'checkins': self.checkins,
+                'conexoes_abertas': self.conexoes_abertas,
+                'timeouts': self.timeouts,
+                'espera_total': self.espera_total,
+                'espera_max': self.espera_max,
+                'espera_media': self.espera_total / self.checkouts if self.checkouts else 0.0
+            }
+
+
+class _QueuePoolMedido(QueuePool):
+    # Mede o tempo que cada checkout espera por uma conexao livre (ou abrindo uma nova). As subclasses criadas
+    # em DbEngine definem metrics, e recreate (engine.dispose) mantem a mesma classe
+    metrics: PoolMetrics
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except exc.TimeoutError:
+            self.metrics.registrar_espera(time.perf_counter() - start, timeout=True)
+            raise
+
+        self.metrics.registrar_espera(time.perf_counter() - start)
+        return conn
 
 
 class DbEngine:
-    def __init__(self, conn_string, encoding='utf8'):
-        self.engine = create_engine(conn_string, encoding=encoding)
+    POOL_QUEUE = 'QUEUE'
+    POOL_NULL = 'NULL'
+
+    def __init__(self, conn_string, encoding='utf8', pool_mode: str = POOL_QUEUE, pool_size: int = 5,
+                 max_overflow: int = 10, pool_timeout: float = 30, pool_recycle: int = -1,
+                 pool_pre_ping: bool = False):
+        self.metrics = PoolMetrics()
+
+        pool_mode = pool_mode.upper()
+        if pool_mode == self.POOL_QUEUE:
+            pool_args = {
+                'poolclass': type('QueuePoolMedido', (_QueuePoolMedido,), {'metrics': self.metrics}),
+                'pool_size': pool_size,
+                'max_overflow': max_overflow,
+                'pool_timeout': pool_timeout,
+                'pool_recycle': pool_recycle
+            }
+        elif pool_mode == self.POOL_NULL:
+            # Uma conexao nova a cada checkout, para quando o pool fica de fora (ex.: proxy de conexoes)
+            pool_args = {'poolclass': NullPool}
+        else:
+            raise AttributeError(f'Unknown pool mode: {pool_mode}')
+
+        self.engine = create_engine(conn_string, encoding=encoding, pool_pre_ping=bool(pool_pre_ping), **pool_args)
+
+        event.listen(self.engine, 'connect', lambda *_: self.metrics.incrementar('conexoes_abertas'))
+        event.listen(self.engine, 'checkout', lambda *_: self.metrics.incrementar('checkouts'))
+        event.listen(self.engine, 'checkin', lambda *_: self.metrics.incrementar('checkins'))
+
+    def pool_status(self) -> Dict[str, float]:
+        status = self.metrics.snapshot()
+
+        pool = self.engine.pool
+        if isinstance(pool, QueuePool):
+            status.update(tamanho=pool.size(), em_uso=pool.checkedout(), overflow=max(0, pool.overflow()),
+                          livres=pool.checkedin())
+
+        return status
 
 
 class DbSessionMaker:
-    def __init__(self, engine: DbEngine):
+    def __init__(self, engine: DbEngine, replicas: Sequence[DbEngine] = ()):
         self.session_maker = sessionmaker(bind=engine.engine)
+        self.replica_session_makers = [sessionmaker(bind=replica.engine) for replica in replicas]
+
+    @property
+    def has_replicas(self) -> bool:
+        return len(self.replica_session_makers) > 0
+
+    def __call__(self, replica: bool = False) -> Session:
+        # Sem replicas configuradas tudo vai para o primario
+        if replica and self.replica_session_makers:
+            return random.choice(self.replica_session_makers)()
 
-    def __call__(self) -> Session:
         return self.session_maker()
+
+
+class LazySession:
+    # Repassa tudo para uma Session criada so no primeiro uso. Requisicoes que nao chegam no banco (playground,
+    # respostas do cache, erros de validacao) nao criam a sessao nem fazem rollback/close no final
+    def __init__(self, session_maker: DbSessionMaker):
+        self._session_maker = session_maker
+        self._session: Optional[Session] = None
+        self._lock = threading.Lock()
+        self._replica = False
+
+    @property
+    def used(self) -> bool:
+        return self._session is not None
+
+    @property
+    def has_replicas(self) -> bool:
+        return self._session_maker.has_replicas
+
+    def use_replica(self, replica: bool = True) -> bool:
+        # So vale antes do primeiro uso, depois a sessao ja esta presa a um banco
+        if self._session is not None:
+            return False
+
+        self._replica = replica
+        return True
+
+    def _get_session(self) -> Session:
+        if self._session is None:
+            with self._lock:
+                if self._session is None:
+                    self._session = self._session_maker(replica=self._replica)
+
+        return self._session
+
+    def close_if_used(self):
+        if self._session is not None:
+            try:
+                self._session.rollback()
+            finally:
+                self._session.close()
+                self._session = None
+
+    def __getattr__(self, name):
+        return getattr(self._get_session(), name)
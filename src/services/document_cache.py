@@ -0,0 +1,48 @@
+import hashlib
+import math
+from typing import Optional, Tuple, List
+
+from graphql import DocumentNode, GraphQLError
+
+from src.services.local_cache import LocalCache
+
+CachedDocument = Tuple[DocumentNode, List[GraphQLError]]
+
+
+class DocumentCache:
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+
+        # O documento so depende do texto da query e do schema, entao nao expira
+        self._documents = LocalCache(max_size, math.inf)
+
+    @property
+    def hits(self) -> int:
+        return self._documents.hits
+
+    @property
+    def misses(self) -> int:
+        return self._documents.misses
+
+    @staticmethod
+    def make_key(query: str) -> str:
+        return hashlib.sha256(query.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[CachedDocument]:
+        _, ret = self._documents.get(key)
+        return ret
+
+    def set(self, key: str, document: DocumentNode, validation_errors: List[GraphQLError]):
+        if self.max_size <= 0:
+            return
+
+        self._documents.set(key, (document, validation_errors))
+
+    def clear(self):
+        self._documents.clear()
+
+    def stats(self) -> dict:
+        return {'size': len(self._documents), 'max_size': self.max_size, 'hits': self.hits, 'misses': self.misses}
+
+    def __len__(self):
+        return len(self._documents)
@@ -0,0 +1,149 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+from uuid import uuid4
+
+from src.classes import FileStream
+from src.enums import UploadStatus
+from src.models import Upload
+from src.services.db import DbSessionMaker
+from src.services.image_processor import ImageProcessor
+from src.services.uploader import Uploader
+
+
+class ImageJobs:
+    EXTENSAO_ORIGINAL = 'orig'
+
+    def __init__(self, image_processor: ImageProcessor, uploader: Uploader, db_session_maker: DbSessionMaker,
+                 num_workers: int = 0, max_fila: int = 0, width_foto: int = 0, height_foto: int = 0):
+        # Com num_workers > 0 as fotos sao guardadas como vieram (EM_ANDAMENTO) e processadas fora da requisicao.
+        # Com 0 os repos continuam processando tudo dentro da mutation
+        self.image_processor = image_processor
+        self.uploader = uploader
+        self.db_session_maker = db_session_maker
+        self.num_workers = num_workers
+        # Tamanho usado pelos uploads recuperados em recover()
+        self.width_foto = width_foto
+        self.height_foto = height_foto
+
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+
+        # No maximo num_workers + max_fila fotos esperando na memoria; com a fila cheia quem chama processa a foto
+        self._vagas = threading.BoundedSemaphore(num_workers + max_fila) if num_workers > 0 else None
+
+    @property
+    def enabled(self) -> bool:
+        return self.num_workers > 0
+
+    def store_pending(self, foto: FileStream, sub_group: str) -> Upload:
+        upload = self.uploader.upload(foto, sub_group, str(uuid4()) + '.' + self.EXTENSAO_ORIGINAL)
+        upload.status = UploadStatus.EM_ANDAMENTO
+
+        return upload
+
+    def submit(self, upload_id: int, width: int, height: int):
+        # Chamado depois do commit, para o worker (com outra sessao) encontrar o upload
+        if not self._vagas.acquire(blocking=False):
+            self._run(upload_id, width, height)
+            return
+
+        try:
+            with self._executor_lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(self.num_workers, thread_name_prefix='image_jobs')
+
+                self._executor.submit(self._run_vaga, upload_id, width, height)
+        except Exception:
+            self._vagas.release()
+            raise
+
+    def start_recovery(self):
+        if self.enabled:
+            threading.Thread(target=self.recover, name='image_jobs_recover', daemon=True).start()
+
+    def recover(self) -> int:
+        # A fila so existe na memoria: uploads que ficaram EM_ANDAMENTO quando o processo parou voltam para ela.
+        # Se outro processo ainda estiver com algum deles, o update condicional em _finish deixa so um terminar
+        sess = self.db_session_maker()
+        try:
+            ids = [row.id for row in sess.query(Upload.id).filter(Upload.status == UploadStatus.EM_ANDAMENTO)]
+        except Exception as ex:
+            logging.getLogger(__name__).error('Error while recovering image jobs', exc_info=ex)
+            return 0
+        finally:
+            sess.close()
+
+        for upload_id in ids:
+            self.submit(upload_id, self.width_foto, self.height_foto)
+
+        return len(ids)
+
+    def close(self):
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
+
+    def _run_vaga(self, upload_id: int, width: int, height: int):
+        try:
+            self._run(upload_id, width, height)
+        finally:
+            self._vagas.release()
+
+    def _run(self, upload_id: int, width: int, height: int):
+        sess = self.db_session_maker()
+        try:
+            self.process(sess, upload_id, width, height)
+        except Exception as ex:
+            logging.getLogger(__name__).error(f'Error on image job {upload_id}', exc_info=ex)
+        finally:
+            sess.close()
+
+    def process(self, sess, upload_id: int, width: int, height: int) -> bool:
+        original: Upload = sess.query(Upload).get(upload_id)
+        if original is None or original.status != UploadStatus.EM_ANDAMENTO:
+            return False
+
+        # Copia desanexada: o registro pode ser trocado por outra edicao enquanto a foto e processada
+        original = Upload(id=original.id, nome_arquivo=original.nome_arquivo, sub_dir=original.sub_dir,
+                          status=original.status)
+        sess.rollback()
+
+        try:
+            fstream = self.image_processor.compress(self.uploader.open(original), width, height)
+            fname = str(uuid4()) + '.' + self.image_processor.get_default_image_format()
+            final = self.uploader.upload(fstream, original.sub_dir, fname)
+        except Exception as ex:
+            logging.getLogger(__name__).error(f'Image job {upload_id}: processing error.', exc_info=ex)
+            self._finish(sess, original, UploadStatus.CANCELADO)
+            return False
+
+        if not self._finish(sess, original, UploadStatus.CONCLUIDO, final.nome_arquivo, final.variantes):
+            # O upload foi removido ou trocado nesse meio tempo, a foto processada nao e mais de ninguem
+            self._delete(final)
+            return False
+
+        self._delete(original)
+        return True
+
+    def _finish(self, sess, original: Upload, status: UploadStatus, nome_arquivo: Optional[str] = None,
+                variantes: Optional[str] = None) -> bool:
+        values = {Upload.status: status}
+        if nome_arquivo is not None:
+            values[Upload.nome_arquivo] = nome_arquivo
+            values[Upload.variantes] = variantes
+
+        count = sess.query(Upload).filter(
+            (Upload.id == original.id) & (Upload.status == UploadStatus.EM_ANDAMENTO)
+        ).update(values, synchronize_session=False)
+        sess.commit()
+
+        return count > 0
+
+    def _delete(self, upload: Upload):
+        try:
+            self.uploader.delete(upload)
+        except Exception as ex:
+            logging.getLogger(__name__).error(f'Error while deleting {upload}', exc_info=ex)
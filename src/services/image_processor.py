@@ -1,26 +1,109 @@
-from typing import Optional
-from PIL import Image
+from typing import Optional, Iterable, Dict, Tuple
+from PIL import Image, UnidentifiedImageError
+from PIL.JpegImagePlugin import JpegImageFile
 
-from src.classes import FileStream
+from src.classes import FileStream, ArquivoMuitoGrande
 from src.classes.file_stream import MemoryFileStream
 
 
 class ImageProcessor:
-    def __init__(self, default_img_format: str):
+    def __init__(self, default_img_format: str, larguras_variantes: Iterable = (), formatos: Iterable = (),
+                 max_pixels: int = 0, max_bytes: int = 0):
+        # Limites em 0 (ou sem formatos) ficam desligados
         self.default_img_format = default_img_format
+        self.larguras_variantes = sorted({int(x) for x in larguras_variantes}, reverse=True)
+        self.formatos = {x.strip().upper() for x in formatos}
+        self.max_pixels = max_pixels
+        self.max_bytes = max_bytes
 
     def compress(self, file_stream: FileStream, width: int, height: int, img_format: Optional[str] = None) \
-            -> FileStream:
+            -> MemoryFileStream:
         img_format = img_format or self.default_img_format
 
-        image = Image.open(file_stream)
-        resized = image.resize((width, height))
+        image = self._open(file_stream)
+        size = self.fit_size(image.size, width, height)
+
+        # JPEG: o decoder ja entrega a imagem em 1/2, 1/4 ou 1/8 do tamanho, sem decodificar todos os pixels.
+        # Fotos de celular com bloco MPF abrem como MPO, que tambem e um JpegImageFile
+        if isinstance(image, JpegImageFile):
+            image.draft(image.mode, size)
+
+        # reduce() tira a media de blocos inteiros de pixels (barato), deixando para o LANCZOS so o fim do caminho.
+        # Imagens com paleta ficam de fora, a media dos indices nao e uma cor
+        fator = min(image.width // (2 * size[0]), image.height // (2 * size[1]))
+        if fator > 1 and image.mode not in ('1', 'P'):
+            image = image.reduce(fator)
+
+        resized = image.resize(size, Image.LANCZOS) if image.size != size else image
 
         out_stream = MemoryFileStream()
         resized.save(out_stream, format=img_format)
-
         out_stream.seek(0)
+
+        # As versoes menores (ex.: miniaturas das listagens) saem da mesma imagem ja decodificada, cada uma reduzida
+        # a partir da anterior
+        out_stream.variants = self._make_variants(resized, img_format)
+
         return out_stream
 
+    @staticmethod
+    def fit_size(size: Tuple[int, int], width: int, height: int) -> Tuple[int, int]:
+        # Maior tamanho que cabe em width x height mantendo a proporcao, sem ampliar imagens menores
+        escala = min(width / size[0], height / size[1], 1)
+        return max(1, round(size[0] * escala)), max(1, round(size[1] * escala))
+
+    def _make_variants(self, image: Image.Image, img_format: str) -> Dict[int, MemoryFileStream]:
+        width, height = image.size
+
+        variants = {}
+        for largura in self.larguras_variantes:
+            if largura >= width:
+                continue
+
+            image = image.copy()
+            image.thumbnail((largura, max(1, round(largura * height / width))))
+
+            stream = MemoryFileStream()
+            image.save(stream, format=img_format)
+            stream.seek(0)
+            variants[largura] = stream
+
+        return variants
+
+    def check(self, file_stream: FileStream):
+        # So le o cabecalho, entao da para recusar arquivos que nao sao imagens (ou grandes demais) sem decodificar
+        try:
+            self._open(file_stream)
+        finally:
+            file_stream.seek(0)
+
+    def _open(self, file_stream: FileStream) -> Image.Image:
+        # O corpo da requisicao ja chega limitado (graphql.max_body_bytes), aqui o limite e so o da foto
+        if self.max_bytes > 0:
+            file_stream.seek(0, 2)
+            tamanho = file_stream.tell()
+            file_stream.seek(0)
+
+            if tamanho > self.max_bytes:
+                raise ArquivoMuitoGrande(f'File stream has {tamanho} bytes, the limit is {self.max_bytes}')
+
+        # Image.open le so o cabecalho: formato e dimensoes saem antes de qualquer pixel ser decodificado
+        try:
+            image = Image.open(file_stream)
+        except UnidentifiedImageError as ex:
+            raise AttributeError('File stream does not contain a valid image') from ex
+        except Image.DecompressionBombError as ex:
+            raise ArquivoMuitoGrande(str(ex)) from ex
+
+        # MPO (foto de celular com bloco MPF) e um JPEG com imagens extras, vale o mesmo formato
+        formato = 'JPEG' if isinstance(image, JpegImageFile) else image.format
+        if self.formatos and formato not in self.formatos:
+            raise AttributeError(f'Image format not allowed: {image.format}')
+
+        if self.max_pixels > 0 and image.width * image.height > self.max_pixels:
+            raise ArquivoMuitoGrande(f'Image has {image.width}x{image.height} pixels, the limit is {self.max_pixels}')
+
+        return image
+
     def get_default_image_format(self):
         return self.default_img_format
@@ -0,0 +1,18 @@
+from typing import Sequence
+
+from src.services.db import DbEngine
+from src.services.document_cache import DocumentCache
+
+
+class Metrics:
+    def __init__(self, db_engine: DbEngine, db_replicas: Sequence[DbEngine], document_cache: DocumentCache):
+        self.db_engine = db_engine
+        self.db_replicas = db_replicas
+        self.document_cache = document_cache
+
+    def snapshot(self) -> dict:
+        return {
+            'db': self.db_engine.pool_status(),
+            'db_replicas': [replica.pool_status() for replica in self.db_replicas],
+            'document_cache': self.document_cache.stats()
+        }
@@ -0,0 +1,50 @@
+import math
+from typing import Optional
+
+from pymemcache.exceptions import MemcacheError
+
+from src.services.cached import Cached
+from src.services.local_cache import LocalCache
+
+
+class PersistedQueries:
+    GROUP = 'apq'
+
+    def __init__(self, cached: Cached, tam_local: int):
+        self.cached = cached
+        self.tam_local = tam_local
+
+        # O hash identifica o texto da query, entao a copia local nao expira
+        self._local = LocalCache(tam_local, math.inf)
+
+    def get(self, sha256_hash: str) -> Optional[str]:
+        query = self._get_local(sha256_hash)
+        if query is not None:
+            return query
+
+        try:
+            query = self.cached.get(self.GROUP, sha256_hash)
+        except (MemcacheError, OSError):
+            # Sem memcached a query so existe na copia local, o cliente reenvia o texto se preciso
+            return None
+
+        if query is not None:
+            self._set_local(sha256_hash, query)
+
+        return query
+
+    def set(self, sha256_hash: str, query: str):
+        self._set_local(sha256_hash, query)
+
+        try:
+            self.cached.set(self.GROUP, sha256_hash, query)
+        except (MemcacheError, OSError):
+            pass
+
+    def _get_local(self, sha256_hash: str) -> Optional[str]:
+        _, query = self._local.get(sha256_hash)
+        return query
+
+    def _set_local(self, sha256_hash: str, query: str):
+        if self.tam_local > 0:
+            self._local.set(sha256_hash, query)
@@ -0,0 +1,122 @@
+from typing import Optional, List, Tuple, Dict, Any, Type
+
+from graphql import GraphQLSchema, DocumentNode, GraphQLError, ValidationRule, ValidationContext, \
+    OperationDefinitionNode, SelectionSetNode, FieldNode, FragmentSpreadNode, InlineFragmentNode, GraphQLInt, \
+    GraphQLObjectType, GraphQLInterfaceType, GraphQLList, GraphQLNonNull, get_named_type, is_composite_type, \
+    get_operation_root_type, value_from_ast, validate, type_from_ast
+
+ERRO_CUSTO_EXCEDIDO = 'QUERY_TOO_COMPLEX'
+
+
+class QueryCostAnalyzer:
+    # Argumentos que definem quantos itens uma listagem devolve
+    ARGS_TAMANHO = ('amount', 'first', 'limit')
+
+    def __init__(self, custo_maximo: int, tamanho_lista_padrao: int, fanout_padrao: int):
+        self.custo_maximo = custo_maximo
+        self.tamanho_lista_padrao = tamanho_lista_padrao
+        self.fanout_padrao = fanout_padrao
+
+    def validate(self, schema: GraphQLSchema, document: DocumentNode, variables: Optional[Dict[str, Any]] = None,
+                 operation_name: Optional[str] = None) -> Tuple[int, List[GraphQLError]]:
+        custos: Dict[Optional[str], int] = {}
+        errors = validate(schema, document, [self._make_rule(variables or {}, custos)])
+
+        if operation_name is None and len(custos) == 1:
+            return next(iter(custos.values())), errors
+
+        return custos.get(operation_name, 0), errors
+
+    def _make_rule(self, variables: Dict[str, Any], custos: Dict[Optional[str], int]) -> Type[ValidationRule]:
+        analyzer = self
+
+        class CostLimitRule(ValidationRule):
+            def enter_operation_definition(self, node: OperationDefinitionNode, *_):
+                root_type = get_operation_root_type(self.context.schema, node)
+                custo = analyzer._custo_selecao(self.context, root_type, node.selection_set, variables, None, False)
+
+                nome = node.name.value if node.name else None
+                custos[nome] = custo
+
+                if 0 < analyzer.custo_maximo < custo:
+                    self.report_error(GraphQLError(
+                        f'Query cost {custo} exceeds the maximum allowed cost of {analyzer.custo_maximo}',
+                        node, extensions={'code': ERRO_CUSTO_EXCEDIDO, 'cost': custo,
+                                          'maxCost': analyzer.custo_maximo}
+                    ))
+
+                return self.SKIP
+
+        return CostLimitRule
+
+    def _custo_selecao(self, context: ValidationContext, parent_type, selection_set: Optional[SelectionSetNode],
+                       variables: Dict[str, Any], tamanho_pendente: Optional[int], aninhado: bool) -> int:
+        if selection_set is None or parent_type is None:
+            return 0
+
+        custo = 0
+        for selection in selection_set.selections:
+            if isinstance(selection, FieldNode):
+                custo += self._custo_campo(context, parent_type, selection, variables, tamanho_pendente, aninhado)
+            elif isinstance(selection, InlineFragmentNode):
+                tipo = type_from_ast(context.schema, selection.type_condition) \
+                    if selection.type_condition else parent_type
+                custo += self._custo_selecao(context, tipo, selection.selection_set, variables, tamanho_pendente,
+                                             aninhado)
+            elif isinstance(selection, FragmentSpreadNode):
+                fragment = context.get_fragment(selection.name.value)
+                if fragment is not None:
+                    tipo = type_from_ast(context.schema, fragment.type_condition)
+                    custo += self._custo_selecao(context, tipo, fragment.selection_set, variables,
+                                                 tamanho_pendente, aninhado)
+
+        return custo
+
+    def _custo_campo(self, context: ValidationContext, parent_type, node: FieldNode, variables: Dict[str, Any],
+                     tamanho_pendente: Optional[int], aninhado: bool) -> int:
+        nome = node.name.value
+        if nome.startswith('__') or not isinstance(parent_type, (GraphQLObjectType, GraphQLInterfaceType)):
+            return 0
+
+        field = parent_type.fields.get(nome)
+        if field is None or not is_composite_type(get_named_type(field.type)):
+            return 0
+
+        # O tamanho pedido em listEstacionamento(amount: ...) vale para a lista logo abaixo (estacionamentos)
+        tamanho = self._tamanho_pedido(node, field, variables)
+        if tamanho is not None:
+            tamanho_pendente = tamanho
+
+        multiplicador = 1
+        if self._is_list(field.type):
+            # Listas sem tamanho dentro de outra lista sao relacionamentos (fan-out), fora delas sao listagens
+            if tamanho_pendente is not None:
+                multiplicador, tamanho_pendente = tamanho_pendente, None
+            else:
+                multiplicador = self.fanout_padrao if aninhado else self.tamanho_lista_padrao
+            aninhado = True
+
+        filhos = self._custo_selecao(context, get_named_type(field.type), node.selection_set, variables,
+                                     tamanho_pendente, aninhado)
+
+        return multiplicador * (1 + filhos)
+
+    def _tamanho_pedido(self, node: FieldNode, field, variables: Dict[str, Any]) -> Optional[int]:
+        if not any(arg in field.args for arg in self.ARGS_TAMANHO):
+            return None
+
+        for arg in node.arguments or ():
+            if arg.name.value in self.ARGS_TAMANHO:
+                valor = value_from_ast(arg.value, GraphQLInt, variables)
+                if isinstance(valor, int) and valor > 0:
+                    return valor
+
+        # Sem tamanho (ou amount 0) a listagem devolve tudo que existir
+        return self.tamanho_lista_padrao
+
+    @staticmethod
+    def _is_list(type_) -> bool:
+        while isinstance(type_, GraphQLNonNull):
+            type_ = type_.of_type
+
+        return isinstance(type_, GraphQLList)
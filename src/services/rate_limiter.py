@@ -0,0 +1,87 @@
+import hashlib
+import math
+import threading
+import time
+from typing import Tuple
+
+from pymemcache.exceptions import MemcacheError
+
+from src.services.cached import Cached
+from src.services.local_cache import LocalCache
+
+
+class RateLimiter:
+    GROUP = 'rate_limit'
+
+    MAX_TENTATIVAS_CAS = 3
+    MAX_CHAVES_LOCAIS = 10_000
+
+    def __init__(self, cached: Cached, nome: str, capacidade: int, por_minuto: float):
+        # Token bucket: cada chave comeca com `capacidade` fichas e recupera `por_minuto` fichas por minuto
+        self.cached = cached
+        self.nome = nome
+        self.capacidade = capacidade
+        self.taxa = por_minuto / 60
+
+        # Depois desse tempo sem uso o balde esta cheio de novo, entao a chave pode expirar
+        self.expire = math.ceil(capacidade / self.taxa) + 1 if self.taxa > 0 else 0
+
+        self._local = LocalCache(self.MAX_CHAVES_LOCAIS, self.expire or math.inf)
+        self._local_lock = threading.Lock()
+
+    def allow(self, key: str) -> bool:
+        if self.capacidade <= 0:
+            return True
+
+        key = self.nome + ':' + hashlib.sha256(key.encode('utf8')).hexdigest()[:32]
+
+        try:
+            permitido = self._allow_cached(key)
+        except (MemcacheError, OSError):
+            permitido = None
+
+        # Sem memcached (ou com muita disputa pela mesma chave) cada processo limita por conta propria
+        return permitido if permitido is not None else self._allow_local(key)
+
+    def _allow_cached(self, key: str):
+        for _ in range(self.MAX_TENTATIVAS_CAS):
+            agora = time.time()
+            value, cas = self.cached.gets(self.GROUP, key)
+
+            if value is None:
+                if self.cached.add(self.GROUP, key, self._encode(self.capacidade - 1, agora), self.expire):
+                    return True
+                continue
+
+            fichas = self._recarregar(*self._decode(value), agora)
+            if fichas < 1:
+                return False
+
+            if self.cached.cas(self.GROUP, key, self._encode(fichas - 1, agora), cas, self.expire):
+                return True
+
+        return None
+
+    def _allow_local(self, key: str) -> bool:
+        with self._local_lock:
+            agora = time.time()
+            found, value = self._local.get(key)
+
+            fichas = self._recarregar(*value, agora) if found else self.capacidade
+            if fichas < 1:
+                return False
+
+            self._local.set(key, (fichas - 1, agora))
+            return True
+
+    def _recarregar(self, fichas: float, atualizado_em: float, agora: float) -> float:
+        return min(self.capacidade, fichas + max(0.0, agora - atualizado_em) * self.taxa)
+
+    @staticmethod
+    def _encode(fichas: float, agora: float) -> str:
+        return f'{fichas:.4f}:{agora:.3f}'
+
+    @staticmethod
+    def _decode(value: str) -> Tuple[float, float]:
+        fichas, atualizado_em = value.split(':')
+        return float(fichas), float(atualizado_em)
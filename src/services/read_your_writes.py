@@ -0,0 +1,32 @@
+from pymemcache.exceptions import MemcacheError
+
+from src.services.cached import Cached
+
+
+class ReadYourWrites:
+    GROUP = 'rw_sticky'
+
+    def __init__(self, cached: Cached, janela: int):
+        # Depois de uma mutation, as queries do mesmo token ficam no primario por `janela` segundos, ate as
+        # replicas alcancarem o que foi escrito (0 = desativado)
+        self.cached = cached
+        self.janela = janela
+
+    def mark_write(self, token: str):
+        if self.janela <= 0:
+            return
+
+        try:
+            self.cached.set(self.GROUP, token, 1, expire=self.janela)
+        except (MemcacheError, OSError):
+            pass
+
+    def recent_write(self, token: str) -> bool:
+        if self.janela <= 0:
+            return False
+
+        try:
+            return self.cached.contains(self.GROUP, token)
+        except (MemcacheError, OSError):
+            # Na duvida le do primario
+            return True
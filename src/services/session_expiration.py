@@ -0,0 +1,51 @@
+import time
+from typing import Optional
+
+from src.classes import SimpleUserSession
+from src.services.cached import Cached
+from src.services.local_cache import LocalCache
+
+
+class SessionExpiration:
+    SESS_TOKEN_GROUP = 'sess_token'
+
+    MAX_RENOVACOES_LOCAIS = 10_000
+
+    def __init__(self, ttl_absoluto: int, ttl_deslizante: int, intervalo_renovacao: int):
+        self.ttl_absoluto = ttl_absoluto
+        self.ttl_deslizante = ttl_deslizante
+        self.intervalo_renovacao = intervalo_renovacao
+
+        # Tokens renovados recentemente por este processo, para nao escrever no memcached a cada requisicao
+        self._renovados: Optional[LocalCache] = LocalCache(self.MAX_RENOVACOES_LOCAIS, intervalo_renovacao) \
+            if intervalo_renovacao > 0 else None
+
+    def expire(self, criado_em: Optional[int], agora: Optional[int] = None) -> int:
+        # Exptime do memcached para a sessao: o menor entre o ttl deslizante e o que resta do ttl absoluto (0 = nunca).
+        # Passando de 30 dias vira um timestamp (ver Cached.exptime)
+        agora = agora if agora is not None else int(time.time())
+
+        limites = []
+        if self.ttl_deslizante > 0:
+            limites.append(self.ttl_deslizante)
+        if self.ttl_absoluto > 0 and criado_em is not None:
+            limites.append(self.ttl_absoluto - (agora - criado_em))
+
+        return Cached.exptime(max(1, min(limites)), agora) if limites else 0
+
+    def expire_reverse(self, agora: Optional[int] = None) -> int:
+        # A chave reversa nao e renovada junto com o token, entao precisa durar o maximo que o token pode durar
+        return Cached.exptime(max(self.ttl_absoluto, 0), agora)
+
+    def refresh(self, cached: Cached, token: str, data: SimpleUserSession):
+        if self.ttl_deslizante <= 0:
+            return
+
+        if self._renovados is not None:
+            found, _ = self._renovados.get(token)
+            if found:
+                return
+
+            self._renovados.set(token, True)
+
+        cached.touch(self.SESS_TOKEN_GROUP, token, self.expire(data.criado_em), noreply=True)
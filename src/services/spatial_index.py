@@ -0,0 +1,158 @@
+import heapq
+import math
+import threading
+import time
+from typing import Dict, Tuple, Set, Iterable, List, Optional
+
+from src.classes import Point
+from src.utils import distancia_esfera, delta_graus, RAIO_TERRA_PADRAO
+
+_Celula = Tuple[int, int]
+
+
+class SpatialIndex:
+    def __init__(self, tam_celula: float, ttl: int = 0, raio_terra: float = RAIO_TERRA_PADRAO):
+        if tam_celula <= 0:
+            raise AttributeError('tam_celula should be positive')
+
+        self.tam_celula = tam_celula
+        self.ttl = ttl
+        self.raio_terra = raio_terra
+
+        self._lock = threading.RLock()
+        self._celulas: Dict[_Celula, Set[int]] = {}
+        self._coords: Dict[int, Tuple[float, float]] = {}
+        self._built_at: Optional[float] = None
+
+    def needs_rebuild(self) -> bool:
+        built_at = self._built_at
+        if built_at is None:
+            return True
+
+        return self.ttl > 0 and time.monotonic() - built_at > self.ttl
+
+    def build(self, items: Iterable[Tuple[int, Optional[Point]]]):
+        celulas, coords = {}, {}
+        for estacio_id, coordenadas in items:
+            if coordenadas is None:
+                continue
+
+            lat, lon = float(coordenadas.x), float(coordenadas.y)
+            coords[estacio_id] = (lat, lon)
+            celulas.setdefault(self._celula(lat, lon), set()).add(estacio_id)
+
+        with self._lock:
+            self._celulas, self._coords = celulas, coords
+            self._built_at = time.monotonic()
+
+    def update(self, estacio_id: int, coordenadas: Optional[Point]):
+        with self._lock:
+            if self._built_at is None:
+                return
+
+            self._remove(estacio_id)
+
+            if coordenadas is not None:
+                lat, lon = float(coordenadas.x), float(coordenadas.y)
+                self._coords[estacio_id] = (lat, lon)
+                self._celulas.setdefault(self._celula(lat, lon), set()).add(estacio_id)
+
+    def remove(self, estacio_id: int):
+        with self._lock:
+            self._remove(estacio_id)
+
+    def clear(self):
+        with self._lock:
+            self._celulas, self._coords = {}, {}
+            self._built_at = None
+
+    def query_radius(self, centro: Point, distancia: float) -> List[Tuple[int, float]]:
+        lat, lon = float(centro.x), float(centro.y)
+        d_lat, d_lon = delta_graus(lat, distancia, self.raio_terra)
+
+        cel_lat_min, cel_lon_min = self._celula(lat - d_lat, lon - d_lon)
+        cel_lat_max, cel_lon_max = self._celula(lat + d_lat, lon + d_lon)
+
+        ret = []
+        with self._lock:
+            for cel_lat in range(cel_lat_min, cel_lat_max + 1):
+                for cel_lon in range(cel_lon_min, cel_lon_max + 1):
+                    for estacio_id in self._celulas.get((cel_lat, cel_lon), ()):
+                        e_lat, e_lon = self._coords[estacio_id]
+                        d = distancia_esfera(lat, lon, e_lat, e_lon, self.raio_terra)
+                        if d <= distancia:
+                            ret.append((estacio_id, d))
+
+        ret.sort()
+        return ret
+
+    def nearest(self, centro: Point, k: int, distancia: float) -> List[Tuple[int, float]]:
+        lat, lon = float(centro.x), float(centro.y)
+        cel_lat, cel_lon = self._celula(lat, lon)
+
+        d_lat, d_lon = delta_graus(lat, distancia, self.raio_terra)
+        max_anel = math.ceil(max(d_lon, d_lat) / self.tam_celula) + 1
+
+        # Max-heap com os k mais proximos ja encontrados: (-distancia, -id)
+        heap = []
+        with self._lock:
+            for anel in range(max_anel + 1):
+                dist_min = self._dist_min_anel(lat, anel)
+                if dist_min > distancia or (len(heap) == k and dist_min > -heap[0][0]):
+                    break
+
+                for celula in self._celulas_anel(cel_lat, cel_lon, anel):
+                    for estacio_id in self._celulas.get(celula, ()):
+                        e_lat, e_lon = self._coords[estacio_id]
+                        d = distancia_esfera(lat, lon, e_lat, e_lon, self.raio_terra)
+                        if d > distancia:
+                            continue
+
+                        if len(heap) < k:
+                            heapq.heappush(heap, (-d, -estacio_id))
+                        elif (d, estacio_id) < (-heap[0][0], -heap[0][1]):
+                            heapq.heapreplace(heap, (-d, -estacio_id))
+
+        return sorted(((-i, -d) for d, i in heap), key=lambda x: (x[1], x[0]))
+
+    def __len__(self):
+        return len(self._coords)
+
+    def _remove(self, estacio_id: int):
+        coords = self._coords.pop(estacio_id, None)
+        if coords is not None:
+            celula = self._celula(*coords)
+            ids = self._celulas.get(celula)
+            if ids is not None:
+                ids.discard(estacio_id)
+                if not ids:
+                    del self._celulas[celula]
+
+    def _dist_min_anel(self, lat: float, anel: int) -> float:
+        # Limite inferior da distancia entre o centro e qualquer ponto de uma celula do anel
+        if anel <= 1:
+            return 0.0
+
+        delta = math.radians((anel - 1) * self.tam_celula)
+        lat_max = math.radians(min(90.0, abs(lat) + (anel + 1) * self.tam_celula))
+
+        dist_lat = self.raio_terra * delta
+        dist_lon = 2 * self.raio_terra * math.asin(min(1.0, math.cos(lat_max) * math.sin(min(delta, math.pi) / 2)))
+        return min(dist_lat, dist_lon)
+
+    @staticmethod
+    def _celulas_anel(cel_lat: int, cel_lon: int, anel: int) -> Iterable[_Celula]:
+        if anel == 0:
+            yield cel_lat, cel_lon
+            return
+
+        for d in range(-anel, anel + 1):
+            yield cel_lat - anel, cel_lon + d
+            yield cel_lat + anel, cel_lon + d
+        for d in range(-anel + 1, anel):
+            yield cel_lat + d, cel_lon - anel
+            yield cel_lat + d, cel_lon + anel
+
+    def _celula(self, lat: float, lon: float) -> _Celula:
+        # Os Point sao gravados como (lat, lon)
+        return math.floor(lat / self.tam_celula), math.floor(lon / self.tam_celula)
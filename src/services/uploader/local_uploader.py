@@ -1,7 +1,7 @@
 import os
 from pathlib import Path
 
-from src.classes import FileStream
+from src.classes import FileStream, MemoryFileStream
 from src.enums import UploadStatus
 from src.models import Upload
 from src.services.uploader.uploader import Uploader
@@ -24,8 +24,30 @@ class LocalUploader(Uploader):
         with open(final_path, mode='wb') as f:
             f.write(fstream.read())
 
-        return Upload(nome_arquivo=name, sub_dir=sub_group, status=UploadStatus.CONCLUIDO)
+        upload = Upload(nome_arquivo=name, sub_dir=sub_group, status=UploadStatus.CONCLUIDO)
+
+        variants = fstream.variants if isinstance(fstream, MemoryFileStream) else {}
+        for largura, variant in variants.items():
+            with open(self.base_path / sub_group / upload.nome_variante(largura), mode='wb') as f:
+                f.write(variant.read())
+
+        if variants:
+            upload.variantes = ','.join(str(x) for x in sorted(variants))
+
+        return upload
+
+    def open(self, upload: Upload) -> FileStream:
+        final_path = self.base_path / upload.sub_dir / upload.nome_arquivo
+
+        with open(final_path, mode='rb') as f:
+            return MemoryFileStream(f.read())
 
     def delete(self, upload: Upload):
         final_path = self.base_path / upload.sub_dir / upload.nome_arquivo
         os.remove(final_path)
+
+        for largura in upload.larguras_variantes:
+            try:
+                os.remove(self.base_path / upload.sub_dir / upload.nome_variante(largura))
+            except FileNotFoundError:
+                pass
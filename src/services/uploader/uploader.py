@@ -9,6 +9,10 @@ class Uploader(ABC):
     def upload(self, fstream: FileStream, sub_group: str, name: str) -> Upload:
         pass
 
+    @abstractmethod
+    def open(self, upload: Upload) -> FileStream:
+        pass
+
     @abstractmethod
     def delete(self, upload: Upload):
         pass
@@ -1,4 +1,7 @@
 from src.utils.random_string import random_string
 from src.utils.general_validation import validate_telefone
 from src.utils.time_from_seconds import time_from_total_seconds
-from src.utils.db_utils import db_check_if_exists
+from src.utils.db_utils import db_check_if_exists, keyset_paginate
+from src.utils.geo import distancia_esfera, delta_graus, RAIO_TERRA_PADRAO
+from src.utils.cursor import encode_cursor, decode_cursor, tamanho_pagina
+from src.utils.eager_loading import load_options_from_info
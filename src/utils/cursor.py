@@ -0,0 +1,29 @@
+import base64
+import binascii
+from typing import Optional
+
+
+def encode_cursor(tipo: str, obj_id: int) -> str:
+    return base64.urlsafe_b64encode(f'{tipo}:{obj_id}'.encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(tipo: str, cursor: str) -> Optional[int]:
+    try:
+        decoded = base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8')
+    except (binascii.Error, UnicodeError, ValueError):
+        return None
+
+    # isdigit() aceita digitos Unicode (ex.: '²') que o int() nao converte
+    cursor_tipo, _, obj_id = decoded.partition(':')
+    if cursor_tipo != tipo or not obj_id.isascii() or not obj_id.isdecimal():
+        return None
+
+    return int(obj_id)
+
+
+def tamanho_pagina(amount: int, tamanho_max: int) -> int:
+    # amount/first em 0 (ou acima do maximo) vira o tamanho maximo da pagina, quando existe um
+    if tamanho_max > 0 and (amount <= 0 or amount > tamanho_max):
+        return tamanho_max
+
+    return amount
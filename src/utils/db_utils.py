@@ -1,3 +1,21 @@
+from typing import Optional, Tuple
+
+
 def db_check_if_exists(sess, cls, obj_id) -> bool:
     q_exists = sess.query(cls).filter(cls.id == obj_id).exists()
     return sess.query(q_exists).scalar()
+
+
+def keyset_paginate(query, pk, first: int, after_id: Optional[int] = None) -> Tuple[list, bool]:
+    # Usa a chave primaria como limite em vez de OFFSET, assim o custo nao cresce com a profundidade da pagina
+    if after_id is not None:
+        query = query.filter(pk > after_id)
+
+    query = query.order_by(pk)
+    if first > 0:
+        query = query.limit(first + 1)
+
+    itens = query.all()
+    tem_proxima = 0 < first < len(itens)
+
+    return itens[:first] if tem_proxima else itens, tem_proxima
@@ -0,0 +1,62 @@
+from typing import List, Iterable, Optional
+
+from ariadne.utils import convert_camel_case_to_snake
+from graphql import GraphQLResolveInfo, FieldNode, FragmentSpreadNode, InlineFragmentNode, SelectionSetNode
+from sqlalchemy import inspect
+from sqlalchemy.orm import selectinload, joinedload
+
+
+def load_options_from_info(info: Optional[GraphQLResolveInfo], model, *path: str) -> List:
+    # Converte os campos pedidos pelo cliente em opcoes de carregamento do SQLAlchemy. O path indica onde o
+    # model esta dentro da resposta do resolver (ex.: 'estacionamentos' em EstacioListRes)
+    if info is None:
+        return []
+
+    selections = _fields(info, [n.selection_set for n in info.field_nodes])
+    for name in path:
+        selections = _fields(info, [f.selection_set for f in selections if f.name.value == name])
+
+    return _options(info, inspect(model), selections, None)
+
+
+def _options(info: GraphQLResolveInfo, mapper, fields: List[FieldNode], parent) -> List:
+    por_nome = {}
+    for f in fields:
+        por_nome.setdefault(convert_camel_case_to_snake(f.name.value), []).append(f)
+
+    ret = []
+    for name, nodes in por_nome.items():
+        prop = mapper.relationships.get(name)
+        if prop is None:
+            continue
+
+        attr = getattr(mapper.class_, name)
+        # Colecoes usam selectinload para nao multiplicar as linhas do pai, o resto vem no mesmo SELECT
+        if prop.uselist:
+            option = parent.selectinload(attr) if parent is not None else selectinload(attr)
+        else:
+            option = parent.joinedload(attr) if parent is not None else joinedload(attr)
+
+        children = _options(info, prop.mapper, _fields(info, [n.selection_set for n in nodes]), option)
+        ret.extend(children or [option])
+
+    return ret
+
+
+def _fields(info: GraphQLResolveInfo, selection_sets: Iterable[Optional[SelectionSetNode]]) -> List[FieldNode]:
+    ret = []
+    for selection_set in selection_sets:
+        if selection_set is None:
+            continue
+
+        for selection in selection_set.selections:
+            if isinstance(selection, FieldNode):
+                ret.append(selection)
+            elif isinstance(selection, InlineFragmentNode):
+                ret.extend(_fields(info, [selection.selection_set]))
+            elif isinstance(selection, FragmentSpreadNode):
+                fragment = info.fragments.get(selection.name.value)
+                if fragment is not None:
+                    ret.extend(_fields(info, [fragment.selection_set]))
+
+    return ret
@@ -0,0 +1,31 @@
+import math
+from typing import Tuple
+
+# Raio usado por padrao pelo ST_Distance_Sphere do MySQL, em km
+RAIO_TERRA_PADRAO = 6370.986
+
+
+def distancia_esfera(lat1: float, lon1: float, lat2: float, lon2: float, raio: float = RAIO_TERRA_PADRAO) -> float:
+    # Mesma formula (haversine) do ST_Distance_Sphere, com os argumentos na ordem dos Point gravados: (lat, lon)
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lon2 - lon1)
+
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * raio * math.asin(min(1.0, math.sqrt(a)))
+
+
+def delta_graus(lat: float, distancia: float, raio: float = RAIO_TERRA_PADRAO) -> Tuple[float, float]:
+    # Meia altura (lat) e meia largura (lon), em graus, da caixa que contem o circulo de `distancia` km
+    d_lat = math.degrees(distancia / raio)
+
+    cos_lat = math.cos(math.radians(lat))
+    razao = math.sin(distancia / raio) / cos_lat if cos_lat > 1e-9 else 2.0
+
+    # Se o circulo alcanca um dos polos, todas as longitudes precisam ser consideradas
+    if razao >= 1.0 or distancia / raio >= math.pi / 2:
+        d_lon = 180.0
+    else:
+        d_lon = math.degrees(math.asin(razao))
+
+    return d_lat, d_lon
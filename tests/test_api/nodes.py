@@ -159,6 +159,23 @@ class PedidoCadastroResListNode(Type):
     pedidos_cadastro = list_of(PedidoCadastroNode)
 
 
+class PageInfoNode(Type):
+    has_next_page = Boolean
+    end_cursor = String
+
+
+class PedidoCadastroEdgeNode(Type):
+    cursor = String
+    node = PedidoCadastroNode
+
+
+class PedidoCadastroConnectionResNode(Type):
+    success = Boolean
+    error = String
+    edges = list_of(PedidoCadastroEdgeNode)
+    page_info = PageInfoNode
+
+
 class EstacioCadResNode(Type):
     success = Boolean
     error = String
@@ -172,6 +189,7 @@ class SimpleResponseNode(Type):
 
 class Mutation(Type):
     login = Field(LoginResNode, args={'tipo': UserTypeNode, 'email': String, 'senha': String})
+    logout_all = Field(SimpleResponseNode)
     create_admin_sistema = Field(CreateResNode, args={'nome': String, 'email': String, 'senha': String})
     create_pedido_cadastro = Field(PedidoCadastroResNode, args={'nome': String, 'telefone': String,
                                                                 'endereco': EnderecoNode, 'foto': Upload})
@@ -187,3 +205,4 @@ class Mutation(Type):
 class Query(Type):
     get_pedido_cadastro = Field(PedidoCadastroResNode, args={'pedido_id': ID})
     list_pedido_cadastro = Field(PedidoCadastroResListNode, args={'amount': Int, 'index': Int})
+    list_pedido_cadastro_connection = Field(PedidoCadastroConnectionResNode, args={'first': Int, 'after': String})
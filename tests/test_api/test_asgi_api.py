@@ -0,0 +1,313 @@
+import asyncio
+import hashlib
+import inspect
+import json
+import logging
+import pathlib
+import threading
+import time
+import unittest
+from unittest.mock import Mock
+from urllib.parse import urlencode
+
+from dependency_injector.providers import Singleton
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+from src.asgi import create_asgi_app, LimiteCorpoMiddleware
+from src.classes import RequestContext
+from src.container import create_container
+from src.graphql_server import _batch_resolver
+from src.models import AdminEstacio, Estacionamento, PedidoCadastro
+from src.models.base import Base
+from src.repo.repo_container import create_repo_container
+from tests.factories import VeiculoFactory
+from tests.utils import make_mocked_cached_provider, singleton_provider, disable_email_sender
+
+
+async def _asgi_request(app, method: str, body: dict = None, params: dict = None, with_headers: bool = False,
+                        path: str = '/graphql'):
+    query_string = urlencode(params or {}).encode('utf-8')
+    scope = {'type': 'http', 'http_version': '1.1', 'method': method, 'path': path, 'root_path': '',
+             'scheme': 'http', 'query_string': query_string, 'headers': [(b'content-type', b'application/json')],
+             'client': ('127.0.0.1', 12345), 'server': ('testserver', 80)}
+    request_sent = False
+    messages = []
+
+    async def receive():
+        nonlocal request_sent
+        if request_sent:
+            return {'type': 'http.disconnect'}
+
+        request_sent = True
+        return {'type': 'http.request', 'body': json.dumps(body or {}).encode('utf-8'), 'more_body': False}
+
+    async def send(message):
+        messages.append(message)
+
+    await app(scope, receive, send)
+
+    status = messages[0]['status']
+    content = b''.join(m.get('body', b'') for m in messages[1:])
+    if with_headers:
+        headers = {k.decode('latin-1'): v.decode('latin-1') for k, v in messages[0]['headers']}
+        return status, content, headers
+
+    return status, content
+
+
+async def _echo_app(scope, receive, send):
+    body = b''
+    while True:
+        message = await receive()
+        body += message.get('body', b'')
+        if not message.get('more_body', False):
+            break
+
+    await send({'type': 'http.response.start', 'status': 200, 'headers': []})
+    await send({'type': 'http.response.body', 'body': body})
+
+
+async def _chunked_request(app, chunks, headers=()):
+    scope = {'type': 'http', 'method': 'POST', 'path': '/graphql', 'headers': list(headers)}
+    pendentes = list(chunks)
+    messages = []
+
+    async def receive():
+        if not pendentes:
+            return {'type': 'http.disconnect'}
+
+        return {'type': 'http.request', 'body': pendentes.pop(0), 'more_body': bool(pendentes)}
+
+    async def send(message):
+        messages.append(message)
+
+    await app(scope, receive, send)
+    return messages[0]['status']
+
+
+class TestLimiteCorpo(unittest.TestCase):
+    def test_limite(self):
+        app = LimiteCorpoMiddleware(_echo_app, max_bytes=10)
+
+        self.assertEqual(200, asyncio.run(_chunked_request(app, [b'x' * 5, b'x' * 5])))
+        self.assertEqual(413, asyncio.run(_chunked_request(app, [b'x' * 5, b'x' * 6])),
+                         'Should count the bytes while they arrive')
+
+        inner = Mock()
+        app = LimiteCorpoMiddleware(inner, max_bytes=10)
+        self.assertEqual(413, asyncio.run(_chunked_request(app, [b'x'], [(b'content-length', b'11')])))
+        inner.assert_not_called()
+
+    def test_sem_limite(self):
+        app = LimiteCorpoMiddleware(_echo_app, max_bytes=0)
+        self.assertEqual(200, asyncio.run(_chunked_request(app, [b'x' * 100])))
+
+
+class TestAsgiApi(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        config_path = str(pathlib.Path(__file__).parents[2] / 'test.ini')
+        cls.container = create_container(config_path)
+        disable_email_sender(cls.container)
+        cls.repo_container = create_repo_container(config_path)
+
+    def setUp(self) -> None:
+        logging.basicConfig(level=logging.FATAL)
+        self.container.cached.override(make_mocked_cached_provider(self.container))
+
+        self.db_session_maker = Mock()
+        self.container.db_session_maker.override(singleton_provider(self.db_session_maker))
+
+        self.repo_container.veiculo_crud_repo.override(Singleton(Mock))
+        self.repo = self.repo_container.veiculo_crud_repo()
+
+        self.app = create_asgi_app(self.container, self.repo_container)
+        self.veiculos = VeiculoFactory.build_batch(3)
+
+    def tearDown(self) -> None:
+        self.container.db_session_maker.reset_override()
+        self.repo_container.veiculo_crud_repo.reset_override()
+
+        self.container.cached().close()
+
+    def test_list_veiculo_ok(self):
+        def fake_list(sess):
+            sess.query('veiculo')
+            return True, self.veiculos
+
+        self.repo.list.side_effect = fake_list
+
+        body = {'query': '{ listVeiculo { success veiculos { id nome } } }'}
+        status, content = asyncio.run(_asgi_request(self.app, 'POST', body))
+        data = json.loads(content)['data']['listVeiculo']
+
+        self.assertEqual(200, status, 'Should return a 200 OK code')
+        self.assertEqual(True, data['success'], 'Success should be True')
+        self.assertListEqual([v.nome for v in self.veiculos], [v['nome'] for v in data['veiculos']], 'Should match')
+
+        sess = self.db_session_maker.return_value
+        self.repo.list.assert_called_once()
+        sess.query.assert_called_once_with('veiculo')
+        sess.rollback.assert_called_once()
+        sess.close.assert_called_once()
+
+    def test_playground(self):
+        status, _ = asyncio.run(_asgi_request(self.app, 'GET'))
+        self.assertEqual(200, status, 'Should render the playground')
+
+    def test_metrics(self):
+        metrics = Mock()
+        metrics.snapshot.return_value = {'db': {'checkouts': 3}}
+        self.container.metrics.override(singleton_provider(metrics))
+        try:
+            status, content = asyncio.run(_asgi_request(self.app, 'GET', path='/metrics'))
+        finally:
+            self.container.metrics.reset_override()
+
+        self.assertEqual(200, status)
+        self.assertEqual({'db': {'checkouts': 3}}, json.loads(content))
+
+    def test_get_persisted_query(self):
+        self.repo.list.return_value = (True, self.veiculos)
+
+        query = '{ listVeiculo { success } }'
+        extensions = {'persistedQuery': {'version': 1, 'sha256Hash': hashlib.sha256(query.encode()).hexdigest()}}
+
+        status, content = asyncio.run(_asgi_request(self.app, 'GET', params={'extensions': json.dumps(extensions)}))
+        self.assertEqual('PERSISTED_QUERY_NOT_FOUND', json.loads(content)['errors'][0]['extensions']['code'])
+
+        params = {'query': query, 'extensions': json.dumps(extensions)}
+        status, content = asyncio.run(_asgi_request(self.app, 'GET', params=params))
+        self.assertEqual(200, status, 'Should register the query')
+
+        status, content, headers = asyncio.run(_asgi_request(self.app, 'GET', with_headers=True,
+                                                             params={'extensions': json.dumps(extensions)}))
+        self.assertEqual(200, status, 'Should execute using only the hash')
+        self.assertEqual(True, json.loads(content)['data']['listVeiculo']['success'])
+        self.assertEqual('public, max-age=60', headers.get('cache-control'), 'Should be cacheable')
+
+    def test_get_mutation(self):
+        params = {'query': 'mutation { login(email: "a@b.com", senha: "123", tipo: SISTEMA) { success } }'}
+        status, content, headers = asyncio.run(_asgi_request(self.app, 'GET', params=params, with_headers=True))
+
+        self.assertEqual(400, status, 'Should not run mutations over GET')
+        self.assertNotIn('cache-control', headers, 'Errors should not be cached')
+        self.assertEqual('OPERATION_NOT_ALLOWED', json.loads(content)['errors'][0]['extensions']['code'])
+        self.db_session_maker.assert_not_called()
+
+    def test_blocking_resolvers_run_concurrently(self):
+        def slow_list(_):
+            time.sleep(0.3)
+            return True, self.veiculos
+
+        self.repo.list.side_effect = slow_list
+
+        async def run_many():
+            body = {'query': '{ listVeiculo { success } }'}
+            return await asyncio.gather(*[_asgi_request(self.app, 'POST', body) for _ in range(4)])
+
+        start = time.perf_counter()
+        results = asyncio.run(run_many())
+        elapsed = time.perf_counter() - start
+
+        self.assertListEqual([200] * 4, [status for status, _ in results], 'All requests should succeed')
+        self.assertLess(elapsed, 0.3 * 4, 'Blocking resolvers should not serialize the requests')
+
+    def test_nested_relationships_off_loop(self):
+        # Relacionamentos aninhados e atributos expirados pelo commit tambem consultam o banco: precisam rodar fora
+        # do event loop e com o lock da sessao, mesmo com outro campo do mesmo nivel usando a sessao em paralelo
+        engine = create_engine('sqlite://', connect_args={'check_same_thread': False}, poolclass=StaticPool)
+        Base.metadata.create_all(engine, tables=[Estacionamento.__table__, AdminEstacio.__table__,
+                                                 PedidoCadastro.__table__])
+
+        with Session(engine) as sess:
+            sess.add(Estacionamento(id=1, nome='Estacio', esta_suspenso=False, esta_aberto=True,
+                                    cadastro_terminado=True, telefone='+5511999999999', qtd_vaga_livre=1,
+                                    total_vaga=10, horap_fk=1, endereco_fk=1))
+            sess.add(AdminEstacio(id=1, email='a@b.com', senha=b'x', admin_mestre=True, estacio_fk=1))
+            sess.add(PedidoCadastro(id=1, nome='Pedido', telefone='+5511999999999', num_rejeicoes=0, endereco_fk=1,
+                                    admin_estacio_fk=1))
+            sess.commit()
+
+        threads, em_uso = [], []
+        lock = threading.Lock()
+
+        def before_execute(*_):
+            threads.append(threading.current_thread())
+            if not lock.acquire(blocking=False):
+                em_uso.append(True)
+
+        def after_execute(*_):
+            lock.release()
+
+        event.listen(engine, 'before_cursor_execute', before_execute)
+        event.listen(engine, 'after_cursor_execute', after_execute)
+
+        def list_pedidos(_, sess, **__):
+            pedidos = sess.query(PedidoCadastro).all()
+            sess.commit()  # Como uma mutation: expira todos os atributos
+            return True, pedidos
+
+        def slow_list(sess):
+            time.sleep(0.1)
+            return True, self.veiculos
+
+        session_maker = Mock(has_replicas=False, side_effect=lambda replica=False: Session(engine))
+        self.container.db_session_maker.override(singleton_provider(session_maker))
+        self.repo.list.side_effect = slow_list
+        self.repo_container.pedido_cadastro_crud_repo.override(Singleton(Mock))
+        try:
+            self.repo_container.pedido_cadastro_crud_repo().list.side_effect = list_pedidos
+            app = create_asgi_app(self.container, self.repo_container)
+
+            body = {'query': '{ listVeiculo { success } listPedidoCadastro { success pedidosCadastro { nome '
+                             'adminEstacio { email estacionamento { nome } } } } }'}
+            status, content = asyncio.run(_asgi_request(app, 'POST', body))
+        finally:
+            self.repo_container.pedido_cadastro_crud_repo.reset_override()
+            engine.dispose()
+
+        data = json.loads(content)['data']
+        self.assertEqual(200, status, f'Should return a 200 OK code: {content}')
+        self.assertEqual(True, data['listVeiculo']['success'])
+        pedido = data['listPedidoCadastro']['pedidosCadastro'][0]
+        self.assertEqual('Pedido', pedido['nome'])
+        self.assertEqual({'email': 'a@b.com', 'estacionamento': {'nome': 'Estacio'}}, pedido['adminEstacio'])
+
+        self.assertGreaterEqual(len(threads), 4, 'Should refresh the expired pedido and load both relationships')
+        self.assertNotIn(threading.main_thread(), threads, 'Should not query the db on the event loop')
+        self.assertEqual([], em_uso, 'Should not use the session concurrently')
+
+    def test_batch_resolver_lock(self):
+        context = RequestContext({}, Mock())
+        context.batch_loader = Mock()
+        context.batch_loader.needs_load.return_value = False
+        context.batch_loader.load.return_value = 'valor'
+        info = Mock(context=context)
+
+        resolver = _batch_resolver('endereco', async_resolvers=True)
+        self.assertEqual('valor', resolver(object(), info), 'Should resolve on the event loop when the lock is free')
+
+        acquired, release = threading.Event(), threading.Event()
+
+        def hold_lock():
+            with context.lock:
+                acquired.set()
+                release.wait()
+
+        thread = threading.Thread(target=hold_lock)
+        thread.start()
+        acquired.wait()
+
+        ret = resolver(object(), info)
+        self.assertTrue(inspect.isawaitable(ret), 'Should go to the threadpool when the session is in use')
+
+        release.set()
+        thread.join()
+        self.assertEqual('valor', asyncio.run(ret))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -11,7 +11,7 @@ from src.app import create_app
 from src.container import create_container
 from src.repo.repo_container import create_repo_container
 from tests.test_api.nodes import Mutation, UserTypeNode
-from tests.utils import disable_email_sender
+from tests.utils import disable_email_sender, singleton_provider
 
 
 class TestAuthApi(unittest.TestCase):
@@ -28,6 +28,11 @@ class TestAuthApi(unittest.TestCase):
         self.repo_container.auth_repo.override(Singleton(Mock))
         self.repo = self.repo_container.auth_repo()
 
+        self.limiter = Mock()
+        self.limiter.allow.return_value = True
+        self.container.login_limiter_email.override(singleton_provider(self.limiter))
+        self.container.login_limiter_ip.override(singleton_provider(self.limiter))
+
         self.app = create_app(self.container, self.repo_container)
         self.client = self.app.test_client(use_cookies=False)
 
@@ -84,6 +89,34 @@ class TestAuthApi(unittest.TestCase):
                 self.assertEqual(False, data['success'], f'Success should be False on {info}')
                 self.assertIsNone(data['token'], f'Token should be null on {info}')
 
+    def test_login_rate_limited(self):
+        self.limiter.allow.return_value = False
+
+        mutation = Operation(Mutation)
+        mutation.login(tipo=UserTypeNode('SISTEMA'), email='Jorge@email.com', senha='senha123')
+
+        response = self.client.post('/graphql', json={'query': str(mutation)})
+        data = self._check_response(response, 0)
+
+        self.assertEqual('muitas_tentativas', data['error'], 'Should return the rate limit error')
+        self.assertEqual(False, data['success'], 'Success should be False')
+        self.repo.login.assert_not_called()
+
+    def test_logout_all(self):
+        self.repo.logout_all.return_value = (True, None)
+
+        mutation = Operation(Mutation)
+        mutation.logout_all()
+
+        response = self.client.post('/graphql', json={'query': str(mutation)})
+        self.assertEqual(200, response.status_code, 'Should return a 200 OK code')
+        self.assertEqual({'success': True, 'error': None}, response.json['data']['logoutAll'])
+        self.repo.logout_all.assert_called_once_with(None)
+
+    def tearDown(self) -> None:
+        self.container.login_limiter_email.reset_override()
+        self.container.login_limiter_ip.reset_override()
+
     def _check_response(self, response, i):
         self.assertEqual(200, response.status_code, 'Should return a 200 OK code')
         self.assertIn('data', response.json, f'JSON should contain "data" on {i}')
@@ -0,0 +1,61 @@
+import unittest
+from unittest.mock import Mock
+
+from src.api.base import BaseApi
+from src.classes import RequestContext, SimpleUserSession
+from src.enums import UserType
+from src.services import SessionExpiration
+
+
+class TestBaseApi(unittest.TestCase):
+    def setUp(self) -> None:
+        self.session_expiration = Mock(spec=SessionExpiration)
+        self.api = BaseApi({}, {}, session_expiration=self.session_expiration)
+        self.sess = Mock()
+        self.cached = Mock()
+        self.cached.get.return_value = SimpleUserSession(UserType.ESTACIONAMENTO.value, 7)
+
+    def _info(self, headers: dict):
+        return Mock(context=RequestContext(headers, self.sess))
+
+    def test_user_session_memo(self):
+        info = self._info({'Authorization': 'Bearer abc'})
+
+        user_sess = self.api.get_user_session(self.sess, self.cached, info)
+        self.assertEqual(7, user_sess.user_id)
+        self.assertIs(user_sess, self.api.get_user_session(self.sess, self.cached, info), 'Should reuse the session')
+        self.cached.get.assert_called_once_with(BaseApi.SESS_TOKEN_GROUP, 'abc')
+        self.session_expiration.refresh.assert_called_once_with(self.cached, 'abc', self.cached.get.return_value)
+
+        self.api.get_user_session(self.sess, self.cached, self._info({'Authorization': 'Bearer abc'}))
+        self.assertEqual(2, self.cached.get.call_count, 'Should be per request')
+
+    def test_user_loaded_once(self):
+        info = self._info({'Authorization': 'Bearer abc'})
+        admin = self.sess.query.return_value.options.return_value.get.return_value
+
+        user_sess = self.api.get_user_session(self.sess, self.cached, info)
+        self.assertIs(admin, user_sess.get_user(eager=True))
+        self.assertIs(admin, user_sess.user)
+        self.assertIs(admin, self.api.get_user_session(self.sess, self.cached, info).user)
+
+        self.assertEqual(1, user_sess.user_loads, 'Should load the user once per request')
+        self.sess.query.return_value.options.return_value.get.assert_called_once_with(7)
+
+        user_sess.set_db_session(Mock())
+        self.assertIsNot(admin, user_sess.user, 'Should reload with another db session')
+        self.assertEqual(2, user_sess.user_loads)
+
+    def test_user_session_not_found(self):
+        self.cached.get.return_value = None
+        info = self._info({'Authorization': 'Bearer abc'})
+
+        self.assertIsNone(self.api.get_user_session(self.sess, self.cached, info))
+        self.assertIsNone(self.api.get_user_session(self.sess, self.cached, info))
+        self.cached.get.assert_called_once()
+
+        self.assertIsNone(self.api.get_user_session(self.sess, self.cached, self._info({})))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -57,7 +57,8 @@ class TestPedidoCadastroCreateApi(BaseTestPedidoCadastroApi):
 
         for error in ['nome_muito_grande', 'sem_permissao', 'telefone_formato_invalido',
                       'telefone_sem_cod_internacional', 'telefone_muito_grande', 'foto_formato_invalido',
-                      'upload_error', 'limite_pedido_atingido', 'foto_processing_error', None]:
+                      'upload_error', 'limite_pedido_atingido', 'foto_processing_error', 'foto_muito_grande',
+                      None]:
             foto_stream = BytesIO(b'abc')
 
             self.repo.create.reset_mock()
@@ -3,6 +3,7 @@ from unittest.mock import ANY
 
 from sgqlc.operation import Operation
 
+from src.classes import Pagina
 from tests.test_api.nodes import Query
 from tests.test_api.test_pedido_cadastro_api.base import BaseTestPedidoCadastroApi
 
@@ -22,7 +23,7 @@ class TestPedidoCadastroListApi(BaseTestPedidoCadastroApi):
         self.assertEqual(True, data['success'], 'Success should be True')
 
         self.assert_pedido_equal(pedido_real, data['pedidoCadastro'], 'Pedidos should match')
-        self.repo.get.assert_called_once_with(self.user_sess, ANY, str(pedido_real.id))
+        self.repo.get.assert_called_once_with(self.user_sess, ANY, str(pedido_real.id), load_options=ANY)
 
     def test_get_adm_estacio_ok(self):
         pedido_real = self.pedidos[0]
@@ -38,7 +39,7 @@ class TestPedidoCadastroListApi(BaseTestPedidoCadastroApi):
         self.assertEqual(True, data['success'], 'Success should be True')
 
         self.assert_pedido_equal(pedido_real, data['pedidoCadastro'], 'Pedidos should match')
-        self.repo.get.assert_called_once_with(self.user_sess, ANY, None)
+        self.repo.get.assert_called_once_with(self.user_sess, ANY, None, load_options=ANY)
 
     def test_get_errors(self):
         for error in ['sem_permissao', 'pedido_nao_encontrado', 'sem_pedido', None]:
@@ -69,7 +70,7 @@ class TestPedidoCadastroListApi(BaseTestPedidoCadastroApi):
         response = self.client.post('/graphql', json={'query': query.__to_graphql__(auto_select_depth=5)})
         data = self.check_response(response, 'listPedidoCadastro')
 
-        self.repo.list.assert_called_once_with(self.user_sess, ANY, amount=3, index=2)
+        self.repo.list.assert_called_once_with(self.user_sess, ANY, amount=3, index=2, load_options=ANY)
 
         self.assertIsNone(data['error'], 'Error should be None')
         self.assertEqual(True, data['success'], 'Success should be True')
@@ -95,6 +96,45 @@ class TestPedidoCadastroListApi(BaseTestPedidoCadastroApi):
             self.assertEqual(False, data['success'], 'Success should be False')
             self.assertIsNone(data['pedidosCadastro'], 'Pedidos cadastro should be None')
 
+    def test_list_connection_ok(self):
+        ret_list = self.pedidos[2:5]
+        cursores = [f'c{i}' for i in range(len(ret_list))]
+        self.repo.list_page.return_value = (True, Pagina(ret_list, cursores, True))
+
+        query = Operation(Query)
+        query.list_pedido_cadastro_connection(first=3, after='abc')
+
+        response = self.client.post('/graphql', json={'query': query.__to_graphql__(auto_select_depth=5)})
+        data = self.check_response(response, 'listPedidoCadastroConnection')
+
+        self.repo.list_page.assert_called_once_with(self.user_sess, ANY, first=3, after='abc', load_options=ANY)
+
+        self.assertIsNone(data['error'], 'Error should be None')
+        self.assertEqual(True, data['success'], 'Success should be True')
+        self.assertEqual({'hasNextPage': True, 'endCursor': 'c2'}, data['pageInfo'], 'Page info should match')
+        self.assertListEqual(cursores, [e['cursor'] for e in data['edges']], 'Cursors should match')
+
+        self.assert_count_equal_pedidos(ret_list, [e['node'] for e in data['edges']], 'Pedidos should match.\n{}')
+
+    def test_list_connection_errors(self):
+        for error in ['sem_permissao', 'cursor_invalido', None]:
+            self.repo.list_page.reset_mock()
+            if error is None:
+                self.repo.list_page.side_effect = Exception('Random Error')
+                error = 'erro_desconhecido'
+            else:
+                self.repo.list_page.return_value = (False, error)
+
+            query = Operation(Query)
+            query.list_pedido_cadastro_connection(first=3)
+
+            response = self.client.post('/graphql', json={'query': query.__to_graphql__(auto_select_depth=5)})
+            data = self.check_response(response, 'listPedidoCadastroConnection')
+
+            self.assertEqual(error, data['error'], f'Error should be "{error}"')
+            self.assertEqual(False, data['success'], 'Success should be False')
+            self.assertIsNone(data['edges'], 'Edges should be None')
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -2,14 +2,15 @@ import datetime
 import pathlib
 import re
 import unittest
-from unittest.mock import ANY, MagicMock
+from unittest.mock import ANY, MagicMock, patch
 
 from src.container import create_container
 from src.enums import UserType
 from src.models import AdminSistema, AdminEstacio, admin_sistema
 from src.models.senha_request import SenhaRequest
 from src.repo import AuthRepo
-from src.services import Crypto
+from src.classes import UserSession
+from src.services import Crypto, SessionExpiration
 from tests.factories import set_session, AdminSistemaFactory, AdminEstacioFactory
 from tests.factories.factory import SenhaRequestFactory
 from tests.utils import make_general_db_setup, general_db_teardown, MockedCached, \
@@ -88,6 +89,79 @@ class TestAuthRepo(unittest.TestCase):
             self.assertNotIn(error_or_token, all_tokens, f'The tokens should be unique. Error on {i}')
             all_tokens.add(error_or_token)
 
+    def test_login_rotates_token(self):
+        _, old_token = self.repo.login(self.session, 'jorge@email.com', 'senha123', UserType.SISTEMA)
+        success, token = self.repo.login(self.session, 'jorge@email.com', 'senha123', UserType.SISTEMA)
+
+        self.assertEqual(True, success)
+        self.assertNotEqual(old_token, token)
+        self.assertIsNone(self.cached.get(AuthRepo.SESS_TOKEN_GROUP, old_token), 'Old token should be removed')
+
+        reverse_key = f'{UserType.SISTEMA.value}:{self.admin_sis[0].id}'
+        found = self.cached.get_many([(AuthRepo.SESS_TOKEN_GROUP, token),
+                                      (AuthRepo.REVERSE_SESS_TOKEN_GROUP, reverse_key)])
+        self.assertEqual(self.admin_sis[0].id, found[(AuthRepo.SESS_TOKEN_GROUP, token)].user_id)
+        self.assertEqual(token, found[(AuthRepo.REVERSE_SESS_TOKEN_GROUP, reverse_key)])
+
+    def test_login_round_trips(self):
+        self.repo.login(self.session, 'jorge@email.com', 'senha123', UserType.SISTEMA)
+
+        self.cached.client = MagicMock(wraps=self.cached.client)
+        success, _ = self.repo.login(self.session, 'jorge@email.com', 'senha123', UserType.SISTEMA)
+        self.assertEqual(True, success)
+
+        client = self.cached.client
+        self.assertEqual(1, client.get_many.call_count, 'Should read everything in one round-trip')
+        self.assertEqual(1, len([c for c in client.set_many.call_args_list if not c.kwargs['noreply']]),
+                         'Should wait for a single write round-trip')
+        client.delete_many.assert_called_once_with(ANY, noreply=True)
+        for method in (client.get, client.set, client.delete):
+            method.assert_not_called()
+
+    def test_login_expire(self):
+        self.repo.session_expiration = SessionExpiration(ttl_absoluto=3600, ttl_deslizante=600,
+                                                         intervalo_renovacao=60)
+        self.cached.client = MagicMock(wraps=self.cached.client)
+
+        success, token = self.repo.login(self.session, 'jorge@email.com', 'senha123', UserType.SISTEMA)
+        self.assertEqual(True, success)
+
+        expires = [c.kwargs['expire'] for c in self.cached.client.set_many.call_args_list]
+        self.assertListEqual([600, 3600], expires, 'Token should use the sliding ttl and the reverse key the absolute')
+        self.assertIsNotNone(self.cached.get(AuthRepo.SESS_TOKEN_GROUP, token).criado_em)
+
+    def test_login_rehash(self):
+        with patch.object(self.crypto, 'needs_rehash', return_value=True), \
+                patch.object(self.crypto, 'rehash_in_background') as rehash:
+            success, _ = self.repo.login(self.session, 'jorge@email.com', 'senha123', UserType.SISTEMA)
+
+        self.assertEqual(True, success, 'Should not wait for the rehash')
+        rehash.assert_called_once_with(b'senha123', self.admin_sis[0].senha, ANY)
+
+        novo_hash = self.crypto.hash_password(b'senha123')[:-1] + b'1'
+        self.assertTrue(AuthRepo._salvar_rehash(self.session, UserType.SISTEMA, self.admin_sis[0].id,
+                                                self.admin_sis[0].senha, novo_hash))
+        self.assertEqual(novo_hash, self.session.query(AdminSistema.senha)
+                         .filter(AdminSistema.id == self.admin_sis[0].id).scalar())
+
+        self.assertFalse(AuthRepo._salvar_rehash(self.session, UserType.SISTEMA, self.admin_sis[0].id,
+                                                 b'hash_antigo', novo_hash), 'Should not overwrite a new password')
+
+    def test_login_no_rehash(self):
+        with patch.object(self.crypto, 'rehash_in_background') as rehash:
+            self.repo.login(self.session, 'jorge@email.com', 'senha123', UserType.SISTEMA)
+
+        rehash.assert_not_called()
+
+    def test_logout_all(self):
+        _, token = self.repo.login(self.session, 'jorge@email.com', 'senha123', UserType.SISTEMA)
+        user_sess = UserSession(UserType.SISTEMA, self.admin_sis[0].id)
+
+        self.assertEqual((True, None), self.repo.logout_all(user_sess))
+        self.assertIsNone(self.cached.get(AuthRepo.SESS_TOKEN_GROUP, token), 'Token should be removed')
+        self.assertEqual((True, None), self.repo.logout_all(user_sess), 'Should work without sessions')
+        self.assertEqual((False, AuthRepo.SEM_PERMISSAO), self.repo.logout_all(None))
+
     def test_login_senha_errada(self):
         requests = [
             (UserType.SISTEMA, 'jorge@email.com'),
@@ -0,0 +1,109 @@
+import pathlib
+import unittest
+
+from sqlalchemy import event
+
+from src.classes import BatchLoader
+from src.container import create_container
+from src.models import Estacionamento
+from src.services import LazySession
+from tests.factories import set_session, EstacionamentoFactory, HorarioDivergenteFactory, ValorHoraFactory, \
+    VeiculoFactory
+from tests.utils import make_general_db_setup, make_engine, make_savepoint, general_db_teardown
+
+_ATTRS = ('endereco', 'foto', 'horario_padrao', 'valores_hora', 'horas_divergentes')
+
+
+class TestBatchLoader(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        config_path = str(pathlib.Path(__file__).parents[2] / 'test.ini')
+        cls.container = create_container(config_path)
+
+        conn_string = str(cls.container.config.get('db')['conn_string'])
+        cls.engine = make_engine(conn_string)
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.engine.dispose()
+
+    def setUp(self) -> None:
+        self.conn, self.outer_trans, self.session = make_general_db_setup(self.engine)
+        set_session(self.session)  # Factories
+
+        veiculos = VeiculoFactory.create_batch(3)
+        self.estacios = EstacionamentoFactory.create_batch(100)
+        for i, estacio in enumerate(self.estacios):
+            ValorHoraFactory.create(estacionamento=estacio, veiculo=veiculos[i % 3])
+            ValorHoraFactory.create(estacionamento=estacio, veiculo=veiculos[(i + 1) % 3])
+            HorarioDivergenteFactory.create(estacionamento=estacio)
+
+        self.session.commit()
+        make_savepoint(self.conn, self.session)
+
+        self.expected = {e.id: {attr: getattr(e, attr) for attr in _ATTRS} for e in self.estacios}
+        self.session.expunge_all()
+
+        self.num_queries = 0
+
+        @event.listens_for(self.conn, 'before_cursor_execute')
+        def count_queries(*_):
+            self.num_queries += 1
+
+    def tearDown(self) -> None:
+        general_db_teardown(self.conn, self.outer_trans, self.session)
+
+    def _resolve_all(self, loader, estacios):
+        ret = {}
+        for estacio in estacios:
+            ret[estacio.id] = {attr: loader.load(estacio, attr) for attr in _ATTRS}
+            for valor_hora in ret[estacio.id]['valores_hora']:
+                loader.load(valor_hora, 'veiculo')
+
+        return ret
+
+    def test_query_count(self):
+        estacios = self.session.query(Estacionamento).all()
+        self.num_queries = 0
+
+        loader = BatchLoader(self.session)
+        ret = self._resolve_all(loader, estacios)
+
+        # Uma consulta por relacionamento (5) e uma para os veiculos dos valores hora
+        self.assertEqual(6, self.num_queries, 'Should load each relationship with a single query')
+        self.assertEqual(6, loader.num_batches, 'Should count the batches')
+
+        for estacio in estacios:
+            expected = self.expected[estacio.id]
+            for attr in _ATTRS:
+                self.assertEqual(expected[attr], ret[estacio.id][attr], f'{attr} should match on {estacio.id}')
+
+    def test_lazy_session(self):
+        lazy = LazySession(lambda **_: self.session)
+        estacios = lazy.query(Estacionamento).all()
+
+        loader = BatchLoader(lazy)
+        self._resolve_all(loader, estacios)
+
+        self.assertEqual(6, loader.num_batches, 'Should batch through the session proxy')
+
+    def test_query_count_without_loader(self):
+        estacios = self.session.query(Estacionamento).all()
+        self.num_queries = 0
+
+        for estacio in estacios:
+            for attr in _ATTRS:
+                getattr(estacio, attr)
+
+        self.assertGreaterEqual(self.num_queries, 5 * len(estacios), 'Lazy loading should issue one query per row')
+
+    def test_transient(self):
+        estacio = EstacionamentoFactory.build()
+        loader = BatchLoader(self.session)
+
+        self.assertIs(estacio.endereco, loader.load(estacio, 'endereco'), 'Should return the attribute directly')
+        self.assertEqual(0, loader.num_batches, 'Should not batch transient objects')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,10 +2,14 @@ import pathlib
 import random
 import unittest
 
+from sqlalchemy import text
+
 from src.classes import Point
 from src.container import create_container
+from src.enums import BuscaOrderBy
 from src.models import Endereco, Estacionamento
 from src.repo import BuscarEstacioRepo
+from src.services import SpatialIndex
 from tests.factories import set_session, EnderecoFactory, EstacionamentoFactory
 from tests.utils import make_general_db_setup, make_engine, make_savepoint, general_db_teardown
 
@@ -48,11 +52,14 @@ class TestBuscarEstacioRepo(unittest.TestCase):
 
         make_savepoint(self.conn, self.session)
 
-        self.repo = BuscarEstacioRepo(self.distance)
+        self.repo = BuscarEstacioRepo(self.distance, raio_terra=self.raio_terra)
 
     def tearDown(self) -> None:
         general_db_teardown(self.conn, self.outer_trans, self.session)
 
+    def _estacio_ordered(self, i: int) -> Estacionamento:
+        return self.estacios[self.not_ordered_coords.index(self.ordered_coords[i])]
+
     def test_setup(self):
         enderecos = self.session.query(Endereco).all()
         estacios = self.session.query(Estacionamento).all()
@@ -67,10 +74,129 @@ class TestBuscarEstacioRepo(unittest.TestCase):
 
         self.assertEqual(True, success, f'Success should be True. Error: {ret}')
 
-        list_ret = list(ret)
+        list_ret = [r.estacionamento for r in ret]
         self.assertCountEqual(expect_estacios, list_ret, 'List of estacios should match')
         self.assertListEqual(expect_estacios, list_ret, 'Order of estacios should match')
 
+    def test_busca_indice_ok(self):
+        spatial_index = SpatialIndex(tam_celula=0.1)
+        repo = BuscarEstacioRepo(self.distance, modo='INDICE', spatial_index=spatial_index)
+
+        expect_ends_id = [self.enderecos[self.coords_order_map[i]].id for i in range(3)]
+        expect_estacios = self.session.query(Estacionamento).filter(Estacionamento.endereco_fk.in_(expect_ends_id)).all()
+        success, ret = repo.buscar(self.session, self.center)
+
+        self.assertEqual(True, success, f'Success should be True. Error: {ret}')
+        self.assertEqual(len(self.estacios), len(spatial_index), 'Should build the index from the db')
+        self.assertListEqual(expect_estacios, [r.estacionamento for r in ret], 'List of estacios should match')
+
+    def test_busca_indice_update(self):
+        spatial_index = SpatialIndex(tam_celula=0.1)
+        repo = BuscarEstacioRepo(self.distance, modo='INDICE', spatial_index=spatial_index)
+        repo.rebuild_index(self.session)
+
+        far_estacio = self.estacios[self.not_ordered_coords.index(self.ordered_coords[3])]
+        spatial_index.update(far_estacio.id, self.ordered_coords[0])
+
+        success, ret = repo.buscar(self.session, self.center)
+
+        self.assertEqual(True, success, f'Success should be True. Error: {ret}')
+        self.assertIn(far_estacio, [r.estacionamento for r in ret], 'Should use the updated coordinates')
+        self.assertEqual(4, len(ret), 'Should return all the estacios')
+
+    def test_busca_bbox_ok(self):
+        repo = BuscarEstacioRepo(self.distance, modo='BBOX', raio_terra=self.raio_terra)
+
+        expect_ends_id = [self.enderecos[self.coords_order_map[i]].id for i in range(3)]
+        expect_estacios = self.session.query(Estacionamento).filter(Estacionamento.endereco_fk.in_(expect_ends_id)).all()
+        success, ret = repo.buscar(self.session, self.center)
+
+        self.assertEqual(True, success, f'Success should be True. Error: {ret}')
+        self.assertCountEqual(expect_estacios, [r.estacionamento for r in ret], 'List of estacios should match')
+
+    def _plan_endereco(self, query) -> dict:
+        compiled = query.statement.compile(dialect=self.session.bind.dialect, compile_kwargs={'literal_binds': True})
+        plan = self.session.execute(text('EXPLAIN ' + str(compiled))).mappings().all()
+
+        plan_endereco = [row for row in plan if row['table'] == 'endereco']
+        self.assertEqual(1, len(plan_endereco), 'Plan should access the endereco table once')
+        return plan_endereco[0]
+
+    def test_busca_bbox_usa_indice(self):
+        repo = BuscarEstacioRepo(self.distance, modo='BBOX', raio_terra=self.raio_terra)
+
+        # Sem o FORCE INDEX: o proprio predicado (MBRContains na coluna indexada) precisa permitir o indice SPATIAL
+        plan = self._plan_endereco(repo.query_bbox(self.session, self.center, forcar_indice=False))
+        self.assertIn(BuscarEstacioRepo.INDICE_COORDENADAS, (plan['possible_keys'] or '').split(','),
+                      'The bbox predicate should be able to use the SPATIAL index')
+
+        plan = self._plan_endereco(repo.query_bbox(self.session, self.center))
+        self.assertEqual(BuscarEstacioRepo.INDICE_COORDENADAS, plan['key'], 'Should use the SPATIAL index on endereco')
+        self.assertEqual('range', plan['type'], 'Should do a range scan on the index')
+
+    def test_busca_distancia_km(self):
+        # Point(lat, lon): ~10,07 km ate o terceiro mais proximo (~10,98 km com os eixos trocados)
+        estacio = self._estacio_ordered(2)
+        repos = [self.repo, BuscarEstacioRepo(self.distance, modo='BBOX', raio_terra=self.raio_terra),
+                 BuscarEstacioRepo(self.distance, modo='INDICE', raio_terra=self.raio_terra,
+                                   spatial_index=SpatialIndex(tam_celula=0.1, raio_terra=self.raio_terra))]
+
+        for repo in repos:
+            success, ret = repo.buscar(self.session, self.center)
+            self.assertEqual(True, success, f'Success should be True. Error: {ret}')
+
+            distancias = {r.estacionamento.id: r.distancia for r in ret}
+            self.assertAlmostEqual(10.068, distancias[estacio.id], 2, f'Distance should be in km on {repo.modo}')
+
+    def test_busca_limit(self):
+        expect_estacios = [self._estacio_ordered(i) for i in range(2)]
+        for modo in ('SQL', 'BBOX', 'INDICE'):
+            repo = BuscarEstacioRepo(self.distance, modo=modo, raio_terra=self.raio_terra,
+                                     spatial_index=SpatialIndex(tam_celula=0.1, raio_terra=self.raio_terra))
+            success, ret = repo.buscar(self.session, self.center, limit=2)
+
+            self.assertEqual(True, success, f'Success should be True. Modo: {modo}. Error: {ret}')
+            self.assertListEqual(expect_estacios, [r.estacionamento for r in ret],
+                                 f'Should return the k nearest in order. Modo: {modo}')
+
+            distancias = [r.distancia for r in ret]
+            self.assertNotIn(None, distancias, f'Should return the distance. Modo: {modo}')
+            self.assertFalse(hasattr(ret[0].estacionamento, 'distancia'), 'Should not change the model')
+            self.assertListEqual(sorted(distancias), distancias, f'Should be ordered by distance. Modo: {modo}')
+
+    def test_busca_order_by(self):
+        expect_estacios = [self._estacio_ordered(i) for i in range(3)]
+        for modo in ('SQL', 'BBOX', 'INDICE'):
+            repo = BuscarEstacioRepo(self.distance, modo=modo, raio_terra=self.raio_terra,
+                                     spatial_index=SpatialIndex(tam_celula=0.1, raio_terra=self.raio_terra))
+            success, ret = repo.buscar(self.session, self.center, order_by=BuscaOrderBy.DISTANCE)
+
+            self.assertEqual(True, success, f'Success should be True. Modo: {modo}. Error: {ret}')
+            self.assertListEqual(expect_estacios, [r.estacionamento for r in ret],
+                                 f'Should be ordered by distance. Modo: {modo}')
+
+    def test_busca_limite_maximo(self):
+        repo = BuscarEstacioRepo(self.distance, raio_terra=self.raio_terra, limite_maximo=1)
+
+        success, ret = repo.buscar(self.session, self.center, limit=3)
+        self.assertEqual(True, success, f'Success should be True. Error: {ret}')
+        self.assertListEqual([self._estacio_ordered(0)], [r.estacionamento for r in ret], 'Should clamp the limit')
+
+        success, ret = repo.buscar(self.session, self.center)
+        self.assertEqual(True, success, f'Success should be True. Error: {ret}')
+        self.assertListEqual([self._estacio_ordered(0)], [r.estacionamento for r in ret],
+                             'Should clamp when there is no limit')
+
+    def test_busca_limit_invalido(self):
+        success, error = self.repo.buscar(self.session, self.center, limit=0)
+
+        self.assertEqual(False, success, 'Success should be False')
+        self.assertEqual(BuscarEstacioRepo.ERRO_LIMIT_INVALIDO, error, 'Error should match')
+
+    def test_modo_invalido(self):
+        with self.assertRaises(AttributeError):
+            BuscarEstacioRepo(self.distance, modo='ABC')
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -3,6 +3,7 @@ from unittest.mock import ANY
 
 from sqlalchemy.sql.expression import desc
 
+from src.classes import ArquivoMuitoGrande
 from src.enums import UserType
 from src.models import Estacionamento, Upload
 from src.models.endereco import Endereco
@@ -183,6 +184,16 @@ class TestEstacionamentoCrudRepoEdit(BaseTestEstacioCrudRepo):
         self.uploader.upload.assert_not_called()
         self.image_processor.compress.assert_called_once_with(self.fstream, 100, 100)
 
+    def test_edit_foto_muito_grande(self):
+        self.image_processor.compress.side_effect = ArquivoMuitoGrande('Image has 9000x9000 pixels')
+
+        success, error = self.repo.edit(self.adm_estacio_edit_sess, self.session, foto=self.fstream)
+
+        self.assertEqual(False, success, 'Success should be False')
+        self.assertEqual('foto_muito_grande', error, 'Error should be "foto_muito_grande"')
+
+        self.uploader.upload.assert_not_called()
+
     def test_edit_error_upload(self):
         self.uploader.upload.side_effect = Exception('Erro aleatorio')
         ori_upload = self.copy_upload(self.estacios[1].foto)
@@ -1,5 +1,11 @@
 import unittest
 
+from sqlalchemy import inspect
+from sqlalchemy.orm import joinedload, selectinload
+
+from src.repo import EstacionamentoCrudRepo
+from src.models import Estacionamento
+from src.utils import encode_cursor
 from tests.test_repo.test_estacionamento_crud_repo.base import BaseTestEstacioCrudRepo
 from tests.utils.get_login import get_adm_estacio
 
@@ -47,6 +53,59 @@ class TestEstacioCrudRepoList(BaseTestEstacioCrudRepo):
             self.assertEqual(True, success, f'Success should be True on {i}')
             self.assertSequenceEqual([], estacios, f'Estacios should be an empty list on {i}')
 
+    def test_list_load_options(self):
+        self.session.expunge_all()
+        options = [joinedload(Estacionamento.endereco), selectinload(Estacionamento.valores_hora)]
+
+        success, estacios = self.repo.list(self.session, load_options=options)
+        self.assertEqual(True, success, 'Success should be True')
+
+        for estacio in estacios:
+            unloaded = inspect(estacio).unloaded
+            self.assertNotIn('endereco', unloaded, 'Should eager load endereco')
+            self.assertNotIn('valores_hora', unloaded, 'Should eager load valores_hora')
+            self.assertIn('horas_divergentes', unloaded, 'Should not load relationships not asked for')
+
+    def test_list_page_ok(self):
+        ret, after = [], None
+        while True:
+            success, pagina = self.repo.list_page(self.session, first=3, after=after)
+
+            self.assertEqual(True, success, f'Success should be True. Error: {pagina}')
+            self.assertLessEqual(len(pagina.itens), 3, 'Should respect the page size')
+
+            ret.extend(pagina.itens)
+            if not pagina.tem_proxima:
+                break
+            after = pagina.cursores[-1]
+
+        self.assertSequenceEqual(self.estacios, ret, 'Should page through all estacios in order')
+
+    def test_list_page_max_size(self):
+        repo = EstacionamentoCrudRepo(self.repo.width_foto, self.repo.height_foto, tamanho_max_pagina=4,
+                                      uploader=self.uploader, image_proc=self.image_processor)
+
+        for first in (None, 100):
+            success, pagina = repo.list_page(self.session, first=first)
+
+            self.assertEqual(True, success, f'Success should be True. Error: {pagina}')
+            self.assertSequenceEqual(self.estacios[:4], pagina.itens, f'Should clamp the page size on {first}')
+            self.assertEqual(True, pagina.tem_proxima, f'Should have a next page on {first}')
+
+        success, estacios = repo.list(self.session)
+        self.assertSequenceEqual(self.estacios[:4], estacios, 'Should clamp the old list too')
+
+    def test_list_page_errors(self):
+        _cases = [({'first': 0}, 'first_invalido'), ({'first': -1}, 'first_invalido'),
+                  ({'after': 'abc'}, 'cursor_invalido'), ({'after': encode_cursor('PedidoCadastro', 1)}, 'cursor_invalido'),
+                  ({'after': encode_cursor(EstacionamentoCrudRepo.CURSOR_TIPO, '²')}, 'cursor_invalido')]
+
+        for i, (kwargs, expect_error) in enumerate(_cases):
+            success, error = self.repo.list_page(self.session, **kwargs)
+
+            self.assertEqual(False, success, f'Success should be False on {i}')
+            self.assertEqual(expect_error, error, f'Error should be "{expect_error}" on {i}')
+
     def test_get_ok(self):
         real_estacio = self.estacios[0]
 
@@ -1,8 +1,9 @@
 import unittest
 from collections import namedtuple
-from unittest.mock import ANY
+from unittest.mock import ANY, Mock
 
 from src.classes import *  # To avoid cyclic imports
+from src.enums import UploadStatus
 from src.models import PedidoCadastro, Endereco
 from tests.factories.factory import EstacionamentoFactory
 from tests.test_repo.test_pedido_cadastro_crud_repo.base import BaseTestPedidoCadastroCrudRepo
@@ -125,6 +126,33 @@ class TestPedidoCadastroCrudRepoCreate(BaseTestPedidoCadastroCrudRepo):
         self.uploader.upload.assert_not_called()
         self.image_processor.compress.assert_called_once_with(self.fstream, 100, 100)
 
+    def test_create_foto_muito_grande(self):
+        self.image_processor.compress.side_effect = ArquivoMuitoGrande('File stream has 30000000 bytes')
+
+        success, error = self.repo.create(self.adm_estacio_sess, self.session, self.nome, self.telefone, self.endereco,
+                                          self.fstream)
+
+        self.assertEqual(False, success, 'Success should be False')
+        self.assertEqual('foto_muito_grande', error, 'Error should be "foto_muito_grande"')
+
+        self.uploader.upload.assert_not_called()
+
+    def test_create_foto_background(self):
+        self.repo.image_jobs = Mock(enabled=True)
+        self.upload.status = UploadStatus.EM_ANDAMENTO
+        self.repo.image_jobs.store_pending.return_value = self.upload
+
+        success, pedido = self.repo.create(self.adm_estacio_sess, self.session, self.nome, self.telefone,
+                                           self.endereco, self.fstream)
+
+        self.assertEqual(True, success, 'Success should be True')
+        self.assertEqual(UploadStatus.EM_ANDAMENTO, pedido.foto.status, 'Foto should be pending')
+
+        self.image_processor.check.assert_called_once_with(self.fstream)
+        self.image_processor.compress.assert_not_called()
+        self.repo.image_jobs.store_pending.assert_called_once_with(self.fstream, 'foto_estacio')
+        self.repo.image_jobs.submit.assert_called_once_with(pedido.foto.id, 100, 100)
+
     def test_create_error_upload(self):
         self.uploader.upload.side_effect = Exception('Erro aleatorio')
 
@@ -54,6 +54,34 @@ class TestPedidoCadastroCrudRepoList(BaseTestPedidoCadastroCrudRepo):
             self.assertEqual(False, success, f'Success should be False on {i}')
             self.assertEqual('sem_permissao', error, f'Error should be "sem_permissao" on {i}')
 
+    def test_list_page_ok(self):
+        expect_pedidos = sorted((p for p in self.pedidos if p.msg_rejeicao is None), key=lambda p: p.id)
+
+        ret, after = [], None
+        while True:
+            success, pagina = self.repo.list_page(self.adm_sis_sess, self.session, first=4, after=after)
+
+            self.assertEqual(True, success, f'Success should be True. Error: {pagina}')
+            self.assertLessEqual(len(pagina.itens), 4, 'Should respect the page size')
+
+            ret.extend(pagina.itens)
+            if not pagina.tem_proxima:
+                break
+            after = pagina.cursores[-1]
+
+        self.assertSequenceEqual(expect_pedidos, ret, 'Should page through all pedidos in order')
+
+    def test_list_page_errors(self):
+        _cases = [(self.adm_estacio_sess, {}, 'sem_permissao'), (None, {}, 'sem_permissao'),
+                  (self.adm_sis_sess, {'first': 0}, 'first_invalido'),
+                  (self.adm_sis_sess, {'after': 'abc'}, 'cursor_invalido')]
+
+        for i, (user_sess, kwargs, expect_error) in enumerate(_cases):
+            success, error = self.repo.list_page(user_sess, self.session, **kwargs)
+
+            self.assertEqual(False, success, f'Success should be False on {i}')
+            self.assertEqual(expect_error, error, f'Error should be "{expect_error}" on {i}')
+
     def test_get_ok(self):
         real_pedido = self.pedidos[0]
 
@@ -0,0 +1,88 @@
+import time
+import unittest
+from unittest.mock import Mock
+
+from src.services import Cached, LocalCache
+
+
+class TestCached(unittest.TestCase):
+    def setUp(self) -> None:
+        self.cached = Cached('127.0.0.1', 11211, l1_tamanho=2, l1_ttl=60, l1_grupos=['sess_token'])
+        self.cached.client = Mock()
+        self.cached.client.get.return_value = 'valor'
+
+    def test_l1_hit(self):
+        for _ in range(3):
+            self.assertEqual('valor', self.cached.get('sess_token', 'abc'))
+
+        self.cached.client.get.assert_called_once_with('sess_token:abc')
+
+    def test_l1_only_configured_groups(self):
+        for _ in range(3):
+            self.cached.get('rev_sess_token', 'abc')
+
+        self.assertEqual(3, self.cached.client.get.call_count, 'Should not keep other groups locally')
+
+    def test_l1_misses_not_cached(self):
+        self.cached.client.get.return_value = None
+        self.assertIsNone(self.cached.get('sess_token', 'abc'))
+
+        self.cached.client.get.return_value = 'valor'
+        self.assertEqual('valor', self.cached.get('sess_token', 'abc'), 'Should not keep missing keys')
+
+    def test_l1_write_through(self):
+        self.cached.set('sess_token', 'abc', 'novo')
+        self.assertEqual('novo', self.cached.get('sess_token', 'abc'))
+        self.cached.client.get.assert_not_called()
+
+        self.cached.remove('sess_token', 'abc')
+        self.cached.client.get.return_value = None
+        self.assertIsNone(self.cached.get('sess_token', 'abc'), 'Should drop the local copy on remove')
+        self.cached.client.delete.assert_called_once_with('sess_token:abc')
+
+    def test_get_many(self):
+        self.cached.set('sess_token', 'a', 1)
+        self.cached.client.get_many.return_value = {'rev_sess_token:b': 2}
+
+        ret = self.cached.get_many([('sess_token', 'a'), ('rev_sess_token', 'b'), ('sess_token', 'c')])
+        self.assertEqual({('sess_token', 'a'): 1, ('rev_sess_token', 'b'): 2}, ret)
+        self.cached.client.get_many.assert_called_once_with(['rev_sess_token:b', 'sess_token:c'])
+
+    def test_set_delete_many(self):
+        self.cached.set_many({('sess_token', 'a'): 1, ('rev_sess_token', 'b'): 2})
+        self.cached.client.set_many.assert_called_once_with({'sess_token:a': 1, 'rev_sess_token:b': 2},
+                                                            expire=0, noreply=False)
+        self.assertEqual({('sess_token', 'a'): 1}, self.cached.get_many([('sess_token', 'a')]))
+
+        self.cached.delete_many([('sess_token', 'a')], noreply=True)
+        self.cached.client.delete_many.assert_called_once_with(['sess_token:a'], noreply=True)
+        self.assertEqual((False, None), self.cached.l1.get('sess_token:a'), 'Should drop the local copy')
+
+    def test_l1_disabled(self):
+        cached = Cached('127.0.0.1', 11211)
+        self.assertIsNone(cached.l1)
+
+
+class TestLocalCache(unittest.TestCase):
+    def test_lru(self):
+        cache = LocalCache(max_size=2, ttl=60)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+
+        self.assertEqual((True, 1), cache.get('a'))
+        self.assertEqual((False, None), cache.get('b'), 'Should evict the least recently used key')
+        self.assertEqual(2, len(cache))
+
+    def test_ttl(self):
+        cache = LocalCache(max_size=2, ttl=0.05)
+        cache.set('a', 1)
+        time.sleep(0.1)
+
+        self.assertEqual((False, None), cache.get('a'), 'Should expire the key')
+        self.assertEqual(0, len(cache))
+
+
+if __name__ == '__main__':
+    unittest.main()
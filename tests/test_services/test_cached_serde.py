@@ -0,0 +1,54 @@
+import unittest
+
+from pymemcache.serde import pickle_serde
+
+from src.classes import SimpleUserSession
+from src.enums import UserType
+from src.services import CompactSerde
+
+
+class TestCompactSerde(unittest.TestCase):
+    def setUp(self) -> None:
+        self.serde = CompactSerde()
+
+    def _roundtrip(self, value):
+        data, flags = self.serde.serialize('k', value)
+        return self.serde.deserialize('k', data, flags)
+
+    def test_user_session(self):
+        user_sess = SimpleUserSession(UserType.ESTACIONAMENTO.value, 123456789)
+        ret = self._roundtrip(user_sess)
+
+        self.assertIsInstance(ret, SimpleUserSession)
+        self.assertEqual((user_sess.tipo, user_sess.user_id), (ret.tipo, ret.user_id))
+
+        data, _ = self.serde.serialize('k', user_sess)
+        pickled, _ = pickle_serde.serialize('k', user_sess)
+        self.assertLess(len(data), len(pickled) / 5, 'Should be much smaller than pickle')
+
+    def test_primitives(self):
+        for value in ('token', 'çãé', b'\x00\x01', 42, -7, 1.5, True, False, None):
+            self.assertEqual(value, self._roundtrip(value))
+            self.assertIs(type(value), type(self._roundtrip(value)))
+
+    def test_fallback_pickle(self):
+        self.assertEqual({'a': [1, 2]}, self._roundtrip({'a': [1, 2]}), 'Should pickle other types')
+
+    def test_read_old_pickle(self):
+        user_sess = SimpleUserSession(UserType.SISTEMA.value, 5)
+        data, flags = pickle_serde.serialize('k', user_sess)
+        ret = self.serde.deserialize('k', data, flags)
+
+        self.assertEqual((user_sess.tipo, user_sess.user_id), (ret.tipo, ret.user_id),
+                         'Should read entries written with pickle')
+
+        self.assertEqual('token', self.serde.deserialize('k', *pickle_serde.serialize('k', 'token')))
+
+    def test_invalid(self):
+        data, flags = self.serde.serialize('k', SimpleUserSession(1, 5))
+        self.assertIsNone(self.serde.deserialize('k', b'\x09' + data[1:], flags), 'Should ignore unknown versions')
+        self.assertIsNone(self.serde.deserialize('k', data[:4], flags), 'Should ignore truncated values')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,26 @@
+import unittest
+
+from src.services import ClientIp
+
+
+class TestClientIp(unittest.TestCase):
+    def test_sem_proxy(self):
+        client_ip = ClientIp('X-Forwarded-For', 0)
+        self.assertEqual('10.0.0.1', client_ip.resolve({'X-Forwarded-For': '1.2.3.4'}, '10.0.0.1'),
+                         'Should ignore the header without trusted proxies')
+        self.assertEqual('', client_ip.resolve({}, None))
+
+    def test_proxies(self):
+        client_ip = ClientIp('X-Forwarded-For', 1)
+        self.assertEqual('1.2.3.4', client_ip.resolve({'X-Forwarded-For': '1.2.3.4'}, '10.0.0.1'))
+        self.assertEqual('1.2.3.4', client_ip.resolve({'X-Forwarded-For': '6.6.6.6, 1.2.3.4'}, '10.0.0.1'),
+                         'Should ignore addresses added by the client')
+        self.assertEqual('10.0.0.1', client_ip.resolve({}, '10.0.0.1'), 'Should fall back without the header')
+
+        client_ip = ClientIp('X-Forwarded-For', 2)
+        self.assertEqual('1.2.3.4', client_ip.resolve({'X-Forwarded-For': '6.6.6.6, 1.2.3.4, 10.0.0.2'}, '10.0.0.1'))
+        self.assertEqual('10.0.0.1', client_ip.resolve({'X-Forwarded-For': '1.2.3.4'}, '10.0.0.1'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+import threading
+import unittest
+
+from src.services import Crypto, CryptoOcupado
+
+
+class TestCrypto(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.crypto = Crypto(is_testing=False, salt_rounds=4, num_workers=1, max_fila=0)
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.crypto.close()
+
+    def test_pool(self):
+        hashed = self.crypto.hash_password(b'senha123')
+
+        self.assertTrue(self.crypto.check_password(b'senha123', hashed))
+        self.assertFalse(self.crypto.check_password(b'senha_errada', hashed))
+        self.assertTrue(Crypto(is_testing=False, salt_rounds=4).check_password(b'senha123', hashed),
+                        'Should be compatible with the inline mode')
+
+    def test_needs_rehash(self):
+        self.assertEqual(12, Crypto.hash_cost(b'$2b$12$' + b'a' * 53))
+        self.assertEqual(12, Crypto.hash_cost('$2b$12$' + 'a' * 53))
+        self.assertIsNone(Crypto.hash_cost(b'senha123' + b'0' * 52))
+
+        self.assertFalse(self.crypto.needs_rehash(self.crypto.hash_password(b'senha123')))
+        self.assertTrue(self.crypto.needs_rehash(b'$2b$05$' + b'a' * 53))
+        self.assertFalse(Crypto(is_testing=True, salt_rounds=4).needs_rehash(b'$2b$05$' + b'a' * 53),
+                         'Dev hashes never need a rehash')
+
+    def test_rehash_in_background(self):
+        antigo = Crypto(is_testing=False, salt_rounds=5).hash_password(b'senha123')
+        novos = []
+        terminou = threading.Event()
+
+        def callback(novo_hash):
+            novos.append(novo_hash)
+            terminou.set()
+
+        self.crypto.rehash_in_background(b'senha123', antigo, callback)
+        self.assertTrue(terminou.wait(30), 'Should call the callback')
+
+        self.assertEqual(1, len(novos))
+        self.assertEqual(4, Crypto.hash_cost(novos[0]))
+        self.assertTrue(self.crypto.check_password(b'senha123', novos[0]))
+
+    def test_fila_cheia(self):
+        self.crypto._vagas.acquire()
+        try:
+            with self.assertRaises(CryptoOcupado, msg='Should reject right away when the queue is full'):
+                self.crypto.check_password(b'senha123', b'hash')
+        finally:
+            self.crypto._vagas.release()
+
+
+if __name__ == '__main__':
+    unittest.main()
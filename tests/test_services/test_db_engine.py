@@ -0,0 +1,65 @@
+import unittest
+
+from sqlalchemy import exc, text
+from sqlalchemy.pool import NullPool
+
+from src.services import DbEngine, DocumentCache, Metrics
+
+
+class TestDbEngine(unittest.TestCase):
+    def test_queue_pool(self):
+        db = DbEngine('sqlite://', pool_size=1, max_overflow=0, pool_timeout=0.1, pool_pre_ping=True)
+
+        with db.engine.connect() as conn:
+            self.assertEqual(1, conn.execute(text('SELECT 1')).scalar())
+            self.assertEqual(1, db.pool_status()['em_uso'])
+
+            with self.assertRaises(exc.TimeoutError, msg='Should respect the pool limits'):
+                db.engine.connect()
+
+        with db.engine.connect():
+            pass
+
+        status = db.pool_status()
+        self.assertEqual(2, status['checkouts'])
+        self.assertEqual(2, status['checkins'])
+        self.assertEqual(1, status['conexoes_abertas'], 'Should reuse the pooled connection')
+        self.assertEqual(1, status['timeouts'])
+        self.assertGreaterEqual(status['espera_max'], 0.1)
+        self.assertEqual(0, status['em_uso'])
+
+        db.engine.dispose()
+        with db.engine.connect():
+            pass
+        self.assertEqual(3, db.pool_status()['checkouts'], 'Should keep the metrics after dispose')
+
+    def test_null_pool(self):
+        db = DbEngine('sqlite://', pool_mode='null')
+        self.assertIsInstance(db.engine.pool, NullPool)
+
+        for _ in range(2):
+            with db.engine.connect():
+                pass
+
+        status = db.pool_status()
+        self.assertEqual(2, status['conexoes_abertas'])
+        self.assertNotIn('em_uso', status)
+
+    def test_unknown_pool(self):
+        with self.assertRaises(AttributeError):
+            DbEngine('sqlite://', pool_mode='outro')
+
+
+    def test_metrics(self):
+        db = DbEngine('sqlite://')
+        with db.engine.connect():
+            pass
+
+        snapshot = Metrics(db, [DbEngine('sqlite://', pool_mode='NULL')], DocumentCache(10)).snapshot()
+        self.assertEqual(1, snapshot['db']['checkouts'])
+        self.assertEqual(1, len(snapshot['db_replicas']))
+        self.assertEqual(10, snapshot['document_cache']['max_size'])
+
+
+if __name__ == '__main__':
+    unittest.main()
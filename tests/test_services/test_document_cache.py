@@ -0,0 +1,57 @@
+import unittest
+
+from ariadne import make_executable_schema
+
+from src.graphql_executor import execute_graphql_sync
+from src.services import DocumentCache
+
+
+class TestDocumentCache(unittest.TestCase):
+    def setUp(self) -> None:
+        self.schema = make_executable_schema('type Query { hello(nome: String): String }')
+
+    def test_lru(self):
+        cache = DocumentCache(max_size=2)
+        for key in ('a', 'b', 'c'):
+            cache.set(key, None, [])
+
+        self.assertEqual(2, len(cache), 'Should respect the max size')
+        self.assertIsNone(cache.get('a'), 'Should evict the oldest query')
+
+        cache.get('b')
+        cache.set('d', None, [])
+        self.assertIsNotNone(cache.get('b'), 'Should keep the recently used query')
+        self.assertIsNone(cache.get('c'), 'Should evict the least recently used query')
+
+        self.assertEqual({'size': 2, 'max_size': 2, 'hits': 2, 'misses': 2}, cache.stats())
+
+    def test_disabled(self):
+        cache = DocumentCache(max_size=0)
+        cache.set('a', None, [])
+        self.assertEqual(0, len(cache), 'Should not store anything when disabled')
+
+    def test_executor(self):
+        cache = DocumentCache(max_size=10)
+        query = 'query($nome: String) { hello(nome: $nome) }'
+
+        for _ in range(3):
+            success, result = execute_graphql_sync(self.schema, {'query': query}, document_cache=cache)
+            self.assertTrue(success)
+            self.assertEqual({'data': {'hello': None}}, result)
+
+        self.assertEqual(1, cache.misses, 'Should parse and validate only once')
+        self.assertEqual(2, cache.hits, 'Should reuse the parsed query')
+
+        success, result = execute_graphql_sync(self.schema, {'query': '{ tchau }'}, document_cache=cache)
+        self.assertFalse(success)
+        success, result_cached = execute_graphql_sync(self.schema, {'query': '{ tchau }'}, document_cache=cache)
+        self.assertFalse(success)
+        self.assertEqual(result, result_cached, 'Should cache validation errors as well')
+
+        success, result = execute_graphql_sync(self.schema, {'query': '{ hello'}, document_cache=cache)
+        self.assertFalse(success)
+        self.assertEqual(2, len(cache), 'Should not cache syntax errors')
+
+
+if __name__ == '__main__':
+    unittest.main()
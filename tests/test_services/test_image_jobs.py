@@ -0,0 +1,129 @@
+import pathlib
+import tempfile
+import threading
+import unittest
+from io import BytesIO
+
+from PIL import Image
+
+from src.classes import MemoryFileStream
+from src.enums import UploadStatus
+from src.models import Upload
+from src.services import ImageJobs, ImageProcessor, LocalUploader, DbEngine, DbSessionMaker
+
+
+def _foto(size=(64, 48)) -> MemoryFileStream:
+    buffer = BytesIO()
+    Image.new('RGB', size, (200, 30, 30)).save(buffer, format='JPEG')
+    return MemoryFileStream(buffer.getvalue())
+
+
+class TestImageJobs(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        base = pathlib.Path(self.tmp.name)
+        (base / 'foto_estacio').mkdir()
+
+        # Sem pool: o SQLite nao deixa uma conexao aberta em uma thread ser usada pelos workers
+        self.db = DbEngine('sqlite:///' + str(base / 'db.sqlite'), pool_mode=DbEngine.POOL_NULL)
+        Upload.__table__.create(self.db.engine)
+        self.session_maker = DbSessionMaker(self.db)
+
+        self.uploader = LocalUploader(str(base))
+        self.jobs = ImageJobs(ImageProcessor('png'), self.uploader, self.session_maker, num_workers=1)
+
+        self.sess = self.session_maker()
+
+    def tearDown(self) -> None:
+        self.sess.close()
+        self.jobs.close()
+        self.db.engine.dispose()
+        self.tmp.cleanup()
+
+    def _store(self, foto=None) -> Upload:
+        upload = self.jobs.store_pending(foto or _foto(), 'foto_estacio')
+        upload.id = 1  # SmallInteger nao e autoincrement no SQLite
+        self.sess.add(upload)
+        self.sess.commit()
+
+        return upload
+
+    def _arquivos(self):
+        return sorted(p.suffix for p in (pathlib.Path(self.tmp.name) / 'foto_estacio').iterdir())
+
+    def test_submit(self):
+        upload = self._store()
+        self.assertEqual(UploadStatus.EM_ANDAMENTO, upload.status, 'Should be stored as pending')
+        self.assertEqual(['.orig'], self._arquivos())
+
+        self.jobs.submit(upload.id, 32, 24)
+        self.jobs.close()  # Espera os workers terminarem
+
+        self.sess.expire_all()
+        self.assertEqual(UploadStatus.CONCLUIDO, upload.status)
+        self.assertTrue(upload.nome_arquivo.endswith('.png'))
+        self.assertEqual(['.png'], self._arquivos(), 'Should remove the original file')
+        self.assertEqual((32, 24), Image.open(self.uploader.open(upload)).size)
+
+    def test_process_error(self):
+        upload = self._store(MemoryFileStream(b'nao e uma imagem'))
+
+        self.assertFalse(self.jobs.process(self.sess, upload.id, 32, 24))
+
+        self.sess.expire_all()
+        self.assertEqual(UploadStatus.CANCELADO, upload.status)
+
+    def test_upload_replaced(self):
+        upload = self._store()
+        upload_id = upload.id
+        self.sess.delete(upload)
+        self.sess.commit()
+
+        self.assertFalse(self.jobs.process(self.sess, upload_id, 32, 24))
+        self.assertEqual(['.orig'], self._arquivos(), 'Should not process uploads that are gone')
+
+    def test_fila_cheia(self):
+        jobs = ImageJobs(ImageProcessor('png'), self.uploader, self.session_maker, num_workers=1, max_fila=0)
+        liberar = threading.Event()
+        threads = []
+
+        def process(sess, upload_id, width, height):
+            threads.append(threading.current_thread())
+            if threading.current_thread() is not threading.main_thread():
+                liberar.wait(5)
+
+        jobs.process = process
+        try:
+            jobs.submit(1, 32, 24)
+            jobs.submit(2, 32, 24)  # Worker ocupado e fila cheia: roda aqui mesmo
+            self.assertIs(threading.current_thread(), threads[-1], 'Should run in the caller when the queue is full')
+        finally:
+            liberar.set()
+            jobs.close()
+
+        self.assertEqual(2, len(threads))
+
+    def test_recover(self):
+        self.jobs.width_foto, self.jobs.height_foto = 32, 24
+        upload = self._store()
+
+        self.assertEqual(1, self.jobs.recover())
+        self.jobs.close()
+
+        self.sess.expire_all()
+        self.assertEqual(UploadStatus.CONCLUIDO, upload.status, 'Should process uploads left pending')
+        self.assertEqual((32, 24), Image.open(self.uploader.open(upload)).size)
+        self.assertEqual(0, self.jobs.recover())
+
+    def test_check(self):
+        processor = ImageProcessor('png')
+        foto = _foto()
+        processor.check(foto)
+        self.assertEqual(0, foto.tell(), 'Should rewind the stream')
+
+        with self.assertRaises(AttributeError):
+            processor.check(MemoryFileStream(b'nao e uma imagem'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,159 @@
+import pathlib
+import tempfile
+import unittest
+import zlib
+from io import BytesIO
+from unittest.mock import patch
+
+from PIL import Image
+from PIL.JpegImagePlugin import JpegImageFile
+
+from src.classes import MemoryFileStream, ArquivoMuitoGrande
+from src.enums import UploadStatus
+from src.models import Upload
+from src.services import ImageProcessor, LocalUploader
+
+
+def _foto(size=(2000, 1500)) -> MemoryFileStream:
+    buffer = BytesIO()
+    Image.new('RGB', size, (20, 120, 200)).save(buffer, format='JPEG')
+    return MemoryFileStream(buffer.getvalue())
+
+
+def _foto_mpo(size=(2000, 1500)) -> MemoryFileStream:
+    # Fotos de celular guardam uma segunda imagem no bloco MPF, o Pillow abre como MPO
+    Image.init()
+    if 'MPO' not in Image.SAVE:
+        raise unittest.SkipTest('Pillow sem suporte para gravar MPO')
+
+    buffer = BytesIO()
+    Image.new('RGB', size, (20, 120, 200)).save(buffer, format='MPO', save_all=True,
+                                                append_images=[Image.new('RGB', (160, 120))])
+    return MemoryFileStream(buffer.getvalue())
+
+
+class TestImageProcessor(unittest.TestCase):
+    def setUp(self) -> None:
+        self.processor = ImageProcessor('png', larguras_variantes=['480', '160', '2000'])
+
+    def test_variants(self):
+        out = self.processor.compress(_foto(), 1280, 720)
+
+        self.assertEqual((960, 720), Image.open(out).size, 'Should keep the aspect ratio')
+        self.assertListEqual([480, 160], list(out.variants), 'Should skip variants wider than the image')
+        self.assertEqual((480, 360), Image.open(out.variants[480]).size)
+        self.assertEqual((160, 120), Image.open(out.variants[160]).size)
+
+    def test_large_jpeg(self):
+        out = self.processor.compress(_foto((4032, 3024)), 1280, 720)
+        self.assertEqual((960, 720), Image.open(out).size)
+
+        out = self.processor.compress(_foto((3024, 4032)), 1280, 720)
+        self.assertEqual((540, 720), Image.open(out).size, 'Portrait photos should fit the height')
+
+    def test_jpeg_draft(self):
+        for foto in (_foto((4032, 3024)), _foto_mpo((4032, 3024))):
+            with patch.object(JpegImageFile, 'draft', autospec=True, side_effect=JpegImageFile.draft) as draft, \
+                    patch.object(Image.Image, 'reduce', autospec=True, side_effect=Image.Image.reduce) as reduce:
+                out = self.processor.compress(foto, 1280, 720)
+
+            self.assertEqual((960, 720), Image.open(out).size)
+            draft.assert_called_once()
+            # O draft ja decodificou em 1/4, sem ele seria um reduce(2) na imagem inteira
+            reduce.assert_not_called()
+
+    def test_small_image(self):
+        out = self.processor.compress(_foto((300, 200)), 1280, 720)
+        self.assertEqual((300, 200), Image.open(out).size, 'Should not enlarge small images')
+
+    def test_png_palette(self):
+        buffer = BytesIO()
+        Image.new('RGB', (2000, 1500), (20, 120, 200)).convert('P').save(buffer, format='PNG')
+
+        out = self.processor.compress(MemoryFileStream(buffer.getvalue()), 400, 300)
+        self.assertEqual((400, 300), Image.open(out).size)
+
+    def test_without_variants(self):
+        out = ImageProcessor('png').compress(_foto(), 320, 240)
+        self.assertEqual({}, out.variants)
+
+    def test_upload_variants(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            (pathlib.Path(tmp) / 'foto_estacio').mkdir()
+            uploader = LocalUploader(tmp)
+
+            upload = uploader.upload(self.processor.compress(_foto(), 1280, 720), 'foto_estacio', 'abc.png')
+            self.assertEqual('160,480', upload.variantes)
+            self.assertEqual((160, 120), Image.open(uploader.open(Upload(sub_dir='foto_estacio',
+                                                                       nome_arquivo='abc_160.png'))).size)
+
+            uploader.delete(upload)
+            self.assertListEqual([], list((pathlib.Path(tmp) / 'foto_estacio').iterdir()),
+                                 'Should delete the variants')
+
+    def test_max_pixels(self):
+        processor = ImageProcessor('png', max_pixels=1000 * 1000)
+
+        processor.check(_foto((1000, 1000)))
+        with self.assertRaises(ArquivoMuitoGrande):
+            processor.check(_foto((1001, 1000)))
+        with self.assertRaises(ArquivoMuitoGrande):
+            processor.compress(_foto((2000, 1500)), 100, 100)
+
+    def test_header_only(self):
+        # PNG de 50k x 50k com so o cabecalho: recusado sem tentar decodificar os pixels
+        buffer = BytesIO()
+        Image.new('L', (1, 1)).save(buffer, format='PNG')
+        data = bytearray(buffer.getvalue())
+        data[16:24] = (50_000).to_bytes(4, 'big') * 2
+        data[29:33] = zlib.crc32(data[12:29]).to_bytes(4, 'big')
+
+        with self.assertRaises(ArquivoMuitoGrande):
+            ImageProcessor('png', max_pixels=50_000_000).check(MemoryFileStream(bytes(data)))
+
+    def test_max_bytes(self):
+        foto = _foto()
+        foto.seek(0, 2)
+        tamanho = foto.tell()
+
+        ImageProcessor('png', max_bytes=tamanho).check(_foto())
+        with self.assertRaises(ArquivoMuitoGrande):
+            ImageProcessor('png', max_bytes=tamanho - 1).check(_foto())
+
+    def test_formatos(self):
+        processor = ImageProcessor('png', formatos=['jpeg', 'png'])
+        processor.check(_foto())
+
+        buffer = BytesIO()
+        Image.new('RGB', (10, 10)).save(buffer, format='BMP')
+        with self.assertRaises(AttributeError):
+            processor.check(MemoryFileStream(buffer.getvalue()))
+
+        with self.assertRaises(AttributeError):
+            processor.check(MemoryFileStream(b'not an image'))
+
+    def test_formato_mpo(self):
+        ImageProcessor('png', formatos=['jpeg', 'png', 'webp']).check(_foto_mpo())
+
+        with self.assertRaises(AttributeError):
+            ImageProcessor('png', formatos=['png']).check(_foto_mpo())
+
+    def test_caminho(self):
+        upload = Upload(sub_dir='foto_estacio', nome_arquivo='abc.png', variantes='160,480',
+                        status=UploadStatus.CONCLUIDO)
+
+        self.assertEqual('foto_estacio/abc.png', upload.caminho())
+        self.assertEqual('foto_estacio/abc_160.png', upload.caminho(100))
+        self.assertEqual('foto_estacio/abc_480.png', upload.caminho(161))
+        self.assertEqual('foto_estacio/abc.png', upload.caminho(1000), 'Should use the full image')
+        self.assertEqual('foto_estacio/abc.png', Upload(sub_dir='foto_estacio', nome_arquivo='abc.png',
+                                                        status=UploadStatus.CONCLUIDO).caminho(100),
+                         'Old uploads have no variants')
+
+        for status in (UploadStatus.EM_ANDAMENTO, UploadStatus.CANCELADO):
+            self.assertIsNone(Upload(sub_dir='foto_estacio', nome_arquivo='abc.orig', status=status).caminho(),
+                              f'Should not expose {status.name} uploads')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,36 @@
+import unittest
+from unittest.mock import Mock
+
+from src.services import LazySession
+
+
+class TestLazySession(unittest.TestCase):
+    def setUp(self) -> None:
+        self.session_maker = Mock()
+        self.lazy = LazySession(self.session_maker)
+
+    def test_not_used(self):
+        self.lazy.close_if_used()
+
+        self.assertFalse(self.lazy.used)
+        self.session_maker.assert_not_called()
+
+    def test_used(self):
+        sess = self.session_maker.return_value
+
+        self.lazy.query('a')
+        self.lazy.commit()
+
+        self.assertTrue(self.lazy.used)
+        self.session_maker.assert_called_once()
+        sess.query.assert_called_once_with('a')
+        sess.commit.assert_called_once()
+
+        self.lazy.close_if_used()
+        sess.rollback.assert_called_once()
+        sess.close.assert_called_once()
+        self.assertFalse(self.lazy.used, 'Should create a new session if used again')
+
+
+if __name__ == '__main__':
+    unittest.main()
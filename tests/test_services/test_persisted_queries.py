@@ -0,0 +1,114 @@
+import asyncio
+import hashlib
+import threading
+import unittest
+from unittest.mock import Mock
+
+from ariadne import make_executable_schema, QueryType
+
+from src.graphql_executor import execute_graphql_sync, execute_graphql, ERRO_PERSISTED_QUERY_NOT_FOUND, \
+    ERRO_PERSISTED_QUERY_HASH_MISMATCH, ERRO_OPERACAO_NAO_PERMITIDA, cache_control
+from src.services import PersistedQueries
+
+
+class TestPersistedQueries(unittest.TestCase):
+    def setUp(self) -> None:
+        query = QueryType()
+        query.set_field('hello', lambda *_: 'oi')
+        self.schema = make_executable_schema('type Query { hello: String } type Mutation { tchau: String }', query)
+
+        self.cached = Mock()
+        self.cached.get.return_value = None
+        self.store = PersistedQueries(self.cached, tam_local=10)
+
+        self.query = '{ hello }'
+        self.hash = hashlib.sha256(self.query.encode('utf-8')).hexdigest()
+
+    def _data(self, query=None, sha256_hash=None):
+        data = {'extensions': {'persistedQuery': {'version': 1, 'sha256Hash': sha256_hash or self.hash}}}
+        if query is not None:
+            data['query'] = query
+
+        return data
+
+    def _error_code(self, result):
+        return result['errors'][0]['extensions']['code']
+
+    def test_register_and_execute(self):
+        success, result = execute_graphql_sync(self.schema, self._data(), persisted_queries=self.store)
+        self.assertFalse(success)
+        self.assertEqual(ERRO_PERSISTED_QUERY_NOT_FOUND, self._error_code(result), 'Should ask for the query')
+
+        success, result = execute_graphql_sync(self.schema, self._data(self.query), persisted_queries=self.store)
+        self.assertTrue(success)
+        self.assertEqual({'data': {'hello': 'oi'}}, result)
+        self.cached.set.assert_called_once_with(PersistedQueries.GROUP, self.hash, self.query)
+
+        success, result = execute_graphql_sync(self.schema, self._data(), persisted_queries=self.store)
+        self.assertTrue(success)
+        self.assertEqual({'data': {'hello': 'oi'}}, result, 'Should execute using only the hash')
+
+    def test_async_off_loop(self):
+        threads = []
+        self.cached.get.side_effect = lambda *_: threads.append(threading.current_thread())
+        self.cached.set.side_effect = lambda *_, **__: threads.append(threading.current_thread())
+
+        success, _ = asyncio.run(execute_graphql(self.schema, self._data(), persisted_queries=self.store))
+        self.assertFalse(success)
+        success, result = asyncio.run(execute_graphql(self.schema, self._data(self.query),
+                                                      persisted_queries=self.store))
+        self.assertEqual({'data': {'hello': 'oi'}}, result)
+
+        self.assertEqual(2, len(threads), 'Should look up and register the query in memcached')
+        self.assertNotIn(threading.main_thread(), threads, 'Should not call memcached on the event loop')
+
+    def test_hash_mismatch(self):
+        success, result = execute_graphql_sync(self.schema, self._data(self.query, 'abc'),
+                                               persisted_queries=self.store)
+        self.assertFalse(success)
+        self.assertEqual(ERRO_PERSISTED_QUERY_HASH_MISMATCH, self._error_code(result))
+        self.cached.set.assert_not_called()
+
+    def test_invalid_query_not_persisted(self):
+        for query in ('{ hello', '{ nope }'):
+            sha256_hash = hashlib.sha256(query.encode('utf-8')).hexdigest()
+            success, _ = execute_graphql_sync(self.schema, self._data(query, sha256_hash),
+                                              persisted_queries=self.store)
+            self.assertFalse(success)
+            self.assertIsNone(self.store.get(sha256_hash), 'Should only persist valid queries')
+
+        self.cached.set.assert_not_called()
+
+    def test_cache_control(self):
+        self.assertEqual('public, max-age=60', cache_control(True, {'data': {}}, {}, 60))
+        self.assertEqual('private, max-age=60', cache_control(True, {'data': {}}, {'Authorization': 'Bearer x'}, 60))
+        self.assertIsNone(cache_control(True, {'data': None, 'errors': [{}]}, {}, 60), 'Should not cache errors')
+        self.assertIsNone(cache_control(False, {'errors': [{}]}, {}, 60))
+        self.assertIsNone(cache_control(True, {'data': {}}, {}, 0), 'Should be disabled with max_age 0')
+
+    def test_fallback_cached(self):
+        self.cached.get.return_value = self.query
+        self.assertEqual(self.query, self.store.get(self.hash), 'Should read from memcached')
+
+        self.cached.get.return_value = None
+        self.assertEqual(self.query, self.store.get(self.hash), 'Should keep a local copy')
+
+    def test_memcached_offline(self):
+        self.cached.get.side_effect = ConnectionRefusedError()
+        self.cached.set.side_effect = ConnectionRefusedError()
+
+        self.assertIsNone(self.store.get(self.hash))
+        self.store.set(self.hash, self.query)
+        self.assertEqual(self.query, self.store.get(self.hash), 'Should use the local copy')
+
+    def test_query_only(self):
+        success, result = execute_graphql_sync(self.schema, {'query': 'mutation { tchau }'}, query_only=True)
+        self.assertFalse(success)
+        self.assertEqual(ERRO_OPERACAO_NAO_PERMITIDA, self._error_code(result), 'Should not run mutations over GET')
+
+        success, _ = execute_graphql_sync(self.schema, {'query': self.query}, query_only=True)
+        self.assertTrue(success)
+
+
+if __name__ == '__main__':
+    unittest.main()
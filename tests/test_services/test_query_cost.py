@@ -0,0 +1,86 @@
+import pathlib
+import unittest
+
+from ariadne import make_executable_schema, load_schema_from_path, QueryType
+from graphql import parse
+
+from src.graphql_executor import execute_graphql_sync
+from src.services import QueryCostAnalyzer
+from src.services.query_cost import ERRO_CUSTO_EXCEDIDO
+
+
+class TestQueryCost(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        schema_path = pathlib.Path(__file__).parents[2] / 'src' / 'schema.graphql'
+        query = QueryType()
+        query.set_field('listVeiculo', lambda *_: {'success': True, 'veiculos': []})
+        cls.schema = make_executable_schema(load_schema_from_path(str(schema_path)), query)
+
+    def setUp(self) -> None:
+        self.analyzer = QueryCostAnalyzer(custo_maximo=1000, tamanho_lista_padrao=100, fanout_padrao=10)
+
+    def _custo(self, query: str, variables: dict = None, operation_name: str = None):
+        return self.analyzer.validate(self.schema, parse(query), variables, operation_name)
+
+    def test_amount(self):
+        custo, errors = self._custo('{ listEstacionamento(amount: 5) { success estacionamentos { id nome } } }')
+        self.assertEqual(1 + 5, custo, 'Should multiply the list by the amount')
+        self.assertListEqual([], errors)
+
+        custo, _ = self._custo('query($n: Int) { listEstacionamento(amount: $n) { estacionamentos { id } } }',
+                               {'n': 7})
+        self.assertEqual(1 + 7, custo, 'Should read the amount from the variables')
+
+    def test_default_size(self):
+        custo, _ = self._custo('{ listEstacionamento(amount: 0) { estacionamentos { id } } }')
+        self.assertEqual(1 + 100, custo, 'Should use the default size for unlimited lists')
+
+        custo, _ = self._custo('{ buscarEstacio(coordenadas: "(0 0)") { estacionamentos { id } } }')
+        self.assertEqual(1 + 100, custo, 'Should use the default size without limit')
+
+    def test_fanout(self):
+        query = '''
+        query {
+            listEstacionamentoConnection(first: 2) {
+                edges { node { ...campos } }
+            }
+        }
+        fragment campos on Estacionamento { endereco { cidade } valoresHora { valor veiculo } }
+        '''
+        custo, _ = self._custo(query)
+        # conexao + 2 * (edge + node + endereco + 10 * valorHora)
+        self.assertEqual(1 + 2 * (1 + 1 + 1 + 10), custo, 'Should follow fragments and nested lists')
+
+        custo, _ = self._custo('{ listVeiculo { veiculos { id } } }')
+        self.assertEqual(1 + 100, custo, 'Should use the default size for lists outside other lists')
+
+    def test_reject(self):
+        query = '{ listEstacionamento { estacionamentos { valoresHora { id } horasDivergentes { id } } } }'
+        custo, errors = self._custo(query)
+
+        self.assertGreater(custo, self.analyzer.custo_maximo)
+        self.assertEqual(1, len(errors), 'Should reject queries above the budget')
+        self.assertEqual(ERRO_CUSTO_EXCEDIDO, errors[0].extensions['code'])
+
+    def test_operation_name(self):
+        query = 'query a { getUser { success } } query b { listEstacionamento(amount: 3) { estacionamentos { id } } }'
+        self.assertEqual(1, self._custo(query, operation_name='a')[0])
+        self.assertEqual(4, self._custo(query, operation_name='b')[0])
+
+    def test_extensions(self):
+        success, result = execute_graphql_sync(self.schema, {'query': '{ listVeiculo { veiculos { id } } }'},
+                                               query_cost=self.analyzer)
+        self.assertTrue(success)
+        self.assertEqual({'requested': 1 + 100, 'maximum': 1000}, result['extensions']['cost'])
+
+        query = '{ listEstacionamento { estacionamentos { valoresHora { id } } } }'
+        success, result = execute_graphql_sync(self.schema, {'query': query}, query_cost=self.analyzer)
+        self.assertFalse(success, 'Should not execute the query')
+        self.assertNotIn('data', result)
+        self.assertEqual(ERRO_CUSTO_EXCEDIDO, result['errors'][0]['extensions']['code'])
+        self.assertEqual(1000, result['extensions']['cost']['maximum'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+import unittest
+from unittest.mock import Mock, patch
+
+from src.services import RateLimiter
+
+
+class FakeCached:
+    def __init__(self):
+        self.values = {}
+        self.versao = 0
+
+    def gets(self, group, key):
+        value, cas = self.values.get((group, key), (None, None))
+        return value, cas
+
+    def add(self, group, key, value, expire=0):
+        if (group, key) in self.values:
+            return False
+        self._store(group, key, value)
+        return True
+
+    def cas(self, group, key, value, cas, expire=0):
+        if self.values.get((group, key), (None, None))[1] != cas:
+            return False
+        self._store(group, key, value)
+        return True
+
+    def _store(self, group, key, value):
+        self.versao += 1
+        self.values[(group, key)] = (value, self.versao)
+
+
+class TestRateLimiter(unittest.TestCase):
+    def setUp(self) -> None:
+        self.cached = FakeCached()
+        self.limiter = RateLimiter(self.cached, 'email', capacidade=3, por_minuto=6)
+
+    @patch('src.services.rate_limiter.time')
+    def test_allow(self, time_mock):
+        time_mock.time.return_value = 1000
+
+        self.assertEqual([True, True, True, False], [self.limiter.allow('a@b.com') for _ in range(4)])
+        self.assertTrue(self.limiter.allow('c@d.com'), 'Each key should have its own bucket')
+
+        time_mock.time.return_value = 1010
+        self.assertTrue(self.limiter.allow('a@b.com'), 'Should refill one token every 10 seconds')
+        self.assertFalse(self.limiter.allow('a@b.com'))
+
+        self.assertEqual(2, len(self.cached.values))
+        self.assertFalse(any('a@b.com' in key for _, key in self.cached.values), 'Should not store the raw key')
+
+    def test_contention(self):
+        self.limiter.allow('a@b.com')
+        self.cached.cas = Mock(return_value=False)
+
+        self.assertTrue(self.limiter.allow('a@b.com'), 'Should fall back to the local bucket')
+        self.assertEqual(RateLimiter.MAX_TENTATIVAS_CAS, self.cached.cas.call_count)
+
+    @patch('src.services.rate_limiter.time')
+    def test_fallback(self, time_mock):
+        time_mock.time.return_value = 1000
+        cached = Mock()
+        cached.gets.side_effect = OSError()
+        limiter = RateLimiter(cached, 'ip', capacidade=2, por_minuto=6)
+
+        self.assertEqual([True, True, False], [limiter.allow('127.0.0.1') for _ in range(3)])
+
+        time_mock.time.return_value = 1010
+        self.assertTrue(limiter.allow('127.0.0.1'))
+
+    def test_disabled(self):
+        limiter = RateLimiter(Mock(), 'ip', capacidade=0, por_minuto=0)
+        self.assertTrue(all(limiter.allow('127.0.0.1') for _ in range(10)))
+        limiter.cached.gets.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+import asyncio
+import pathlib
+import tempfile
+import threading
+import unittest
+from unittest.mock import Mock
+
+from ariadne import make_executable_schema, QueryType, MutationType
+from graphql import OperationType
+from sqlalchemy import text
+
+from src.classes import RequestContext
+from src.graphql_executor import route_db_session, execute_graphql
+from src.services import DbEngine, DbSessionMaker, LazySession, ReadYourWrites
+
+
+class TestReplicaRouting(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+
+        # Dois SQLite fazendo papel de primario e replica, cada um com uma linha diferente
+        self.engines = {}
+        for nome in ('primario', 'replica'):
+            db = DbEngine('sqlite:///' + str(pathlib.Path(self.tmp.name) / f'{nome}.db'))
+            with db.engine.begin() as conn:
+                conn.execute(text('CREATE TABLE origem (nome VARCHAR(10))'))
+                conn.execute(text('INSERT INTO origem VALUES (:nome)'), {'nome': nome})
+            self.engines[nome] = db
+
+        self.session_maker = DbSessionMaker(self.engines['primario'], [self.engines['replica']])
+
+        self.cached = Mock()
+        self.cached.contains.return_value = False
+        self.read_your_writes = ReadYourWrites(self.cached, janela=5)
+
+    def tearDown(self) -> None:
+        for db in self.engines.values():
+            db.engine.dispose()
+        self.tmp.cleanup()
+
+    def _origem(self, operation: OperationType, headers=None) -> str:
+        context = RequestContext(headers or {}, LazySession(self.session_maker))
+        route_db_session(context, operation, self.read_your_writes)
+
+        try:
+            return context.db_session.execute(text('SELECT nome FROM origem')).scalar()
+        finally:
+            context.db_session.close_if_used()
+
+    def test_routing(self):
+        self.assertEqual('replica', self._origem(OperationType.QUERY))
+        self.assertEqual('primario', self._origem(OperationType.MUTATION))
+        self.assertEqual('primario', DbSessionMaker(self.engines['primario'])(replica=True)
+                         .execute(text('SELECT nome FROM origem')).scalar(), 'Should use the primary without replicas')
+
+    def test_read_your_writes(self):
+        headers = {'Authorization': 'Bearer abc'}
+
+        self.assertEqual('primario', self._origem(OperationType.MUTATION, headers))
+        self.cached.set.assert_called_once_with(ReadYourWrites.GROUP, 'abc', 1, expire=5)
+
+        self.cached.contains.return_value = True
+        self.assertEqual('primario', self._origem(OperationType.QUERY, headers), 'Should stick to the primary')
+        self.assertEqual('replica', self._origem(OperationType.QUERY), 'Should not affect other tokens')
+
+        self.cached.contains.side_effect = OSError()
+        self.assertEqual('primario', self._origem(OperationType.QUERY, headers), 'Should use the primary on errors')
+
+    def test_async_off_loop(self):
+        threads = []
+        self.cached.contains.side_effect = lambda *_: threads.append(threading.current_thread()) or True
+        self.cached.set.side_effect = lambda *_, **__: threads.append(threading.current_thread())
+
+        query, mutation = QueryType(), MutationType()
+        query.set_field('origem', lambda _, info: info.context.db_session.execute(text('SELECT nome FROM origem'))
+                        .scalar())
+        mutation.set_field('tchau', lambda *_: 'tchau')
+        schema = make_executable_schema('type Query { origem: String } type Mutation { tchau: String }',
+                                        query, mutation)
+
+        for operacao in ('mutation { tchau }', '{ origem }'):
+            context = RequestContext({'Authorization': 'Bearer abc'}, LazySession(self.session_maker))
+            try:
+                success, result = asyncio.run(execute_graphql(schema, {'query': operacao}, context_value=context,
+                                                              read_your_writes=self.read_your_writes))
+            finally:
+                context.db_session.close_if_used()
+            self.assertTrue(success, result)
+
+        self.assertEqual({'data': {'origem': 'primario'}}, result, 'Should stick to the primary')
+        self.assertEqual(2, len(threads), 'Should mark and check the write in memcached')
+        self.assertNotIn(threading.main_thread(), threads, 'Should not call memcached on the event loop')
+
+    def test_use_replica_after_first_use(self):
+        lazy = LazySession(self.session_maker)
+        lazy.execute(text('SELECT 1'))
+
+        self.assertFalse(lazy.use_replica(), 'Should not move a session that is already in use')
+        self.assertEqual('primario', lazy.execute(text('SELECT nome FROM origem')).scalar())
+        lazy.close_if_used()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,46 @@
+import unittest
+from unittest.mock import Mock
+
+from src.classes import SimpleUserSession
+from src.services import SessionExpiration
+
+
+class TestSessionExpiration(unittest.TestCase):
+    def setUp(self) -> None:
+        self.expiration = SessionExpiration(ttl_absoluto=3600, ttl_deslizante=600, intervalo_renovacao=60)
+        self.cached = Mock()
+
+    def test_expire(self):
+        self.assertEqual(600, self.expiration.expire(1000, agora=1000), 'Should use the sliding ttl')
+        self.assertEqual(100, self.expiration.expire(1000, agora=4500), 'Should not pass the absolute ttl')
+        self.assertEqual(1, self.expiration.expire(1000, agora=9000), 'Should expire right away')
+        self.assertEqual(600, self.expiration.expire(None), 'Old sessions only have the sliding ttl')
+
+        self.assertEqual(3600, self.expiration.expire_reverse())
+        self.assertEqual(0, SessionExpiration(0, 0, 0).expire(1000), 'Should never expire without ttls')
+
+    def test_expire_above_30_days(self):
+        expiration = SessionExpiration(ttl_absoluto=90 * 86400, ttl_deslizante=60 * 86400, intervalo_renovacao=60)
+
+        self.assertEqual(1000 + 60 * 86400, expiration.expire(1000, agora=1000),
+                         'Memcached reads more than 30 days as a unix timestamp')
+        self.assertEqual(1000 + 90 * 86400, expiration.expire_reverse(agora=1000))
+        self.assertEqual(30 * 86400, SessionExpiration(30 * 86400, 0, 0).expire_reverse(agora=1000),
+                         'Should keep relative ttls up to 30 days')
+
+    def test_refresh_lazy(self):
+        data = SimpleUserSession(1, 5, None)
+        for _ in range(3):
+            self.expiration.refresh(self.cached, 'abc', data)
+        self.expiration.refresh(self.cached, 'def', data)
+
+        self.cached.touch.assert_any_call(SessionExpiration.SESS_TOKEN_GROUP, 'abc', 600, noreply=True)
+        self.assertEqual(2, self.cached.touch.call_count, 'Should touch each token once per interval')
+
+    def test_refresh_disabled(self):
+        SessionExpiration(3600, 0, 60).refresh(self.cached, 'abc', SimpleUserSession(1, 5))
+        self.cached.touch.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
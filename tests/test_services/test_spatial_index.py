@@ -0,0 +1,80 @@
+import unittest
+
+from src.classes import Point
+from src.services import SpatialIndex
+from src.utils import distancia_esfera
+
+
+class TestSpatialIndex(unittest.TestCase):
+    def setUp(self) -> None:
+        self.center = Point('-23.4936088353667', '-46.70926089220919')
+        self.coords = {1: Point('-23.502021', '-46.708661'), 2: Point('-23.493971', '-46.661464'),
+                       3: Point('-23.496181', '-46.610568'), 4: Point('-23.294186', '-45.927184'), 5: None}
+
+        self.index = SpatialIndex(tam_celula=0.05)
+        self.index.build(self.coords.items())
+
+    def test_build(self):
+        self.assertEqual(4, len(self.index), 'Should ignore items without coordinates')
+        self.assertEqual(False, self.index.needs_rebuild(), 'Should not need a rebuild without ttl')
+
+    def test_query_radius(self):
+        self.assertListEqual([1, 2, 3], self._ids(self.index.query_radius(self.center, 30)),
+                             'Should find the close items')
+        self.assertListEqual([1], self._ids(self.index.query_radius(self.center, 1)), 'Should respect the distance')
+
+        _, distancia = self.index.query_radius(self.center, 1)[0]
+        expect = distancia_esfera(float(self.center.x), float(self.center.y),
+                                  float(self.coords[1].x), float(self.coords[1].y))
+        self.assertAlmostEqual(expect, distancia, 6, 'Should return the distance in km')
+
+    def test_distancia_km(self):
+        # Point(lat, lon): o item 3 esta a ~10,07 km do centro (~10,98 km se os eixos fossem lidos trocados)
+        distancias = dict(self.index.query_radius(self.center, 30))
+
+        self.assertAlmostEqual(0.937, distancias[1], 3)
+        self.assertAlmostEqual(10.068, distancias[3], 3)
+        self.assertAlmostEqual(10.068, dict(self.index.nearest(self.center, 3, 30))[3], 3)
+
+    def test_nearest(self):
+        self.assertListEqual([1, 2], self._ids(self.index.nearest(self.center, 2, 30)), 'Should find the k nearest')
+        self.assertListEqual([1, 2, 3], self._ids(self.index.nearest(self.center, 10, 30)),
+                             'Should respect the distance')
+        self.assertListEqual([], self.index.nearest(self.center, 2, 0.5), 'Should be empty when nothing is close')
+
+        distancias = [d for _, d in self.index.nearest(self.center, 3, 30)]
+        self.assertListEqual(sorted(distancias), distancias, 'Should be ordered by distance')
+
+    def test_nearest_far_cells(self):
+        index = SpatialIndex(tam_celula=0.001)
+        index.build(self.coords.items())
+
+        self.assertListEqual([4, 3], self._ids(index.nearest(self.coords[4], 2, 100)),
+                             'Should search the rings until the k nearest are found')
+
+    def test_update_and_remove(self):
+        self.index.update(4, self.coords[1])
+        self.index.update(5, self.coords[2])
+        self.index.remove(1)
+
+        self.assertListEqual([2, 3, 4, 5], self._ids(self.index.query_radius(self.center, 30)),
+                             'Should use the new coordinates')
+
+        self.index.update(2, None)
+        self.assertListEqual([3, 4, 5], self._ids(self.index.query_radius(self.center, 30)),
+                             'Should remove without coordinates')
+
+    def test_update_not_built(self):
+        index = SpatialIndex(tam_celula=0.05)
+        index.update(1, self.coords[1])
+
+        self.assertEqual(True, index.needs_rebuild(), 'Should still need a build')
+        self.assertEqual(0, len(index), 'Should ignore updates before the build')
+
+    @staticmethod
+    def _ids(pares):
+        return [estacio_id for estacio_id, _ in pares]
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,24 @@
+import unittest
+
+from src.utils import encode_cursor, decode_cursor, tamanho_pagina
+
+
+class TestCursor(unittest.TestCase):
+    def test_round_trip(self):
+        self.assertEqual(42, decode_cursor('Estacionamento', encode_cursor('Estacionamento', 42)))
+
+    def test_invalido(self):
+        for cursor in ['abc', '', encode_cursor('PedidoCadastro', 1), encode_cursor('Estacionamento', '²'),
+                       encode_cursor('Estacionamento', '٣'), encode_cursor('Estacionamento', '-1'),
+                       encode_cursor('Estacionamento', '')]:
+            self.assertIsNone(decode_cursor('Estacionamento', cursor), f'Should reject {cursor!r}')
+
+    def test_tamanho_pagina(self):
+        self.assertEqual(10, tamanho_pagina(0, 10), 'Should use the maximum without amount')
+        self.assertEqual(10, tamanho_pagina(50, 10), 'Should clamp to the maximum')
+        self.assertEqual(5, tamanho_pagina(5, 10))
+        self.assertEqual(0, tamanho_pagina(0, 0), 'Should not limit without a maximum')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+import unittest
+from types import SimpleNamespace
+
+from graphql import parse, OperationDefinitionNode, FragmentDefinitionNode
+from sqlalchemy.dialects import mysql
+from sqlalchemy.orm import Session
+
+import src.classes  # noqa: F401 - precisa ser importado antes dos models
+from src.models import Estacionamento, PedidoCadastro
+from src.utils import load_options_from_info
+
+
+def _make_info(query: str):
+    doc = parse(query)
+    operation = next(d for d in doc.definitions if isinstance(d, OperationDefinitionNode))
+    fragments = {d.name.value: d for d in doc.definitions if isinstance(d, FragmentDefinitionNode)}
+
+    return SimpleNamespace(field_nodes=[operation.selection_set.selections[0]], fragments=fragments)
+
+
+def _paths(options):
+    return sorted(tuple(str(p) for p in o.path) for o in options)
+
+
+class TestEagerLoading(unittest.TestCase):
+    def test_nested_fields(self):
+        info = _make_info('{ listEstacionamento { success estacionamentos { id nome endereco { id } '
+                          'valoresHora { valor veiculo } } } }')
+        options = load_options_from_info(info, Estacionamento, 'estacionamentos')
+
+        self.assertListEqual([('Estacionamento.endereco',), ('Estacionamento.valores_hora', 'ValorHora.veiculo')],
+                             _paths(options), 'Should load only the selected relationships')
+
+    def test_fragments(self):
+        info = _make_info('{ getPedidoCadastro { pedidoCadastro { ...F ... on PedidoCadastro { foto } } } } '
+                          'fragment F on PedidoCadastro { endereco { id } }')
+        options = load_options_from_info(info, PedidoCadastro, 'pedidoCadastro')
+
+        self.assertListEqual([('PedidoCadastro.endereco',), ('PedidoCadastro.foto',)], _paths(options),
+                             'Should follow fragments')
+
+    def test_strategies(self):
+        info = _make_info('{ getEstacionamento { estacionamento { endereco { id } horasDivergentes { id } } } }')
+        options = load_options_from_info(info, Estacionamento, 'estacionamento')
+
+        sql = str(Session().query(Estacionamento).options(*options).statement.compile(dialect=mysql.dialect()))
+        self.assertIn('JOIN endereco', sql, 'Should join many-to-one relationships')
+        self.assertNotIn('horario_divergente', sql, 'Should load collections on a separate SELECT')
+
+    def test_no_relationships(self):
+        info = _make_info('{ listEstacionamento { success error } }')
+
+        self.assertListEqual([], load_options_from_info(info, Estacionamento, 'estacionamentos'))
+        self.assertListEqual([], load_options_from_info(None, Estacionamento))
+
+
+if __name__ == '__main__':
+    unittest.main()
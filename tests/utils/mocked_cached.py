@@ -19,10 +19,10 @@ class MockedCached(Cached):
     def contains(self, group: str, key: str):
         return super().contains(self.prefix + group, key)
 
-    def set(self, group: str, key: str, value):
+    def set(self, group: str, key: str, value, expire: int = 0):
         group = self.prefix + group
 
-        super().set(group, key, value)
+        super().set(group, key, value, expire)
         self._keys_created.add(self._gen_key_name(group, key))
 
     def remove(self, group: str, key: str):
@@ -31,6 +31,38 @@ class MockedCached(Cached):
         super().remove(group, key)
         self._keys_created.remove(self._gen_key_name(group, key))
 
+    def get_many(self, keys):
+        ret = super().get_many([(self.prefix + group, key) for group, key in keys])
+        return {(group[len(self.prefix):], key): value for (group, key), value in ret.items()}
+
+    def set_many(self, values, expire: int = 0, noreply: bool = False):
+        values = {(self.prefix + group, key): value for (group, key), value in values.items()}
+
+        super().set_many(values, expire, noreply)
+        self._keys_created.update(self._gen_key_name(group, key) for group, key in values)
+
+    def delete_many(self, keys, noreply: bool = False):
+        keys = [(self.prefix + group, key) for group, key in keys]
+
+        super().delete_many(keys, noreply)
+        self._keys_created.difference_update(self._gen_key_name(group, key) for group, key in keys)
+
+    def gets(self, group: str, key: str):
+        return super().gets(self.prefix + group, key)
+
+    def cas(self, group: str, key: str, value, cas, expire: int = 0):
+        return super().cas(self.prefix + group, key, value, cas, expire)
+
+    def add(self, group: str, key: str, value, expire: int = 0):
+        group = self.prefix + group
+
+        ret = super().add(group, key, value, expire)
+        self._keys_created.add(self._gen_key_name(group, key))
+        return ret
+
+    def touch(self, group: str, key: str, expire: int, noreply: bool = False):
+        super().touch(self.prefix + group, key, expire, noreply)
+
     def clear_all(self):
         for k in self._keys_created:
             self.client.delete(k)